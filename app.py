@@ -12,12 +12,13 @@ from PySide6.QtCore import *
 # IMPORT UI 
 from MainWindow import Ui_MainWindow
 from Login_Dialog import Ui_Login_Dialog
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection, close_pool
 
 from stylesheets import message_box_style
 
 from search import SearchBirthWindow, SearchDeathWindow, SearchMarriageWindow
 from verify import VerifyBirthWindow, VerifyDeathWindow, VerifyMarriageWindow
+from unified_search_window import UnifiedSearchWindow
 from manage_users import ManageUserForm
 
 # from indexing import *
@@ -29,6 +30,11 @@ from audit_log_viewer import AuditLogViewer
 from releasing_docs import ReleaseDocumentWindow
 from releasing_log_viewer import ReleasingLogViewer
 from book_viewer import BookViewerWindow
+from archive_scanner import start_scanner, stop_scanner
+from render_service import shutdown_render_service
+from save_queue import flush_save_queue, shutdown_save_queue
+from save_error_tray import SaveErrorTray
+import multiprocessing
 
 from flask_server.app import start_server
 import threading
@@ -90,19 +96,14 @@ class Login(QDialog, Ui_Login_Dialog):
 
     def create_connection(self):
         try:
-            conn = psycopg2.connect(**POSTGRES_CONFIG)
-            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-            return conn
+            return get_connection(owner=self.__class__.__name__)
         except psycopg2.Error as e:
             print(f"Error connecting to database: {str(e)}")
             return None
 
     def closeConnection(self, conn):
         if conn:
-            try:
-                conn.close()
-            except:
-                pass  # Ignore close errors
+            release_connection(conn)
 
     def login(self):
         try:
@@ -147,6 +148,9 @@ class Login(QDialog, Ui_Login_Dialog):
             if user:
                 username, firstname, lastname = user
                 full_name = f"{firstname} {lastname}".strip()
+
+                # Prime the username cache used to validate audit entries
+                AuditLogger.load_usernames()
                 
                 box = QMessageBox(self)
                 box.setIcon(QMessageBox.Information)
@@ -165,6 +169,8 @@ class Login(QDialog, Ui_Login_Dialog):
                 )
                 mainwindow.showMaximized()
                 self.hide()
+                # Keep the file catalog in step with the share from now on
+                start_scanner()
             else:
                 AuditLogger.log_action(
                     conn,
@@ -346,15 +352,17 @@ class MainWindow(QMainWindow):
         self.verify_livebirth_btn = QPushButton("Live Birth")
         self.verify_death_btn = QPushButton("Death")
         self.verify_marriage_btn = QPushButton("Marriage")
+        self.verify_all_btn = QPushButton("All Registries")
         
         # Set object names for sub-menu styling
-        for btn in [self.verify_livebirth_btn, self.verify_death_btn, self.verify_marriage_btn]:
+        for btn in [self.verify_livebirth_btn, self.verify_death_btn, self.verify_marriage_btn, self.verify_all_btn]:
             btn.setObjectName("sub_menu_btn")
         
         # Add buttons to sub-menu layout
         self.sub_menu_layout.addWidget(self.verify_livebirth_btn)
         self.sub_menu_layout.addWidget(self.verify_death_btn)
         self.sub_menu_layout.addWidget(self.verify_marriage_btn)
+        self.sub_menu_layout.addWidget(self.verify_all_btn)
         
         # Add sub-menu to verify container
         self.verify_layout.addWidget(self.verify_sub_menu)
@@ -369,6 +377,7 @@ class MainWindow(QMainWindow):
         self.verify_livebirth_btn.clicked.connect(self.open_search_birth_dialog)
         self.verify_death_btn.clicked.connect(self.open_search_death_dialog)
         self.verify_marriage_btn.clicked.connect(self.open_search_marriage_dialog)
+        self.verify_all_btn.clicked.connect(self.open_unified_search_dialog)
 
         # Create Filename Search Menu Container
         self.filename_search_container = QFrame()
@@ -848,8 +857,7 @@ class MainWindow(QMainWindow):
     def create_connection(self):
         try:
             if self.connection is None:
-                self.connection = psycopg2.connect(**POSTGRES_CONFIG)
-                self.connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                self.connection = get_connection(owner=self.__class__.__name__)
             return self.connection
         except psycopg2.Error as e:
             print(f"Error connecting to database: {str(e)}")
@@ -857,10 +865,7 @@ class MainWindow(QMainWindow):
 
     def closeConnection(self):
         if self.connection:
-            try:
-                self.connection.close()
-            except:
-                pass  # Ignore close errors
+            release_connection(self.connection)
             self.connection = None
 
     # log current user
@@ -896,7 +901,7 @@ class MainWindow(QMainWindow):
 
         box.setStyleSheet(message_box_style)
 
-        if box.exec() == QMessageBox.Yes:
+        if box.exec() == QMessageBox.Yes and self.confirm_unsaved_tags():
             conn = self.create_connection()
             try:
                 # Log window closures first
@@ -928,6 +933,52 @@ class MainWindow(QMainWindow):
             self.login_window.show()
             self.hide()
 
+    def confirm_unsaved_tags(self):
+        """Before logout/exit: wait for queued tag saves and offer to retry failed ones.
+
+        Returns True when nothing is left unsaved or the user chose to discard it.
+        """
+        while True:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                pending = flush_save_queue(10.0)
+                # Deliver the save results already queued for the tagging windows
+                QApplication.processEvents()
+            finally:
+                QApplication.restoreOverrideCursor()
+            trays = [tray for tray in self.findChildren(SaveErrorTray) if tray.failure_count()]
+            failed = sum(tray.failure_count() for tray in trays)
+            if not pending and not failed:
+                return True
+
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Warning)
+            box.setWindowTitle("Unsaved Tags")
+            box.setText(f"{failed} tag save(s) failed and {pending} are still being written.\n"
+                        "Retry them, or discard them and continue?")
+            retry_button = box.addButton("Retry", QMessageBox.AcceptRole)
+            discard_button = box.addButton("Discard", QMessageBox.DestructiveRole)
+            box.addButton(QMessageBox.Cancel)
+            box.setStyleSheet(message_box_style)
+            box.exec()
+            clicked = box.clickedButton()
+            if clicked == retry_button:
+                for tray in trays:
+                    tray.retry_all()
+                continue
+            if clicked == discard_button:
+                AuditLogger.log_action(
+                    None,
+                    self.current_user,
+                    "TAG_SAVES_DISCARDED",
+                    {"failed": failed, "pending": pending}
+                )
+                return True
+            for tray in trays:
+                tray.show()
+                tray.raise_()
+            return False
+
     def closeEvent(self, event):
         box = QMessageBox(self)
         box.setIcon(QMessageBox.Question)
@@ -938,7 +989,7 @@ class MainWindow(QMainWindow):
         box.setStyleSheet(message_box_style)
         reply = box.exec()
         
-        if reply == QMessageBox.Yes:
+        if reply == QMessageBox.Yes and self.confirm_unsaved_tags():
             conn = self.create_connection()
             try:
                 # Log window closures
@@ -966,6 +1017,12 @@ class MainWindow(QMainWindow):
             
             # Clean up
             self.windows.clear()
+            shutdown_save_queue()  # queued tag saves before the pool closes
+            # Write out buffered audit rows before the pool goes away
+            AuditLogger.shutdown()
+            stop_scanner()
+            shutdown_render_service()
+            close_pool()
             # if self.recordstatus:
             #     self.recordstatus.close()
             event.accept()
@@ -1326,6 +1383,34 @@ class MainWindow(QMainWindow):
             conn.commit()
         finally:
             self.closeConnection()
+
+    def open_unified_search_dialog(self):
+        # Expand sidebar first if it's contracted
+        if not self.is_sidebar_expanded:
+            self.expand_sidebar()
+
+        conn = self.create_connection()
+        try:
+            unified_search = self.windows.get('unified_search')
+            if unified_search is None or not unified_search.isVisible():
+                unified_search = UnifiedSearchWindow(self.current_user, parent=self)
+                unified_search.setParent(self)
+                unified_search.setWindowFlag(Qt.Window)
+                self.windows['unified_search'] = unified_search
+
+            unified_search.show()
+            unified_search.raise_()
+            unified_search.activateWindow()
+
+            AuditLogger.log_action(
+                conn,
+                self.current_user,
+                "OPEN_WINDOW",
+                {"window": "UnifiedSearchWindow"}
+            )
+            conn.commit()
+        finally:
+            self.closeConnection()
     
     # open eVERIFY window
     def open_everify(self):
@@ -1556,6 +1641,8 @@ class MainWindow(QMainWindow):
             self.closeConnection()
 
 if __name__ == "__main__":
+    # Thumbnail render workers re-launch the frozen executable (see app.spec)
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     # Set application style
     app.setStyle("Fusion")
@@ -0,0 +1,198 @@
+"""Background scanner that keeps the filename catalog in step with the share.
+
+New scans are dropped into \\\\server\\MCR every day. ``ArchiveScanner`` is a
+daemon thread that walks each registry root every ``SCAN_INTERVAL`` seconds
+through ``FileCatalog.refresh()`` - ``os.scandir`` listings, skipped for
+directories whose mtime has not changed - so added, renamed and removed
+PDFs reach the catalog without anyone searching for them first.
+
+Windows then read listings from the catalog (``list_pdf_names()``) instead
+of listing the share on the hot path. Listeners registered with
+``add_listener()`` are called from the scanner thread with
+``(root, stats)`` whenever a scan changed something; Qt code must hop back
+to the GUI thread (e.g. via a signal) before touching widgets.
+
+Usage (app start-up / shutdown):
+    start_scanner()
+    ...
+    stop_scanner()
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from file_catalog import get_catalog
+
+ARCHIVE_ROOTS = [
+    r"\\server\MCR\LIVE BIRTH",
+    r"\\server\MCR\DEATH",
+    r"\\server\MCR\MARRIAGE",
+]
+SCAN_INTERVAL = 60.0  # seconds between full passes
+
+
+class ArchiveScanner:
+    """Daemon thread that refreshes the catalog for every archive root."""
+
+    def __init__(self, roots: Optional[List[str]] = None, interval: float = SCAN_INTERVAL, catalog=None):
+        self.roots = list(roots if roots is not None else ARCHIVE_ROOTS)
+        self.interval = interval
+        self.catalog = catalog or get_catalog()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, Dict[str, int]], None]] = []
+        self._scanned_roots = set()
+        self._thread = threading.Thread(target=self._run, name="ArchiveScanner", daemon=True)
+        self._stats = {
+            'scans': 0,
+            'last_scan_started': None,   # time.time()
+            'last_scan_finished': None,
+            'last_scan_seconds': 0.0,
+            'last_dirs_checked': 0,
+            'last_dirs_rescanned': 0,
+            'last_entries_listed': 0,
+            'dirs_per_second': 0.0,
+            'entries_per_second': 0.0,
+            'files_added': 0,
+            'files_removed': 0,
+            'errors': 0,
+            'last_error': None,
+        }
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def scan_now(self):
+        """Ask for a pass right away instead of waiting for the interval."""
+        self._wake.set()
+
+    def add_listener(self, callback: Callable[[str, Dict[str, int]], None]):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def has_scanned(self, root: str) -> bool:
+        """Whether a full pass over `root` has completed since start-up."""
+        with self._lock:
+            return os.path.normpath(root) in self._scanned_roots
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['running'] = self._thread.is_alive()
+        snapshot['catalog_files'] = self.catalog.count()
+        return snapshot
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.scan_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def scan_once(self):
+        """One pass over every root; also usable synchronously."""
+        started = time.time()
+        totals = {'dirs_checked': 0, 'dirs_rescanned': 0, 'entries_listed': 0}
+        for root in self.roots:
+            if self._stopped.is_set():
+                return
+            try:
+                result = self.catalog.refresh(root)
+            except Exception as e:
+                # Share unreachable or permission problem; try again next pass
+                print(f"Archive scan of {root} failed: {str(e)}")
+                with self._lock:
+                    self._stats['errors'] += 1
+                    self._stats['last_error'] = f"{root}: {str(e)}"
+                continue
+            for key in totals:
+                totals[key] += result[key]
+            with self._lock:
+                self._scanned_roots.add(os.path.normpath(root))
+                self._stats['files_added'] += result['files_added']
+                self._stats['files_removed'] += result['files_removed']
+                listeners = list(self._listeners)
+            if result['files_added'] or result['files_removed']:
+                print(f"Archive scan {root}: +{result['files_added']} / -{result['files_removed']} files")
+                for listener in listeners:
+                    try:
+                        listener(root, result)
+                    except Exception as e:
+                        print(f"Archive scan listener failed: {str(e)}")
+
+        elapsed = time.time() - started
+        with self._lock:
+            self._stats['scans'] += 1
+            self._stats['last_scan_started'] = started
+            self._stats['last_scan_finished'] = time.time()
+            self._stats['last_scan_seconds'] = elapsed
+            self._stats['last_dirs_checked'] = totals['dirs_checked']
+            self._stats['last_dirs_rescanned'] = totals['dirs_rescanned']
+            self._stats['last_entries_listed'] = totals['entries_listed']
+            self._stats['dirs_per_second'] = totals['dirs_checked'] / elapsed if elapsed else 0.0
+            self._stats['entries_per_second'] = totals['entries_listed'] / elapsed if elapsed else 0.0
+
+
+_scanner: Optional[ArchiveScanner] = None
+_scanner_lock = threading.Lock()
+
+
+def start_scanner() -> ArchiveScanner:
+    """Start the process-wide scanner (idempotent)."""
+    global _scanner
+    with _scanner_lock:
+        if _scanner is None:
+            _scanner = ArchiveScanner()
+            _scanner.start()
+    return _scanner
+
+
+def get_scanner() -> Optional[ArchiveScanner]:
+    return _scanner
+
+
+def stop_scanner():
+    global _scanner
+    with _scanner_lock:
+        if _scanner is not None:
+            _scanner.stop()
+            _scanner = None
+
+
+def scanner_stats() -> Dict[str, object]:
+    """Throughput and last-scan time of the scanner (empty if not running)."""
+    return _scanner.stats() if _scanner is not None else {}
+
+
+def list_pdf_names(folder: str) -> List[str]:
+    """PDF file names in `folder`, from the catalog when its listing is current.
+
+    The folder is stat'ed first: when its mtime differs from the scanned one
+    (files added since the last pass) or the catalog has not seen it yet,
+    the share is listed directly and the scanner is asked to catch up.
+    """
+    try:
+        mtime = os.stat(folder).st_mtime
+    except OSError:
+        mtime = None  # unreachable: the catalog's listing is the best there is
+    names = get_catalog().list_pdfs(folder, mtime)
+    if names is not None:
+        return names
+    if _scanner is not None:
+        _scanner.scan_now()
+    return [f for f in os.listdir(folder) if f.lower().endswith(".pdf")]
@@ -9,7 +9,7 @@ from reportlab.lib.pagesizes import landscape
 from reportlab.lib.units import inch
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.pdfmetrics import stringWidth
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
 from datetime import datetime, timedelta
 from audit_logger import AuditLogger
 from stylesheets import message_box_style, table_style, date_picker_style, combo_box_style
@@ -185,9 +185,7 @@ class AuditLogViewer(QMainWindow):
     def create_connection(self):
         """Create a new PostgreSQL database connection"""
         try:
-            conn = psycopg2.connect(**POSTGRES_CONFIG)
-            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-            return conn
+            return get_connection(owner=self.__class__.__name__)
         except psycopg2.Error as e:
             print(f"Error creating connection: {str(e)}")
             return None
@@ -195,10 +193,7 @@ class AuditLogViewer(QMainWindow):
     def closeConnection(self, conn=None):
         """Safely close the database connection"""
         if conn:
-            try:
-                conn.close()
-            except Exception as e:
-                print(f"Error closing connection: {str(e)}")
+            release_connection(conn)
         
     def load_action_types(self):
         """Load unique action types for the action filter dropdown"""
@@ -1,29 +1,384 @@
 import psycopg2
+from psycopg2.extras import execute_values
 from datetime import datetime
+import queue
+import threading
 import time
-from db_config import POSTGRES_CONFIG
+import uuid
+from audit_spool import AuditSpool
+from db_pool import get_connection, release_connection
 
-class AuditLogger:
+
+class AuditWriter:
+    """Background write-behind for audit_log rows.
+
+    log_action() only puts a row on a bounded in-memory queue; a daemon
+    thread drains the queue and inserts the rows in batches with a single
+    multi-row INSERT per transaction, so audit logging never waits on the
+    database from the Qt GUI thread.
+
+    Rows that cannot be written because PostgreSQL is unreachable go to the
+    local AuditSpool instead, and the same thread replays the spool in order
+    once the server answers again. Every row carries an event_id, and the
+    INSERT skips ids already present, so a replay never duplicates events.
+
+    Rows whose username log_action() could not check (server unreachable)
+    are checked against users_list here, right before they are written;
+    rows of unknown users are dropped then.
+    """
+
+    QUEUE_SIZE = 10000     # rows buffered before log_action starts dropping
+    BATCH_SIZE = 200       # rows per multi-row INSERT
+    FLUSH_INTERVAL = 0.5   # seconds to wait for more rows before flushing
     MAX_RETRIES = 3
-    RETRY_DELAY = 0.1  # 100ms delay between retries
+    RETRY_DELAY = 0.1      # 100ms, grows with every retry
+    REPLAY_INTERVAL = 30   # seconds between reconnect attempts while spooling
+
+    INSERT_SQL = """
+        INSERT INTO audit_log (event_id, timestamp, username, action, details)
+        VALUES %s
+        ON CONFLICT (event_id) DO NOTHING
+    """
+
+    _STOP = object()
+
+    def __init__(self, spool=None):
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="AuditWriter", daemon=True)
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped': 0,
+            'failed': 0,
+            'spooled': 0,
+            'replayed': 0,
+            'invalid_users': 0,
+            'high_water': 0,
+            'last_batch_size': 0,
+            'last_flush_seconds': 0.0,
+            'last_error': None,
+        }
+        if spool is None:
+            try:
+                spool = AuditSpool()
+            except Exception as e:
+                print(f"Audit spool unavailable, events will be lost while offline: {str(e)}")
+        self._spool = spool
+        self._spool_pending = bool(spool and spool.count())
+        self._next_replay = 0.0  # replay leftovers from a previous session right away
+        self._thread.start()
+
+    def submit(self, row):
+        """Queue one (event_id, timestamp, username, action, details) row without blocking."""
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+            print(f"Audit queue full ({self.QUEUE_SIZE} rows) - dropped action '{row[3]}'")
+            return False
+        with self._lock:
+            self._stats['enqueued'] += 1
+            depth = self._queue.qsize()
+            if depth > self._stats['high_water']:
+                self._stats['high_water'] = depth
+        return True
+
+    def flush(self, timeout=5.0):
+        """Wait until every queued row has been written or spooled. Returns True if drained."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not self._thread.is_alive():
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout=5.0):
+        """Flush pending rows and stop the worker thread."""
+        drained = self.flush(timeout)
+        try:
+            self._queue.put(self._STOP, timeout=1.0)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=1.0)
+        if self._spool and not self._thread.is_alive():
+            self._spool.close()
+        return drained
+
+    @property
+    def offline(self):
+        """Whether rows are going to the spool because the server was unreachable."""
+        return self._spool_pending
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['queue_depth'] = self._queue.qsize()
+        snapshot['queue_capacity'] = self.QUEUE_SIZE
+        snapshot['spool_depth'] = self._spool.count() if self._spool else 0
+        return snapshot
+
+    def _run(self):
+        while True:
+            try:
+                if self._spool_pending:
+                    wait = max(0.0, self._next_replay - time.monotonic())
+                    item = self._queue.get(timeout=wait) if wait > 0 else self._queue.get_nowait()
+                else:
+                    item = self._queue.get()
+            except queue.Empty:
+                self._replay_spool()
+                continue
+
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._deliver(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def _deliver(self, batch):
+        # Older spooled rows must reach the server first to keep events in order.
+        if self._spool_pending:
+            if time.monotonic() < self._next_replay or not self._replay_spool():
+                self._spool_rows(batch)
+                return
+        if not self._write_batch(batch, self.MAX_RETRIES):
+            self._spool_rows(batch)
+
+    def _spool_rows(self, batch):
+        if self._spool is None:
+            with self._lock:
+                self._stats['failed'] += len(batch)
+            return
+        try:
+            self._spool.append(batch)
+        except Exception as e:
+            print(f"Failed to spool {len(batch)} audit rows: {str(e)}")
+            with self._lock:
+                self._stats['failed'] += len(batch)
+            return
+        if not self._spool_pending:
+            self._next_replay = time.monotonic() + self.REPLAY_INTERVAL
+        self._spool_pending = True
+        with self._lock:
+            self._stats['spooled'] += len(batch)
+
+    def _replay_spool(self):
+        """Upload spooled rows oldest first. Returns True once the spool is empty."""
+        if self._spool is None:
+            self._spool_pending = False
+            return True
+        while True:
+            try:
+                pending = self._spool.peek(self.BATCH_SIZE)
+            except Exception as e:
+                print(f"Failed to read audit spool: {str(e)}")
+                pending = None
+            if pending is None or (pending and not self._write_batch([row for _, row in pending], 1)):
+                self._next_replay = time.monotonic() + self.REPLAY_INTERVAL
+                return False
+            if not pending:
+                self._spool_pending = False
+                return True
+            self._spool.remove_through(pending[-1][0])
+            with self._lock:
+                self._stats['replayed'] += len(pending)
+
+    def _write_batch(self, batch, attempts):
+        started = time.monotonic()
+        last_error = None
+        for attempt in range(1, attempts + 1):
+            conn = None
+            cursor = None
+            try:
+                conn = get_connection(autocommit=False, owner="AuditWriter")
+                cursor = conn.cursor()
+                rows = self._known_user_rows(cursor, batch)
+                if rows:
+                    execute_values(cursor, self.INSERT_SQL, rows, page_size=self.BATCH_SIZE)
+                conn.commit()
+                with self._lock:
+                    self._stats['written'] += len(batch)
+                    self._stats['batches'] += 1
+                    self._stats['last_batch_size'] = len(batch)
+                    self._stats['last_flush_seconds'] = time.monotonic() - started
+                return True
+            except psycopg2.Error as e:
+                last_error = e
+                print(f"Error logging audit trail (attempt {attempt}/{attempts}): {str(e)}")
+                if conn:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass  # Ignore rollback errors
+                if attempt < attempts:
+                    time.sleep(self.RETRY_DELAY * attempt)
+            finally:
+                if cursor:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass  # Ignore cursor close errors
+                if conn:
+                    release_connection(conn)
+
+        with self._lock:
+            self._stats['last_error'] = str(last_error) if last_error else None
+        return False
+
+    def _known_user_rows(self, cursor, batch):
+        """Drop rows of usernames missing from users_list (only users not already cached are looked up)."""
+        with AuditLogger._users_lock:
+            unchecked = {row[2] for row in batch} - AuditLogger._known_users - {"SYSTEM"}
+        if not unchecked:
+            return batch
+        cursor.execute("SELECT username FROM users_list WHERE username = ANY(%s)", (list(unchecked),))
+        found = {row[0] for row in cursor.fetchall()}
+        with AuditLogger._users_lock:
+            AuditLogger._known_users |= found
+        invalid = unchecked - found
+        if not invalid:
+            return batch
+        rows = [row for row in batch if row[2] not in invalid]
+        print(f"Dropped {len(batch) - len(rows)} audit rows of unknown users: {', '.join(sorted(invalid))}")
+        with self._lock:
+            self._stats['invalid_users'] += len(batch) - len(rows)
+        return rows
+
+
+class AuditLogger:
+    USER_CACHE_TTL = 300  # seconds before the cached users_list is reloaded
+    OFFLINE_RETRY = 30    # seconds without user lookups after the server did not answer
+
+    _writer = None
+    _writer_lock = threading.Lock()
+
+    _known_users = set()
+    _users_loaded_at = None  # time.monotonic() of the last full load
+    _server_down_until = 0.0  # time.monotonic() before which lookups are skipped
+    _users_lock = threading.Lock()
+
+    @staticmethod
+    def load_usernames():
+        """Load every username from users_list into the in-process cache.
+
+        Called once at login; afterwards the cache is refreshed when it is
+        older than USER_CACHE_TTL or after invalidate_user_cache().
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = get_connection(owner="AuditLogger")
+            cursor = conn.cursor()
+            cursor.execute("SELECT username FROM users_list")
+            usernames = {row[0] for row in cursor.fetchall()}
+        except psycopg2.Error as e:
+            print(f"Error loading usernames from PostgreSQL: {str(e)}")
+            AuditLogger._server_down_until = time.monotonic() + AuditLogger.OFFLINE_RETRY
+            return False
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except:
+                    pass  # Ignore cursor close errors
+            if conn:
+                release_connection(conn)
+
+        with AuditLogger._users_lock:
+            AuditLogger._known_users = usernames
+            AuditLogger._users_loaded_at = time.monotonic()
+        return True
+
+    @staticmethod
+    def invalidate_user_cache():
+        """Drop the cached usernames; the next validation reloads them."""
+        with AuditLogger._users_lock:
+            AuditLogger._known_users = set()
+            AuditLogger._users_loaded_at = None
+
+    @staticmethod
+    def server_unreachable():
+        """Whether the database recently failed to answer, so lookups would only stall."""
+        writer = AuditLogger._writer
+        return (writer is not None and writer.offline) or time.monotonic() < AuditLogger._server_down_until
 
     @staticmethod
     def validate_username(username):
-        """Validate username exists in PostgreSQL users_list table"""
+        """Whether username exists in users_list: True, False, or None when it cannot be checked.
+
+        None means the server is unreachable and the user is not in the
+        cache; the audit writer checks such rows before writing them. While
+        the server is known to be down no connection is attempted, so the GUI
+        thread does not wait for the connect timeout on every action.
+        """
         if username == "SYSTEM":
             return True
-            
+
+        with AuditLogger._users_lock:
+            loaded_at = AuditLogger._users_loaded_at
+            fresh = loaded_at is not None and time.monotonic() - loaded_at < AuditLogger.USER_CACHE_TTL
+            known = username in AuditLogger._known_users
+        if known and (fresh or AuditLogger.server_unreachable()):
+            return True
+        if AuditLogger.server_unreachable():
+            return None
+
+        if not fresh:
+            if AuditLogger.load_usernames():
+                with AuditLogger._users_lock:
+                    if username in AuditLogger._known_users:
+                        return True
+            else:
+                # Server unreachable: trust the last loaded list for another
+                # TTL instead of retrying (and stalling) on every action.
+                with AuditLogger._users_lock:
+                    if AuditLogger._users_loaded_at is not None:
+                        AuditLogger._users_loaded_at = time.monotonic()
+                    return True if username in AuditLogger._known_users else None
+
+        # Cache miss: the user may have been added from another workstation
+        # since the last load, so confirm with a single lookup.
+        conn = None
+        cursor = None
         try:
-            conn = psycopg2.connect(**POSTGRES_CONFIG)
-            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = get_connection(owner="AuditLogger")
             cursor = conn.cursor()
-            
+
             cursor.execute("SELECT username FROM users_list WHERE username = %s", (username,))
-            return cursor.fetchone() is not None
-            
+            exists = cursor.fetchone() is not None
+            if exists:
+                with AuditLogger._users_lock:
+                    AuditLogger._known_users.add(username)
+            return exists
+
         except psycopg2.Error as e:
             print(f"Error validating username in PostgreSQL: {str(e)}")
-            return False
+            AuditLogger._server_down_until = time.monotonic() + AuditLogger.OFFLINE_RETRY
+            with AuditLogger._users_lock:
+                return True if username in AuditLogger._known_users else None
         finally:
             if cursor:
                 try:
@@ -31,65 +386,65 @@ class AuditLogger:
                 except:
                     pass  # Ignore cursor close errors
             if conn:
-                try:
-                    conn.close()
-                except:
-                    pass  # Ignore connection close errors
+                release_connection(conn)
+
+    @staticmethod
+    def get_writer():
+        """Return the background audit writer, starting it on first use."""
+        if AuditLogger._writer is None:
+            with AuditLogger._writer_lock:
+                if AuditLogger._writer is None:
+                    AuditLogger._writer = AuditWriter()
+        return AuditLogger._writer
 
     @staticmethod
     def log_action(connection, username, action, details=None):
+        """Queue an audit_log row; the INSERT happens on the writer thread.
+
+        `connection` is kept for backwards compatibility with existing callers
+        and is not used.
+        """
         if username is None:  # Handle cases where user isn't logged in
             username = "SYSTEM"
-        
-        # Validate username exists in database
-        if not AuditLogger.validate_username(username):
+
+        # Validate username exists in database; when the server cannot be
+        # reached the row is queued and the writer checks it before writing
+        if AuditLogger.validate_username(username) is False:
             error_msg = f"Invalid username '{username}' - not found in database"
             print(error_msg)
             raise ValueError(error_msg)
 
-        # Use PostgreSQL for audit logging
-        audit_conn = None
-        cursor = None
-        retries = 0
-        last_error = None
+        # event_id is the idempotency key that lets spooled rows be replayed safely
+        row = (str(uuid.uuid4()), datetime.now(), username, action, str(details) if details else None)
+        return AuditLogger.get_writer().submit(row)
 
-        while retries < AuditLogger.MAX_RETRIES:
-            try:
-                audit_conn = psycopg2.connect(**POSTGRES_CONFIG)
-                cursor = audit_conn.cursor()
-                
-                cursor.execute('''
-                INSERT INTO audit_log (username, action, details)
-                VALUES (%s, %s, %s)
-                ''', (username, action, str(details) if details else None))
-                
-                audit_conn.commit()
-                return  # Success - exit the retry loop
-                
-            except psycopg2.Error as e:
-                last_error = e
-                print(f"Error logging audit trail (attempt {retries + 1}/{AuditLogger.MAX_RETRIES}): {str(e)}")
-                if audit_conn:
-                    try:
-                        audit_conn.rollback()
-                    except:
-                        pass  # Ignore rollback errors
-                retries += 1
-                if retries < AuditLogger.MAX_RETRIES:
-                    time.sleep(AuditLogger.RETRY_DELAY * retries)  # Exponential backoff
-            finally:
-                if cursor:
-                    try:
-                        cursor.close()
-                    except:
-                        pass  # Ignore cursor close errors
-                if audit_conn:
-                    try:
-                        audit_conn.close()
-                    except:
-                        pass  # Ignore connection close errors
-
-        # If we get here, all retries failed
-        print(f"Failed to log audit trail after {AuditLogger.MAX_RETRIES} attempts")
-        if last_error:
-            raise last_error  # Re-raise the last error to be handled by the caller
+    @staticmethod
+    def flush(timeout=5.0):
+        """Block until queued audit rows are written (or the timeout passes)."""
+        if AuditLogger._writer is None:
+            return True
+        return AuditLogger._writer.flush(timeout)
+
+    @staticmethod
+    def shutdown(timeout=5.0):
+        """Flush pending audit rows and stop the writer; call on application exit.
+
+        Rows that could not reach the server stay in the local spool and are
+        replayed the next time the application starts logging.
+        """
+        with AuditLogger._writer_lock:
+            writer = AuditLogger._writer
+            AuditLogger._writer = None
+        if writer is None:
+            return True
+        drained = writer.stop(timeout)
+        if not drained:
+            print(f"Audit writer shut down with {writer.stats()['queue_depth']} rows still queued")
+        return drained
+
+    @staticmethod
+    def stats():
+        """Queue depth, throughput and drop/failure counters of the audit writer."""
+        if AuditLogger._writer is None:
+            return {}
+        return AuditLogger._writer.stats()
@@ -0,0 +1,106 @@
+"""Durable local spool for audit events that could not reach PostgreSQL.
+
+When the database server is slow or down, the background audit writer in
+``audit_logger`` appends the rows it could not insert to a small SQLite file
+(WAL mode) next to the application. Once connectivity returns the writer
+replays the spool in insertion order and removes what was uploaded.
+
+Every row carries an ``event_id`` (UUID) generated when the action was
+logged. ``audit_log.event_id`` is unique, and uploads use
+``ON CONFLICT (event_id) DO NOTHING``, so a batch that is replayed twice
+(e.g. the app closed between the upload and the local delete) is never
+duplicated on the server.
+
+Usage:
+    spool = AuditSpool()
+    spool.append([(event_id, timestamp, username, action, details)])
+    for seq, row in spool.peek(200):
+        ...
+    spool.remove_through(last_seq)
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+DEFAULT_SPOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_spool.db")
+
+# (event_id, timestamp, username, action, details)
+AuditRow = Tuple[str, datetime, str, str, Optional[str]]
+
+
+class AuditSpool:
+    """Append-only, ordered SQLite queue of audit rows."""
+
+    def __init__(self, path: str = DEFAULT_SPOOL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS audit_spool (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id TEXT NOT NULL UNIQUE,
+                timestamp TEXT NOT NULL,
+                username TEXT NOT NULL,
+                action TEXT NOT NULL,
+                details TEXT
+            )
+        """)
+
+    def append(self, rows: Iterable[AuditRow]) -> int:
+        """Durably store rows at the end of the spool. Returns rows written."""
+        records = [
+            (event_id, timestamp.isoformat(sep=' '), username, action, details)
+            for event_id, timestamp, username, action, details in rows
+        ]
+        if not records:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # OR IGNORE keeps a re-spooled event from duplicating itself
+                cursor = self._conn.executemany(
+                    "INSERT OR IGNORE INTO audit_spool (event_id, timestamp, username, action, details) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    records,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    def peek(self, limit: int) -> List[Tuple[int, AuditRow]]:
+        """Return up to `limit` oldest rows as (seq, row) without removing them."""
+        with self._lock:
+            records = self._conn.execute(
+                "SELECT seq, event_id, timestamp, username, action, details "
+                "FROM audit_spool ORDER BY seq LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            (seq, (event_id, datetime.fromisoformat(timestamp), username, action, details))
+            for seq, event_id, timestamp, username, action, details in records
+        ]
+
+    def remove_through(self, seq: int) -> None:
+        """Delete every row up to and including `seq` (after a successful upload)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM audit_spool WHERE seq <= ?", (seq,))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM audit_spool").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
@@ -12,7 +12,8 @@ from PySide6.QtPrintSupport import QPrinter, QPrintDialog, QPrintPreviewDialog
 
 
 from audit_logger import AuditLogger
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection
+from path_utils import canonical_path
 
 from stylesheets import search_button_style, everify_button_style, button_style, message_box_style
 
@@ -139,7 +140,7 @@ class FormPreviewWindow(QMainWindow):
             if table:
                 try:
                     cursor = self.connection.cursor()
-                    cursor.execute(f"SELECT remarks FROM {table} WHERE normalize_path(file_path) = %s", (self.pdf_path.replace('\\\\', '/').replace('\\', '/'),))
+                    cursor.execute(f"SELECT remarks FROM {table} WHERE canonical_path = %s", (canonical_path(self.pdf_path),))
                     result = cursor.fetchone()
                     if result and result[0]:
                         saved_remarks = result[0]
@@ -575,9 +576,8 @@ class FormPreviewWindow(QMainWindow):
     def save_remarks(self):
         """Save the remarks to the appropriate index table based on form type."""
         if self.connection.closed:
-            # Reconnect using your db config
-            import psycopg2
-            self.connection = psycopg2.connect(**POSTGRES_CONFIG)
+            # Borrow a fresh connection from the shared pool
+            self.connection = get_connection(autocommit=False, owner=self.__class__.__name__)
         if not self.connection:
             # QMessageBox.critical(self, "Database Error", "No database connection available.")
             box = QMessageBox(self)
@@ -618,7 +618,7 @@ class FormPreviewWindow(QMainWindow):
         try:
             cursor = self.connection.cursor()
             # Check if the row exists for the given file_path
-            cursor.execute(f"SELECT 1 FROM {table} WHERE normalize_path(file_path) = %s", (self.pdf_path.replace('\\\\', '/').replace('\\', '/'),))
+            cursor.execute(f"SELECT 1 FROM {table} WHERE canonical_path = %s", (canonical_path(self.pdf_path),))
             if not cursor.fetchone():
                 # QMessageBox.critical(self, "Error", f"No record found for file_path:\n{self.pdf_path}\nRemarks not saved.")
                 box = QMessageBox(self)
@@ -633,8 +633,8 @@ class FormPreviewWindow(QMainWindow):
             cursor.execute(f"""
                 UPDATE {table}
                 SET remarks = %s
-                WHERE normalize_path(file_path) = %s
-            """, (remarks_text, self.pdf_path.replace('\\\\', '/').replace('\\', '/')))
+                WHERE canonical_path = %s
+            """, (remarks_text, canonical_path(self.pdf_path)))
             self.connection.commit()
             cursor.close()
             # QMessageBox.information(self, "Success", "Form saved successfully.")
@@ -656,7 +656,7 @@ class FormPreviewWindow(QMainWindow):
             box.exec()
 
     def normalize_path(path):
-        return path.replace('\\\\', '/').replace('\\', '/')
+        return canonical_path(path)
 
 # A custom layout manager for absolute positioning. This is a common pattern for overlays.
 class QAbsoluteLayout(QLayout):
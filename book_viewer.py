@@ -17,7 +17,8 @@ from pdfviewer import PDFViewer
 from audit_logger import AuditLogger
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
+from archive_scanner import list_pdf_names
 
 
 class BookViewerWindow(QMainWindow):
@@ -134,8 +135,7 @@ class BookViewerWindow(QMainWindow):
         """Create and return a database connection for audit logging."""
         try:
             if self.connection is None:
-                self.connection = psycopg2.connect(**POSTGRES_CONFIG)
-                self.connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                self.connection = get_connection(owner=self.__class__.__name__)
             return self.connection
         except psycopg2.Error as e:
             print(f"Error connecting to database: {str(e)}")
@@ -144,10 +144,7 @@ class BookViewerWindow(QMainWindow):
     def closeConnection(self):
         """Close the database connection."""
         if self.connection:
-            try:
-                self.connection.close()
-            except:
-                pass  # Ignore close errors
+            release_connection(self.connection)
             self.connection = None
         
     def select_file(self):
@@ -181,11 +178,10 @@ class BookViewerWindow(QMainWindow):
         """Load all PDF files from the selected folder. If selected_file is given, set current index to it."""
         try:
             self.pdf_files = []
-            # Get all PDF files from the folder
-            for file in os.listdir(self.current_folder):
-                if file.lower().endswith('.pdf'):
-                    file_path = os.path.join(self.current_folder, file)
-                    self.pdf_files.append(file_path)
+            # Get all PDF files from the folder (catalogued listing when available)
+            for file in list_pdf_names(self.current_folder):
+                file_path = os.path.join(self.current_folder, file)
+                self.pdf_files.append(file_path)
             # Sort files naturally (1, 2, 10 instead of 1, 10, 2)
             self.pdf_files.sort(key=lambda x: self.natural_sort_key(x))
             if self.pdf_files:
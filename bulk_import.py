@@ -0,0 +1,384 @@
+"""Bulk import of spreadsheet-encoded records into the index tables.
+
+Backlog books are sometimes encoded offline in a spreadsheet. Instead of
+re-keying every row through ``save_tags``, export the sheet as CSV (one
+column per index column, header row first, ``file_path`` required) and
+import it:
+
+    python bulk_import.py birth_index backlog.csv [username]
+
+The file is streamed through ``validate_csv``: dates (``YYYY-MM-DD`` or
+``MM/DD/YYYY``, not in the future, registration not before the event),
+numbers, the form vocabularies (sex, type of birth, civil status,
+ceremony) and registry numbers that repeat within the file (same
+registration year and normalized number) or repeat a file path. Good rows
+get the same derived columns the tagging windows write (canonical_path,
+name keys) and are ``COPY``-ed in chunks into a temporary staging table.
+Staged rows whose registry number is already used by another file in the
+table are rejected, and the rest are merged with
+``INSERT ... ON CONFLICT(file_path) DO UPDATE`` in the same transaction.
+
+Only the columns in the header are written (``import_columns``): a sheet
+with just ``file_path,name`` renames existing records and leaves their other
+columns as they are, while new records get the table defaults. ``reg_no``
+and ``date_of_reg`` must be imported together, since the registry number is
+unique per registration year.
+
+Every rejected line goes to a reject report (``<input>.rejects.csv``) with
+its line number, the reason and the original values, ready to be fixed and
+imported again. The database checks need the ``normalize_reg_no()`` function
+from dbase_scripts/add_reg_no_unique_indexes.py.
+"""
+
+import csv
+import io
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import date, datetime
+
+from filename_parser import normalize_reg_no
+from name_keys import name_keys
+from path_utils import canonical_path
+
+COPY_CHUNK = 20000  # rows per COPY into the staging table
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y")
+EARLIEST_DATE = date(1800, 1, 1)
+
+SEXES = ("MALE", "FEMALE")
+BIRTH_TYPES = ("SINGLE", "TWIN", "TRIPLET", "QUADRUPLET", "QUINTUPLET",
+               "SEXTUPLET", "SEPTUPLET", "OCTUPLET", "NONUPLET", "DECAPLET")
+CIVIL_STATUSES = ("SINGLE", "MARRIED", "WIDOW", "WIDOWER", "DIVORCED", "ANNULLED")
+CEREMONY_TYPES = ("ROMAN CATHOLIC WEDDING", "CIVIL WEDDING", "OTHER RELIGIOUS WEDDING")
+_YES = {"YES", "Y", "TRUE", "T", "1"}
+_NO = {"NO", "N", "FALSE", "F", "0"}
+
+# columns: what a CSV may contain; event_date: registered on or after it
+TableSpec = namedtuple("TableSpec", ["columns", "dates", "ints", "bools", "vocab", "event_date", "name_columns"])
+
+TABLE_SPECS = {
+    "birth_index": TableSpec(
+        columns=("file_path", "name", "date_of_birth", "sex", "page_no", "book_no", "reg_no",
+                 "date_of_reg", "place_of_birth", "name_of_mother", "nationality_mother",
+                 "name_of_father", "nationality_father", "parents_marriage_date",
+                 "parents_marriage_place", "attendant", "type_of_birth", "late_registration"),
+        dates=("date_of_birth", "date_of_reg", "parents_marriage_date"),
+        ints=("page_no", "book_no"),
+        bools=("late_registration",),
+        vocab={"sex": SEXES, "type_of_birth": BIRTH_TYPES},
+        event_date="date_of_birth",
+        name_columns=("name",),
+    ),
+    "death_index": TableSpec(
+        columns=("file_path", "name", "date_of_death", "sex", "page_no", "book_no", "reg_no",
+                 "date_of_reg", "age_years", "age_months", "age_days", "age_hours", "age_mins",
+                 "civil_status", "nationality", "place_of_death", "cause_of_death",
+                 "corpse_disposal", "late_registration"),
+        dates=("date_of_death", "date_of_reg"),
+        ints=("page_no", "book_no", "age_years", "age_months", "age_days", "age_hours", "age_mins"),
+        bools=("late_registration",),
+        vocab={"sex": SEXES, "civil_status": CIVIL_STATUSES},
+        event_date="date_of_death",
+        name_columns=("name",),
+    ),
+    "marriage_index": TableSpec(
+        columns=("file_path", "husband_name", "wife_name", "date_of_marriage", "page_no", "book_no",
+                 "reg_no", "husband_age", "wife_age", "husb_nationality", "wife_nationality",
+                 "husb_civil_status", "wife_civil_status", "husb_mother", "wife_mother",
+                 "husb_father", "wife_father", "date_of_reg", "place_of_marriage",
+                 "ceremony_type", "late_registration"),
+        dates=("date_of_marriage", "date_of_reg"),
+        ints=("page_no", "book_no", "husband_age", "wife_age"),
+        bools=("late_registration",),
+        vocab={"husb_civil_status": CIVIL_STATUSES, "wife_civil_status": CIVIL_STATUSES,
+               "ceremony_type": CEREMONY_TYPES},
+        event_date="date_of_marriage",
+        name_columns=("husband_name", "wife_name"),
+    ),
+}
+
+
+def stored_columns(table):
+    """Columns written per record: the CSV columns plus the derived ones."""
+    spec = TABLE_SPECS[table]
+    derived = ["canonical_path"]
+    for column in spec.name_columns:
+        derived += [f"{column}_norm", f"{column}_phonetic"]
+    return list(spec.columns) + derived
+
+
+def import_columns(table, headers):
+    """Columns an import with these CSV headers writes: the listed ones plus their derived columns."""
+    spec = TABLE_SPECS[table]
+    columns = [column for column in spec.columns if column in headers] + ["canonical_path"]
+    for column in spec.name_columns:
+        if column in headers:
+            columns += [f"{column}_norm", f"{column}_phonetic"]
+    return columns
+
+
+def csv_headers(table, fieldnames):
+    """Normalized CSV headers, or raise ValueError when they cannot be imported into `table`."""
+    if table not in TABLE_SPECS:
+        raise ValueError(f"Unknown index table: {table}")
+    spec = TABLE_SPECS[table]
+    headers = [(header or "").strip().lower() for header in (fieldnames or [])]
+    unknown = [header for header in headers if header and header not in spec.columns]
+    if "file_path" not in headers or unknown:
+        raise ValueError(f"CSV header must include file_path and only {table} columns"
+                         + (f" (unknown: {', '.join(unknown)})" if unknown else ""))
+    if ("reg_no" in headers) != ("date_of_reg" in headers):
+        raise ValueError("CSV header must include both reg_no and date_of_reg, or neither")
+    return headers
+
+
+def parse_date(text):
+    try:
+        return date.fromisoformat(text)  # the common case, much faster than strptime
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS[1:]:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"'{text}' is not a date (use YYYY-MM-DD)")
+
+
+def validate_record(table, raw, today=None):
+    """Typed record (stored_columns order) for one CSV row, or raise ValueError with every problem."""
+    spec = TABLE_SPECS[table]
+    today = today or date.today()
+    record = {}
+    problems = []
+    for column in spec.columns:
+        text = (raw.get(column) or "").strip()
+        if not text:
+            record[column] = False if column in spec.bools else None
+            continue
+        try:
+            if column in spec.dates:
+                value = parse_date(text)
+                if not EARLIEST_DATE <= value <= today:
+                    raise ValueError(f"{value.isoformat()} is out of range")
+            elif column in spec.ints:
+                if not text.isdigit():
+                    raise ValueError(f"'{text}' is not a whole number")
+                value = int(text)
+            elif column in spec.bools:
+                if text.upper() not in _YES | _NO:
+                    raise ValueError(f"'{text}' is not YES or NO")
+                value = text.upper() in _YES
+            elif column in spec.vocab:
+                value = text.upper()
+                if column == "sex" and value in ("M", "F"):
+                    value = "MALE" if value == "M" else "FEMALE"
+                if value not in spec.vocab[column]:
+                    raise ValueError(f"'{text}' is not one of {', '.join(spec.vocab[column])}")
+            else:
+                value = text
+        except ValueError as e:
+            problems.append(f"{column}: {e}")
+            continue
+        record[column] = value
+
+    if not record.get("file_path"):
+        problems.append("file_path: missing")
+    event = record.get(spec.event_date)
+    registered = record.get("date_of_reg")
+    if event and registered and registered < event:
+        problems.append(f"date_of_reg: before {spec.event_date}")
+    if problems:
+        raise ValueError("; ".join(problems))
+
+    record["canonical_path"] = canonical_path(record["file_path"])
+    for column in spec.name_columns:
+        record[f"{column}_norm"], record[f"{column}_phonetic"] = name_keys(record[column])
+    return record
+
+
+def validate_csv(table, csv_file, today=None):
+    """Stream (line_no, record, raw, reason) per data row; record is None for rejects.
+
+    A row repeating an earlier row's file_path, or its registry number in
+    the same registration year, is rejected; the first one is kept.
+    """
+    reader = csv.DictReader(csv_file)
+    reader.fieldnames = csv_headers(table, reader.fieldnames)
+    return _validate_rows(table, reader, today)
+
+
+def _validate_rows(table, reader, today=None):
+    seen_files = {}
+    seen_reg_nos = {}
+    for raw in reader:
+        line_no = reader.line_num
+        try:
+            record = validate_record(table, raw, today)
+        except ValueError as e:
+            yield line_no, None, raw, str(e)
+            continue
+        first = seen_files.get(record["file_path"])
+        if first:
+            yield line_no, None, raw, f"file_path: repeats line {first}"
+            continue
+        reg_key = None
+        if record.get("date_of_reg") and normalize_reg_no(record.get("reg_no")):
+            reg_key = (record["date_of_reg"].year, normalize_reg_no(record["reg_no"]))
+            first = seen_reg_nos.get(reg_key)
+            if first:
+                yield line_no, None, raw, f"reg_no: duplicate of line {first}"
+                continue
+        seen_files[record["file_path"]] = line_no
+        if reg_key:
+            seen_reg_nos[reg_key] = line_no
+        yield line_no, record, raw, None
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, list):
+        return "{" + ",".join(value) + "}"
+    return value
+
+
+def import_csv(conn, table, csv_path, reject_path=None):
+    """Validate, stage and merge a CSV file in one transaction; returns counts.
+
+    `conn` must not be in autocommit mode. Rejected lines are written to
+    `reject_path` (default ``<csv_path>.rejects.csv``).
+    """
+    started = time.monotonic()
+    reject_path = reject_path or os.path.splitext(csv_path)[0] + ".rejects.csv"
+    counts = {'read': 0, 'rejected': 0, 'inserted': 0, 'updated': 0}
+    staged = {}  # file_path -> (line_no, original values) for database rejects
+    spec = TABLE_SPECS[table]
+
+    cursor = conn.cursor()
+    try:
+        with open(csv_path, newline="", encoding="utf-8-sig") as csv_file, \
+                open(reject_path, "w", newline="", encoding="utf-8") as reject_file:
+            reader = csv.DictReader(csv_file)
+            reader.fieldnames = csv_headers(table, reader.fieldnames)
+            columns = import_columns(table, reader.fieldnames)
+            column_list = ", ".join(columns)
+            rejects = csv.writer(reject_file)
+            rejects.writerow(["line", "reason"] + list(spec.columns))
+
+            def original(raw):
+                return [raw.get(column) or "" for column in spec.columns]
+
+            def reject(line_no, values, reason):
+                counts['rejected'] += 1
+                rejects.writerow([line_no, reason] + values)
+
+            cursor.execute(f"""
+                CREATE TEMP TABLE import_staging ON COMMIT DROP AS
+                SELECT {column_list} FROM {table} WITH NO DATA
+            """)
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            pending = 0
+
+            def copy_buffer():
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY import_staging ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+                buffer.seek(0)
+                buffer.truncate()
+
+            for line_no, record, raw, reason in _validate_rows(table, reader):
+                counts['read'] += 1
+                if record is None:
+                    reject(line_no, original(raw), reason)
+                    continue
+                writer.writerow([_copy_value(record[column]) for column in columns])
+                staged[record["file_path"]] = (line_no, tuple(original(raw)))
+                pending += 1
+                if pending >= COPY_CHUNK:
+                    copy_buffer()
+                    pending = 0
+            if pending:
+                copy_buffer()
+
+            cursor.execute("CREATE INDEX ON import_staging (file_path)")
+            cursor.execute("ANALYZE import_staging")
+
+            # Registry numbers held by another file that this import does not also rewrite
+            if "reg_no" in columns:
+                cursor.execute(f"""
+                    DELETE FROM import_staging s
+                    USING {table} t
+                    WHERE s.date_of_reg IS NOT NULL
+                      AND EXTRACT(YEAR FROM t.date_of_reg) = EXTRACT(YEAR FROM s.date_of_reg)
+                      AND normalize_reg_no(t.reg_no) = normalize_reg_no(s.reg_no)
+                      AND t.file_path <> s.file_path
+                      AND NOT EXISTS (SELECT 1 FROM import_staging o WHERE o.file_path = t.file_path)
+                    RETURNING s.file_path, t.file_path
+                """)
+                for file_path, existing_file in cursor.fetchall():
+                    line_no, values = staged[file_path]
+                    reject(line_no, list(values), f"reg_no: already used by {existing_file}")
+
+        # Unlisted columns keep their stored values
+        updates = ",\n".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "file_path")
+        cursor.execute(f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list} FROM import_staging
+            ON CONFLICT(file_path) DO UPDATE SET
+                {updates}
+            RETURNING (xmax = 0)
+        """)
+        for (inserted,) in cursor.fetchall():
+            counts['inserted' if inserted else 'updated'] += 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    counts['seconds'] = round(time.monotonic() - started, 2)
+    counts['reject_report'] = reject_path
+    return counts
+
+
+def main(argv):
+    if len(argv) < 3 or argv[1] not in TABLE_SPECS:
+        print(f"Usage: python bulk_import.py {{{'|'.join(TABLE_SPECS)}}} records.csv [username]")
+        return 2
+    table, csv_path = argv[1], argv[2]
+    username = argv[3] if len(argv) > 3 else None
+
+    from audit_logger import AuditLogger
+    from db_pool import get_connection, release_connection, close_pool
+
+    conn = get_connection(autocommit=False, owner="BulkImport")
+    try:
+        counts = import_csv(conn, table, csv_path)
+    except Exception as e:
+        print(f"❌ Import failed, nothing was saved: {str(e)}")
+        return 1
+    finally:
+        release_connection(conn)
+
+    print(f"✅ {counts['read']} rows read in {counts['seconds']}s: {counts['inserted']} inserted, "
+          f"{counts['updated']} updated, {counts['rejected']} rejected")
+    if counts['rejected']:
+        print(f"   Reject report: {counts['reject_report']}")
+    if username:
+        AuditLogger.log_action(None, username, "BULK_IMPORT", {"table": table, "file": csv_path, **counts})
+        AuditLogger.shutdown()
+    close_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
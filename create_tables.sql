@@ -28,6 +28,7 @@
 --     late_registration BOOLEAN DEFAULT FALSE,
 --     twin BOOLEAN DEFAULT FALSE,
 --     file_path VARCHAR(255) UNIQUE,
+--     canonical_path VARCHAR(255), -- replace(file_path, '\', '/'), indexed (dbase_scripts/add_canonical_path_column.py)
 --     remarks TEXT NULL
 -- );
 
@@ -53,6 +54,7 @@
 --     corpse_disposal VARCHAR(255),
 --     late_registration BOOLEAN DEFAULT FALSE,
 --     file_path VARCHAR(255) UNIQUE,
+--     canonical_path VARCHAR(255), -- replace(file_path, '\', '/'), indexed (dbase_scripts/add_canonical_path_column.py)
 --     remarks TEXT NULL
 -- ); 
 
@@ -80,6 +82,7 @@
 --     ceremony_type VARCHAR(100),
 --     late_registration BOOLEAN DEFAULT FALSE,
 --     file_path VARCHAR(255) UNIQUE,
+--     canonical_path VARCHAR(255), -- replace(file_path, '\', '/'), indexed (dbase_scripts/add_canonical_path_column.py)
 --     remarks TEXT NULL
 -- ); 
 
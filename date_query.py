@@ -0,0 +1,176 @@
+"""Parse free-text date searches into index-friendly SQL predicates.
+
+The Verify windows used to cast the date column to text and run several
+``LIKE '%...%'`` patterns, which scans the whole table. ``parse_date_query``
+turns what clerks type into one of four typed forms instead:
+
+    "2024-12-17", "12/17/2024", "December 17 2024"  -> exact date(s)
+    "December 2024", "2024-12", "2024"               -> date range
+    "December 17", "12/17", "17 Dec"                 -> month/day in any year
+    "December"                                       -> month in any year
+
+Exact dates and ranges compare the column directly (btree index); the
+"any year" forms compare ``EXTRACT(MONTH/DAY FROM col)``, which matches the
+expression indexes created by ``dbase_scripts/add_date_search_indexes.py``.
+
+Numeric dates are ambiguous between month-first and day-first; like the old
+search, both readings are matched when both are valid ("05/06/2024" finds
+May 6 and June 5).
+
+Usage:
+    date_query = parse_date_query("December 17")
+    if date_query is None:
+        ...  # not a date
+    predicate, params = date_query.to_sql("date_of_birth")
+"""
+
+import calendar
+import re
+from datetime import date
+
+MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+EXACT = "exact"          # values: list of date
+RANGE = "range"          # values: (start, end) with end exclusive
+MONTH_DAY = "month_day"  # values: list of (month, day)
+MONTH = "month"          # values: month number
+
+_ORDINAL = re.compile(r'(\d+)(st|nd|rd|th)\b')
+_NUMERIC = re.compile(r'^(\d{1,4})[/\-.](\d{1,2})(?:[/\-.](\d{1,4}))?$')
+
+
+class DateQuery:
+    """A parsed date search; see the module docstring for the kinds."""
+
+    def __init__(self, kind, values):
+        self.kind = kind
+        self.values = values
+
+    def __eq__(self, other):
+        return isinstance(other, DateQuery) and (self.kind, self.values) == (other.kind, other.values)
+
+    def __repr__(self):
+        return f"DateQuery({self.kind!r}, {self.values!r})"
+
+    def to_sql(self, column):
+        """Return (predicate, params) matching this query against `column`."""
+        if self.kind == EXACT:
+            if len(self.values) == 1:
+                return f"{column} = %s", (self.values[0],)
+            return f"{column} = ANY(%s)", (list(self.values),)
+        if self.kind == RANGE:
+            start, end = self.values
+            return f"{column} >= %s AND {column} < %s", (start, end)
+        if self.kind == MONTH:
+            return f"EXTRACT(MONTH FROM {column}) = %s", (self.values,)
+        if self.kind == MONTH_DAY:
+            clause = f"(EXTRACT(MONTH FROM {column}) = %s AND EXTRACT(DAY FROM {column}) = %s)"
+            params = tuple(part for pair in self.values for part in pair)
+            return "(" + " OR ".join([clause] * len(self.values)) + ")", params
+        raise ValueError(f"Unknown date query kind: {self.kind}")
+
+
+def _valid_month_day(month, day):
+    # Leap years allowed, so Feb 29 is a valid "any year" search
+    return 1 <= month <= 12 and 1 <= day <= calendar.monthrange(2000, month)[1]
+
+
+def _valid_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _valid_range_year(year):
+    # A range ends on Jan 1 of the next year, which must exist too
+    return date.min.year <= year <= date.max.year - 1
+
+
+def _month_range(year, month):
+    if not _valid_range_year(year):
+        return None
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return DateQuery(RANGE, (start, end))
+
+
+def _dedupe(items):
+    seen = []
+    for item in items:
+        if item not in seen:
+            seen.append(item)
+    return seen
+
+
+def _parse_numeric(text):
+    match = _NUMERIC.match(text)
+    if not match:
+        return None
+    first, second, third = match.groups()
+
+    if len(first) == 4:
+        # ISO order: YYYY-MM[-DD]
+        year, month = int(first), int(second)
+        if third is None:
+            return _month_range(year, month) if 1 <= month <= 12 else None
+        found = _valid_date(year, month, int(third))
+        return DateQuery(EXACT, [found]) if found else None
+
+    a, b = int(first), int(second)
+    if third is None:
+        pairs = _dedupe(p for p in [(a, b), (b, a)] if _valid_month_day(*p))
+        return DateQuery(MONTH_DAY, pairs) if pairs else None
+    if len(third) != 4:
+        return None
+    year = int(third)
+    dates = _dedupe(d for d in [_valid_date(year, a, b), _valid_date(year, b, a)] if d)
+    return DateQuery(EXACT, dates) if dates else None
+
+
+def _parse_words(text):
+    tokens = text.split()
+    months = [MONTHS[t] for t in tokens if t in MONTHS]
+    numbers = [t for t in tokens if t.isdigit()]
+    if len(months) != 1 or len(months) + len(numbers) != len(tokens):
+        return None
+    month = months[0]
+    years = [int(n) for n in numbers if len(n) == 4]
+    days = [int(n) for n in numbers if len(n) <= 2]
+    if len(years) > 1 or len(days) > 1 or len(years) + len(days) != len(numbers):
+        return None
+
+    if years and days:
+        found = _valid_date(years[0], month, days[0])
+        return DateQuery(EXACT, [found]) if found else None
+    if years:
+        return _month_range(years[0], month)
+    if days:
+        return DateQuery(MONTH_DAY, [(month, days[0])]) if _valid_month_day(month, days[0]) else None
+    return DateQuery(MONTH, month)
+
+
+def parse_date_query(text):
+    """Parse a clerk's date search. Returns a DateQuery or None if not a date."""
+    text = (text or "").strip().lower()
+    text = _ORDINAL.sub(r'\1', text.replace(',', ' '))
+    text = " ".join(text.split())
+    if not text:
+        return None
+
+    if re.fullmatch(r'\d{4}', text):
+        year = int(text)
+        if not _valid_range_year(year):
+            return None
+        return DateQuery(RANGE, (date(year, 1, 1), date(year + 1, 1, 1)))
+
+    if ' ' not in text:
+        parsed = _parse_numeric(text)
+        if parsed is not None:
+            return parsed
+    return _parse_words(text)
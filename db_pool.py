@@ -0,0 +1,338 @@
+"""Process-wide PostgreSQL connection pool for rvs-app.
+
+Every window used to open a brand-new ``psycopg2`` connection in its
+``create_connection()`` and close it again in ``closeConnection()``, paying a
+TCP + authentication handshake on almost every click. This module keeps a
+small, bounded set of connections (built from ``db_config.POSTGRES_CONFIG``)
+that windows borrow and hand back instead.
+
+Usage:
+    from db_pool import get_connection, release_connection
+
+    conn = get_connection()
+    try:
+        ...
+    finally:
+        release_connection(conn)
+
+or, for short blocks:
+
+    from db_pool import pooled_connection
+
+    with pooled_connection() as conn:
+        ...
+
+Notes:
+- The pool is bounded (``maxconn``). When every connection is lent out,
+  ``getconn()`` waits up to ``timeout`` seconds and then raises
+  ``PoolTimeoutError`` (a ``psycopg2.Error``), so existing
+  ``except psycopg2.Error`` handlers in the windows keep working.
+- Connections that sat idle longer than ``health_check_interval`` are probed
+  with ``SELECT 1`` before being handed out; closed or broken ones are
+  discarded and transparently replaced with a fresh connection.
+- Returned connections have any open transaction rolled back, so a window
+  that forgot to commit cannot leak state into the next borrower.
+- ``stats()`` exposes per-borrow wait/hold timings for diagnostics.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import psycopg2
+from psycopg2 import extensions, pool
+
+from db_config import POSTGRES_CONFIG
+
+DEFAULT_MINCONN = 1
+DEFAULT_MAXCONN = 10
+DEFAULT_TIMEOUT = 5.0  # seconds to wait for a free connection
+DEFAULT_CONNECT_TIMEOUT = 5  # seconds libpq waits when opening a connection
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0  # seconds a connection may idle unchecked
+RECENT_BORROWS = 200  # how many per-borrow records to keep for stats()
+
+
+class PoolTimeoutError(pool.PoolError):
+    """Raised when no connection became free within the borrow timeout."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of psycopg2 connections."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, minconn: int = DEFAULT_MINCONN,
+                 maxconn: int = DEFAULT_MAXCONN, timeout: float = DEFAULT_TIMEOUT,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL):
+        if maxconn < 1 or minconn < 0 or minconn > maxconn:
+            raise ValueError("Invalid pool size: minconn=%s maxconn=%s" % (minconn, maxconn))
+        self.config = dict(config if config is not None else POSTGRES_CONFIG)
+        # Fail fast when the server is unreachable instead of hanging the caller
+        self.config.setdefault('connect_timeout', DEFAULT_CONNECT_TIMEOUT)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()   # (conn, last_used_monotonic)
+        self._in_use = {}      # id(conn) -> (conn, borrowed_at, owner)
+        self._opened = 0       # live connections owned by the pool
+        self._closed = False
+
+        self._counters = {
+            'borrows': 0,
+            'returns': 0,
+            'connections_created': 0,
+            'connections_discarded': 0,
+            'health_checks': 0,
+            'health_check_failures': 0,
+            'timeouts': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0,
+            'total_hold': 0.0,
+            'max_hold': 0.0,
+        }
+        self._recent = deque(maxlen=RECENT_BORROWS)
+
+        for _ in range(minconn):
+            try:
+                conn = self._connect()
+            except psycopg2.Error as e:
+                # Do not fail app start-up; borrowers will retry on demand.
+                print(f"Error pre-opening pooled connection: {str(e)}")
+                break
+            self._idle.append((conn, time.monotonic()))
+            self._opened += 1
+
+    # ------------------------------------------------------------------ #
+    # Connection lifecycle helpers
+    # ------------------------------------------------------------------ #
+    def _connect(self):
+        conn = psycopg2.connect(**self.config)
+        self._counters['connections_created'] += 1
+        return conn
+
+    def _discard(self, conn):
+        self._counters['connections_discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass  # Connection is already unusable
+
+    def _is_healthy(self, conn, idle_for: float) -> bool:
+        if conn.closed:
+            return False
+        if idle_for < self.health_check_interval:
+            return True
+        self._counters['health_checks'] += 1
+        try:
+            if not conn.autocommit and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            if not conn.autocommit:
+                conn.rollback()
+            return True
+        except Exception:
+            self._counters['health_check_failures'] += 1
+            return False
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def getconn(self, autocommit: bool = True, owner: Optional[str] = None):
+        """Borrow a connection, opening or re-opening one if necessary."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        while True:
+            candidate = None
+            must_open = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise pool.PoolError("connection pool is closed")
+                    if self._idle:
+                        candidate, last_used = self._idle.pop()
+                        break
+                    if self._opened < self.maxconn:
+                        # Reserve the slot now, connect outside the lock.
+                        self._opened += 1
+                        must_open = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            "no database connection available after %.1fs (%d in use)"
+                            % (self.timeout, len(self._in_use))
+                        )
+                    self._cond.wait(remaining)
+
+            if must_open:
+                try:
+                    candidate = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opened -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(candidate, time.monotonic() - last_used):
+                # Broken socket or server restart: drop it and try again.
+                with self._cond:
+                    self._opened -= 1
+                    self._discard(candidate)
+                continue
+
+            try:
+                if candidate.autocommit != autocommit:
+                    candidate.autocommit = autocommit
+            except psycopg2.Error:
+                with self._cond:
+                    self._opened -= 1
+                    self._discard(candidate)
+                continue
+
+            now = time.monotonic()
+            waited = now - started
+            with self._cond:
+                self._in_use[id(candidate)] = (candidate, now, owner)
+                self._counters['borrows'] += 1
+                self._counters['total_wait'] += waited
+                self._counters['max_wait'] = max(self._counters['max_wait'], waited)
+            return candidate
+
+    def putconn(self, conn, discard: bool = False):
+        """Return a borrowed connection to the pool."""
+        if conn is None:
+            return
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+            if entry is None:
+                # Not ours (or returned twice); just make sure it is closed.
+                if not conn.closed:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                return
+
+            _, borrowed_at, owner = entry
+            held = time.monotonic() - borrowed_at
+            self._counters['returns'] += 1
+            self._counters['total_hold'] += held
+            self._counters['max_hold'] = max(self._counters['max_hold'], held)
+            self._recent.append({'owner': owner, 'hold': held})
+
+            if not discard and not self._closed and not conn.closed:
+                try:
+                    status = conn.get_transaction_status()
+                    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                        discard = True
+                    elif status != extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+            else:
+                discard = True
+
+            if discard:
+                self._opened -= 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, autocommit: bool = True, owner: Optional[str] = None):
+        """Context manager that borrows a connection and always returns it."""
+        conn = self.getconn(autocommit=autocommit, owner=owner)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of pool size and per-borrow timing statistics."""
+        with self._cond:
+            snapshot = dict(self._counters)
+            borrows = snapshot['borrows'] or 1
+            returns = snapshot['returns'] or 1
+            snapshot.update({
+                'size': self._opened,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'maxconn': self.maxconn,
+                'avg_wait': self._counters['total_wait'] / borrows,
+                'avg_hold': self._counters['total_hold'] / returns,
+                'borrowers': sorted({owner or '?' for _, _, owner in self._in_use.values()}),
+                'recent': list(self._recent),
+            })
+        return snapshot
+
+    def closeall(self):
+        """Close idle connections and refuse further borrows."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._opened -= 1
+                self._discard(conn)
+            self._cond.notify_all()
+
+
+# ---------------------------------------------------------------------- #
+# Module-level singleton used by the application windows
+# ---------------------------------------------------------------------- #
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_connection(autocommit: bool = True, owner: Optional[str] = None):
+    """Borrow a connection from the process-wide pool."""
+    return get_pool().getconn(autocommit=autocommit, owner=owner)
+
+
+def release_connection(conn, discard: bool = False):
+    """Hand a borrowed connection back to the process-wide pool."""
+    if conn is None:
+        return
+    get_pool().putconn(conn, discard=discard)
+
+
+@contextmanager
+def pooled_connection(autocommit: bool = True, owner: Optional[str] = None):
+    """``with pooled_connection() as conn:`` shortcut for the shared pool."""
+    with get_pool().connection(autocommit=autocommit, owner=owner) as conn:
+        yield conn
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Statistics of the process-wide pool (empty if it was never used)."""
+    return _pool.stats() if _pool is not None else {}
+
+
+def close_pool():
+    """Close the process-wide pool; called once on application exit."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
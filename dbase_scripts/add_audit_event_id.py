@@ -0,0 +1,35 @@
+import psycopg2
+from db_config import POSTGRES_CONFIG
+
+def add_audit_event_id():
+    """Add the event_id idempotency key used when replaying the local audit spool."""
+    cursor = None
+    conn = None
+    try:
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+
+        # Existing rows keep a NULL event_id; NULLs never conflict in a unique index
+        cursor.execute("""
+            ALTER TABLE audit_log
+            ADD COLUMN IF NOT EXISTS event_id UUID;
+        """)
+
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_audit_event_id
+            ON audit_log(event_id);
+        """)
+
+        print("Successfully added event_id column to audit_log table")
+
+    except psycopg2.Error as e:
+        print(f"Error adding event_id column: {str(e)}")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_audit_event_id()
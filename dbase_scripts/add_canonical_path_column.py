@@ -0,0 +1,82 @@
+import psycopg2
+from db_config import POSTGRES_CONFIG
+
+TABLES = ["birth_index", "death_index", "marriage_index"]
+
+def add_canonical_path_column():
+    """Add an indexed canonical_path column to the index tables and backfill it.
+
+    Lookups used to filter on normalize_path(file_path), which forces a full
+    scan because the plpgsql function is evaluated for every row. The tagging
+    windows now write canonical_path alongside file_path; the trigger keeps it
+    correct for any other writer (older clients, manual SQL).
+    """
+
+    sql_commands = [
+        """
+        CREATE OR REPLACE FUNCTION set_canonical_path()
+        RETURNS trigger AS $$
+        BEGIN
+            NEW.canonical_path := replace(NEW.file_path, E'\\\\', '/');
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    ]
+    for table in TABLES:
+        sql_commands += [
+            f"""
+            ALTER TABLE {table}
+            ADD COLUMN IF NOT EXISTS canonical_path VARCHAR(255);
+            """,
+            f"""
+            UPDATE {table}
+            SET canonical_path = replace(file_path, E'\\\\', '/')
+            WHERE canonical_path IS DISTINCT FROM replace(file_path, E'\\\\', '/');
+            """,
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_{table}_canonical_path
+            ON {table}(canonical_path);
+            """,
+            f"""
+            DROP TRIGGER IF EXISTS trg_{table}_canonical_path ON {table};
+            """,
+            f"""
+            CREATE TRIGGER trg_{table}_canonical_path
+            BEFORE INSERT OR UPDATE OF file_path ON {table}
+            FOR EACH ROW EXECUTE FUNCTION set_canonical_path();
+            """,
+            f"""
+            ANALYZE {table};
+            """,
+        ]
+
+    conn = None
+    try:
+        print("Connecting to database...")
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        cur = conn.cursor()
+
+        for sql in sql_commands:
+            print(f"\nExecuting: {sql.strip()}")
+            cur.execute(sql)
+            if cur.rowcount and cur.rowcount > 0:
+                print(f"✅ {cur.rowcount} rows updated")
+            else:
+                print("✅ Command executed successfully")
+
+        conn.commit()
+        print("\n✅ Successfully added canonical_path to the index tables!")
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        if conn is not None:
+            conn.rollback()
+        print(f"\n❌ Error modifying tables: {error}")
+    finally:
+        if conn is not None:
+            conn.close()
+            print("\nDatabase connection closed.")
+
+if __name__ == "__main__":
+    print("Starting migration to add canonical_path column...")
+    add_canonical_path_column()
@@ -0,0 +1,64 @@
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from db_config import POSTGRES_CONFIG
+
+# table -> event date column searched by date_query.py
+DATE_COLUMNS = {
+    "birth_index": "date_of_birth",
+    "death_index": "date_of_death",
+    "marriage_index": "date_of_marriage",
+}
+
+def add_date_search_indexes():
+    """Index the event date columns for the Verify window's date search.
+
+    - a plain btree serves exact dates and ranges ("2024-12-17", "2024")
+    - an expression index on (EXTRACT(MONTH), EXTRACT(DAY)) serves the
+      "any year" forms ("December 17", "December"); the expressions must stay
+      identical to DateQuery.to_sql() for the planner to use it
+    """
+    conn = None
+    cursor = None
+    try:
+        print("Connecting to database...")
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+
+        for table, column in DATE_COLUMNS.items():
+            indexes = [
+                (f"idx_{table}_{column}", f"({column})"),
+                (f"idx_{table}_{column}_month_day",
+                 f"((EXTRACT(MONTH FROM {column})), (EXTRACT(DAY FROM {column})))"),
+            ]
+            for index_name, definition in indexes:
+                # A failed CONCURRENTLY build leaves an INVALID index behind
+                cursor.execute("""
+                    SELECT NOT i.indisvalid
+                    FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname = %s
+                """, (index_name,))
+                row = cursor.fetchone()
+                if row and row[0]:
+                    print(f"Dropping invalid index {index_name}...")
+                    cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+
+                print(f"\nBuilding {index_name} on {table}{definition}...")
+                cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table} {definition};")
+                print("✅ Index ready")
+            cursor.execute(f"ANALYZE {table};")
+
+        print("\n✅ Successfully added date search indexes!")
+
+    except psycopg2.Error as e:
+        print(f"\n❌ Error adding date indexes: {str(e)}")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+            print("\nDatabase connection closed.")
+
+if __name__ == "__main__":
+    print("Starting migration to add date search indexes...")
+    add_date_search_indexes()
@@ -0,0 +1,102 @@
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from psycopg2.extras import execute_values
+from db_config import POSTGRES_CONFIG
+from name_keys import name_keys
+from name_search import NAME_COLUMNS
+
+BATCH_SIZE = 1000
+
+def backfill_table(cursor, table, columns):
+    """Compute <column>_norm/<column>_phonetic for existing rows, in id order."""
+    key_columns = [key for col in columns for key in (f"{col}_norm", f"{col}_phonetic")]
+    assignments = ", ".join(f"{key} = v.{key}" for key in key_columns)
+    template = "(%s" + ", %s, %s::text[]" * len(columns) + ")"
+    last_id = 0
+    updated = 0
+    while True:
+        cursor.execute(f"""
+            SELECT id, {', '.join(columns)} FROM {table}
+            WHERE id > %s ORDER BY id LIMIT %s
+        """, (last_id, BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            record = [row[0]]
+            for name in row[1:]:
+                record.extend(name_keys(name))
+            values.append(tuple(record))
+        execute_values(cursor, f"""
+            UPDATE {table} AS t SET {assignments}
+            FROM (VALUES %s) AS v(id, {', '.join(key_columns)})
+            WHERE t.id = v.id
+        """, values, template=template, page_size=BATCH_SIZE)
+        last_id = rows[-1][0]
+        updated += len(rows)
+        print(f"  {updated} rows...")
+    return updated
+
+def add_name_keys():
+    """Add, backfill and index the fuzzy-search name keys (see name_keys.py).
+
+    Keys are computed in Python so the tagging windows, this backfill and
+    the search all use exactly the same normalization and phonetic rules.
+    """
+    conn = None
+    cursor = None
+    try:
+        print("Connecting to database...")
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+        for table, columns in NAME_COLUMNS.items():
+            print(f"\nAdding name keys to {table}...")
+            for col in columns:
+                cursor.execute(f"""
+                    ALTER TABLE {table}
+                    ADD COLUMN IF NOT EXISTS {col}_norm TEXT,
+                    ADD COLUMN IF NOT EXISTS {col}_phonetic TEXT[];
+                """)
+
+            print(f"Backfilling {table}...")
+            print(f"✅ {backfill_table(cursor, table, columns)} rows updated")
+
+            for col in columns:
+                indexes = [
+                    (f"idx_{table}_{col}_norm_trgm", f"USING gin ({col}_norm gin_trgm_ops)"),
+                    (f"idx_{table}_{col}_phonetic", f"USING gin ({col}_phonetic)"),
+                ]
+                for index_name, definition in indexes:
+                    # A failed CONCURRENTLY build leaves an INVALID index behind
+                    cursor.execute("""
+                        SELECT NOT i.indisvalid
+                        FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                        WHERE c.relname = %s
+                    """, (index_name,))
+                    row = cursor.fetchone()
+                    if row and row[0]:
+                        print(f"Dropping invalid index {index_name}...")
+                        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+                    print(f"Building {index_name}...")
+                    cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table} {definition};")
+            cursor.execute(f"ANALYZE {table};")
+
+        print("\n✅ Successfully added fuzzy name keys!")
+
+    except psycopg2.Error as e:
+        print(f"\n❌ Error adding name keys: {str(e)}")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+            print("\nDatabase connection closed.")
+
+if __name__ == "__main__":
+    print("Starting migration to add fuzzy name keys...")
+    add_name_keys()
@@ -0,0 +1,91 @@
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from db_config import POSTGRES_CONFIG
+from reg_no_index import unique_index_name
+
+TABLES = ["birth_index", "death_index", "marriage_index"]
+
+# Same rule as filename_parser.normalize_reg_no: digit groups without
+# leading zeros, joined with '-'; NULL when there are no digits
+NORMALIZE_FUNCTION = r"""
+    CREATE OR REPLACE FUNCTION normalize_reg_no(reg_no text)
+    RETURNS text AS $$
+        SELECT string_agg((m[1])::numeric::text, '-' ORDER BY n)
+        FROM regexp_matches(reg_no, '\d+', 'g') WITH ORDINALITY AS t(m, n)
+    $$ LANGUAGE sql IMMUTABLE;
+"""
+
+def add_reg_no_unique_indexes():
+    """Make registry numbers unique per registry and registration year.
+
+    Each index table gets a unique index on
+    (EXTRACT(YEAR FROM date_of_reg), normalize_reg_no(reg_no)); the save
+    queue relies on its unique_violation instead of a SELECT before every
+    save, which was also racy between two clerks. Rows without digits in
+    reg_no or without date_of_reg are not constrained.
+
+    Existing duplicates are listed and that table is skipped; fix them and
+    run the script again. Until a table has its index, the save queue falls
+    back to checking registry numbers before each save.
+    """
+    conn = None
+    cursor = None
+    try:
+        print("Connecting to database...")
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+
+        cursor.execute(NORMALIZE_FUNCTION)
+        print("✅ normalize_reg_no() ready")
+
+        for table in TABLES:
+            index_name = unique_index_name(table)
+            cursor.execute(f"""
+                SELECT EXTRACT(YEAR FROM date_of_reg)::int, normalize_reg_no(reg_no),
+                       array_agg(file_path ORDER BY file_path)
+                FROM {table}
+                WHERE date_of_reg IS NOT NULL AND normalize_reg_no(reg_no) IS NOT NULL
+                GROUP BY 1, 2
+                HAVING COUNT(*) > 1
+                ORDER BY 1, 2
+            """)
+            duplicates = cursor.fetchall()
+            if duplicates:
+                print(f"\n❌ {len(duplicates)} duplicate registry numbers in {table}, skipping {index_name}:")
+                for year, reg_no, files in duplicates:
+                    print(f"   {year} {reg_no}: {', '.join(files)}")
+                continue
+
+            # A failed CONCURRENTLY build leaves an INVALID index behind
+            cursor.execute("""
+                SELECT NOT i.indisvalid
+                FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s
+            """, (index_name,))
+            row = cursor.fetchone()
+            if row and row[0]:
+                print(f"Dropping invalid index {index_name}...")
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+
+            print(f"\nBuilding {index_name} on {table}...")
+            cursor.execute(f"""
+                CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+                ON {table} ((EXTRACT(YEAR FROM date_of_reg)), (normalize_reg_no(reg_no)));
+            """)
+            print("✅ Index ready")
+
+        print("\n✅ Finished adding registry number unique indexes!")
+
+    except psycopg2.Error as e:
+        print(f"\n❌ Error adding registry number indexes: {str(e)}")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+            print("\nDatabase connection closed.")
+
+if __name__ == "__main__":
+    print("Starting migration to add registry number unique indexes...")
+    add_reg_no_unique_indexes()
@@ -0,0 +1,63 @@
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from db_config import POSTGRES_CONFIG
+from unified_search import SEARCH_VECTOR_COLUMNS, search_vector_sql
+
+def add_search_vectors():
+    """Add the full-text search_tsv column and GIN index used by unified_search.py.
+
+    search_tsv is a STORED generated column (PostgreSQL 12+), so PostgreSQL
+    keeps it in sync on every INSERT/UPDATE without any application code.
+    Adding it rewrites each table once under an exclusive lock; run this
+    outside office hours. The GIN index is then built CONCURRENTLY.
+    """
+    conn = None
+    cursor = None
+    try:
+        print("Connecting to database...")
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+
+        for table in SEARCH_VECTOR_COLUMNS:
+            print(f"\nAdding search_tsv to {table}...")
+            cursor.execute(f"""
+                ALTER TABLE {table}
+                ADD COLUMN IF NOT EXISTS search_tsv tsvector
+                GENERATED ALWAYS AS ({search_vector_sql(table)}) STORED;
+            """)
+
+            index_name = f"idx_{table}_search_tsv"
+            # A failed CONCURRENTLY build leaves an INVALID index behind
+            cursor.execute("""
+                SELECT NOT i.indisvalid
+                FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s
+            """, (index_name,))
+            row = cursor.fetchone()
+            if row and row[0]:
+                print(f"Dropping invalid index {index_name}...")
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+
+            print(f"Building {index_name}...")
+            cursor.execute(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+                ON {table} USING gin (search_tsv);
+            """)
+            cursor.execute(f"ANALYZE {table};")
+            print("✅ Done")
+
+        print("\n✅ Successfully added full-text search vectors!")
+
+    except psycopg2.Error as e:
+        print(f"\n❌ Error adding search vectors: {str(e)}")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+            print("\nDatabase connection closed.")
+
+if __name__ == "__main__":
+    print("Starting migration to add full-text search vectors...")
+    add_search_vectors()
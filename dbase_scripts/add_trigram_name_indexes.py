@@ -0,0 +1,64 @@
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from db_config import POSTGRES_CONFIG
+
+# (index name, table, column) - every column searched by name_search.py
+TRIGRAM_INDEXES = [
+    ("idx_birth_index_name_trgm", "birth_index", "name"),
+    ("idx_death_index_name_trgm", "death_index", "name"),
+    ("idx_marriage_index_husband_name_trgm", "marriage_index", "husband_name"),
+    ("idx_marriage_index_wife_name_trgm", "marriage_index", "wife_name"),
+]
+
+def add_trigram_name_indexes():
+    """Enable pg_trgm and build GIN trigram indexes on the name columns.
+
+    Indexes are built CONCURRENTLY so clerks can keep tagging while the
+    migration runs; that requires autocommit, so each statement stands alone.
+    """
+    conn = None
+    cursor = None
+    try:
+        print("Connecting to database...")
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        print("✅ pg_trgm extension enabled")
+
+        for index_name, table, column in TRIGRAM_INDEXES:
+            # A failed CONCURRENTLY build leaves an INVALID index behind that
+            # IF NOT EXISTS would skip; drop it so the build is retried.
+            cursor.execute("""
+                SELECT NOT i.indisvalid
+                FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s
+            """, (index_name,))
+            row = cursor.fetchone()
+            if row and row[0]:
+                print(f"Dropping invalid index {index_name}...")
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+
+            print(f"\nBuilding {index_name} on {table}({column})...")
+            cursor.execute(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+                ON {table} USING gin ({column} gin_trgm_ops);
+            """)
+            cursor.execute(f"ANALYZE {table};")
+            print("✅ Index ready")
+
+        print("\n✅ Successfully added trigram name indexes!")
+
+    except psycopg2.Error as e:
+        print(f"\n❌ Error adding trigram indexes: {str(e)}")
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+            print("\nDatabase connection closed.")
+
+if __name__ == "__main__":
+    print("Starting migration to add trigram name indexes...")
+    add_trigram_name_indexes()
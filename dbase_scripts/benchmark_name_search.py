@@ -0,0 +1,76 @@
+"""Benchmark name search: legacy LOWER() LIKE variants vs the trigram search.
+
+Runs each query several times against every index table and prints the row
+count of the table, the median/worst latency of both forms and whether the
+planner used the trigram index. Run from the project root after
+add_trigram_name_indexes.py:
+
+    python -m dbase_scripts.benchmark_name_search "dela cruz" santos maria
+"""
+import statistics
+import sys
+import time
+
+import psycopg2
+from db_config import POSTGRES_CONFIG
+from name_search import NAME_COLUMNS, DATE_COLUMNS, build_name_search
+
+RUNS = 5
+DEFAULT_QUERIES = ["cruz", "dela cruz", "maria santos", "reyes"]
+
+
+def legacy_name_search(table, query):
+    """The query verify.py used before the trigram indexes."""
+    columns = NAME_COLUMNS[table]
+    # Four LIKE clauses, alternating husband/wife for marriages
+    clauses = [f"LOWER({columns[i % len(columns)]}) LIKE LOWER(%s)" for i in range(4)]
+    sql = f"""
+        SELECT file_path FROM {table}
+        WHERE ({' OR '.join(clauses)})
+        ORDER BY {DATE_COLUMNS[table]} DESC
+    """
+    variations = [f'%{query}%', f'%{query.lower()}%', f'%{query.upper()}%', f'%{query.title()}%']
+    return sql, tuple(variations)
+
+
+def time_query(cursor, sql, params):
+    timings = []
+    rows = 0
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = len(cursor.fetchall())
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings), rows
+
+
+def uses_trigram_index(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, params)
+    plan = "\n".join(row[0] for row in cursor.fetchall())
+    return "_trgm" in plan
+
+
+def benchmark_name_search(queries):
+    conn = psycopg2.connect(**POSTGRES_CONFIG)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        for table in NAME_COLUMNS:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            total = cursor.fetchone()[0]
+            print(f"\n{table} ({total:,} rows)")
+            print(f"  {'query':<16} {'legacy ms (med/max)':>22} {'trigram ms (med/max)':>22} {'rows':>6}  index")
+            for query in queries:
+                old_sql, old_params = legacy_name_search(table, query)
+                new_sql, new_params = build_name_search(table, query)
+                old_med, old_max, _ = time_query(cursor, old_sql, old_params)
+                new_med, new_max, rows = time_query(cursor, new_sql, new_params)
+                indexed = "yes" if uses_trigram_index(cursor, new_sql, new_params) else "NO"
+                print(f"  {query:<16} {old_med:>12.1f} / {old_max:>7.1f} {new_med:>12.1f} / {new_max:>7.1f} {rows:>6}  {indexed}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    benchmark_name_search(sys.argv[1:] or DEFAULT_QUERIES)
@@ -0,0 +1,56 @@
+import psycopg2
+from db_config import POSTGRES_CONFIG
+
+def create_tag_claims_table():
+    """Create the tag_claims table used by work_queue.py.
+
+    One row per PDF of every folder opened in a tagging window; claimed_by /
+    lease_expires record which clerk currently holds it.
+    """
+
+    sql_commands = [
+        """
+        CREATE TABLE IF NOT EXISTS tag_claims (
+            record_type TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            folder TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            claimed_by TEXT,
+            claimed_at TIMESTAMP,
+            lease_expires TIMESTAMP,
+            PRIMARY KEY (record_type, file_path)
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tag_claims_folder
+        ON tag_claims(record_type, folder, position);
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tag_claims_claimed_by
+        ON tag_claims(record_type, claimed_by)
+        WHERE claimed_by IS NOT NULL;
+        """,
+    ]
+
+    conn = None
+    try:
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        cur = conn.cursor()
+
+        for sql in sql_commands:
+            cur.execute(sql)
+
+        conn.commit()
+
+        print("Successfully created tag_claims table!")
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        if conn is not None:
+            conn.rollback()
+        print(f"Error creating table: {error}")
+    finally:
+        if conn is not None:
+            conn.close()
+
+if __name__ == "__main__":
+    create_tag_claims_table()
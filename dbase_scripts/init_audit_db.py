@@ -33,7 +33,8 @@ def init_audit_db():
             username VARCHAR(100) NOT NULL,
             action VARCHAR(255) NOT NULL,
             details TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            event_id UUID UNIQUE
         )
     ''')
 
@@ -14,7 +14,7 @@ import requests
 import json
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
 from datetime import datetime, timedelta 
 from urllib.parse import urlparse
 from flask_server.app import get_access_token
@@ -200,14 +200,13 @@ class eVerifyForm(QWidget):
     def create_connection(self):
         """Create a new PostgreSQL database connection"""
         if self.connection is None:
-            self.connection = psycopg2.connect(**POSTGRES_CONFIG)
-            self.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            self.connection = get_connection(owner=self.__class__.__name__)
         return self.connection
 
     def closeConnection(self):
         """Safely close the PostgreSQL connection"""
         if self.connection:
-            self.connection.close()
+            release_connection(self.connection)
             self.connection = None
 
     def manual_check_if_already_verified(self):
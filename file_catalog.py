@@ -0,0 +1,379 @@
+"""Local catalog of the PDF files on the \\\\server\\MCR archive share.
+
+The filename Search windows used to ``os.walk`` a whole year folder over SMB
+on every click. ``FileCatalog`` keeps what those walks found in a small
+SQLite file (WAL mode) next to the application - one row per PDF with its
+path, registry, year, size, mtime and pre-tokenized lowercase name terms -
+so searches become local queries.
+
+``refresh()`` is incremental: every directory's mtime is remembered, and a
+directory is listed again only when its mtime changed (a file was added,
+removed or renamed in it). Unchanged directories cost one stat each, and
+their subdirectories are taken from the catalog instead of the share.
+
+Each row also carries the event date (ISO text) and normalised registry
+number that ``filename_parser`` finds in the file name, indexed so Date and
+Reg No. searches are exact lookups rather than substring scans. (Name
+searches use the terms, which already hold every word of the name.)
+
+Usage:
+    catalog = get_catalog()
+    catalog.refresh(r"\\\\server\\MCR\\LIVE BIRTH", "2001")
+    names = catalog.search_terms(r"\\\\server\\MCR\\LIVE BIRTH", "2001", "dela cruz")
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from date_query import EXACT, RANGE, MONTH_DAY, MONTH
+from filename_parser import parse_filename, normalize_reg_no
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "file_catalog.db")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms of a file name or query."""
+    return _TOKEN.findall(text.lower())
+
+
+def name_terms(file_name: str) -> str:
+    """Space-padded term string stored for a file name (extension dropped)."""
+    stem = os.path.splitext(file_name)[0]
+    return " " + " ".join(tokenize(stem)) + " "
+
+
+def _norm(path: str) -> str:
+    return os.path.normpath(path)
+
+
+def _parsed_values(file_name: str) -> tuple:
+    """(event_date ISO text, reg_no) stored for a file name."""
+    event_date, reg_no = parse_filename(file_name)
+    return event_date.isoformat() if event_date else None, reg_no
+
+
+class FileCatalog:
+    """SQLite-backed index of archive PDFs, refreshed by directory mtime."""
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self.generation = 0  # bumped whenever files are added or removed
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                root TEXT NOT NULL,
+                registry TEXT NOT NULL,
+                year TEXT NOT NULL,
+                dir TEXT NOT NULL,
+                name TEXT NOT NULL,
+                name_lower TEXT NOT NULL,
+                terms TEXT NOT NULL,
+                size INTEGER,
+                mtime REAL,
+                event_date TEXT,
+                reg_no TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_root_year ON files(root, year);
+            CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                parent TEXT,
+                mtime REAL,
+                scanned_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent);
+        """)
+        self._add_parsed_columns()
+        self._conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_files_root_event_date ON files(root, event_date);
+            CREATE INDEX IF NOT EXISTS idx_files_root_month_day ON files(root, substr(event_date, 6, 5));
+            CREATE INDEX IF NOT EXISTS idx_files_root_reg_no ON files(root, reg_no);
+        """)
+
+    def _add_parsed_columns(self):
+        """Upgrade catalogs created before the parsed columns existed, then backfill them."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        if 'person' in columns:
+            # Stored by earlier versions but never searched
+            try:
+                self._conn.execute("ALTER TABLE files DROP COLUMN person")
+            except sqlite3.OperationalError:
+                pass  # SQLite before 3.35: the column stays, unused
+        if 'event_date' in columns:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for column in ('event_date', 'reg_no'):
+                self._conn.execute(f"ALTER TABLE files ADD COLUMN {column} TEXT")
+            rows = self._conn.execute("SELECT id, name FROM files").fetchall()
+            self._conn.executemany(
+                "UPDATE files SET event_date = ?, reg_no = ? WHERE id = ?",
+                [_parsed_values(name) + (file_id,) for file_id, name in rows])
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------------ #
+    # Refresh
+    # ------------------------------------------------------------------ #
+    def refresh(self, root: str, year: Optional[str] = None,
+                should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+        """Bring the catalog up to date for `root` (or one year folder under it).
+
+        Returns counters: dirs_checked, dirs_rescanned, files_added,
+        files_removed, and missing=1 when the year folder does not exist.
+        `should_stop` is polled between directories; when it returns True the
+        walk ends early with stopped=1 (what was scanned so far is kept).
+
+        Raises FileNotFoundError, keeping the catalog as it is, when `root`
+        itself cannot be reached (an offline share looks like a missing
+        folder); only folders that vanished under a reachable root are
+        forgotten.
+        """
+        root = _norm(root)
+        start = _norm(os.path.join(root, year)) if year else root
+        stats = {'dirs_checked': 0, 'dirs_rescanned': 0, 'entries_listed': 0,
+                 'files_added': 0, 'files_removed': 0, 'missing': 0, 'stopped': 0}
+
+        stack = [start]
+        while stack:
+            if should_stop is not None and should_stop():
+                stats['stopped'] = 1
+                break
+            directory = stack.pop()
+            stats['dirs_checked'] += 1
+            try:
+                dir_mtime = os.stat(directory).st_mtime
+            except FileNotFoundError:
+                if directory == root or not os.path.isdir(root):
+                    raise
+                if directory == start:
+                    stats['missing'] = 1
+                stats['files_removed'] += self._forget_tree(directory)
+                continue
+
+            with self._lock:
+                row = self._conn.execute("SELECT mtime FROM dirs WHERE path = ?", (directory,)).fetchone()
+                if row is not None and row[0] == dir_mtime:
+                    # Listing unchanged: reuse the known subdirectories
+                    stack.extend(r[0] for r in self._conn.execute(
+                        "SELECT path FROM dirs WHERE parent = ?", (directory,)))
+                    continue
+
+            subdirs = self._rescan(root, directory, dir_mtime, stats)
+            stats['dirs_rescanned'] += 1
+            stack.extend(subdirs)
+        return stats
+
+    def _rescan(self, root, directory, dir_mtime, stats):
+        pdfs = {}
+        subdirs = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                stats['entries_listed'] += 1
+                try:
+                    if entry.is_dir():
+                        subdirs.append(_norm(entry.path))
+                    elif entry.is_file() and entry.name.lower().endswith('.pdf'):
+                        # On Windows scandir returns size/mtime with the listing
+                        info = entry.stat()
+                        pdfs[_norm(entry.path)] = (entry.name, info.st_size, info.st_mtime)
+                except OSError:
+                    continue  # Entry vanished or is unreadable
+
+        relative = os.path.relpath(directory, root)
+        year = relative.split(os.sep)[0] if relative != os.curdir else ""
+        registry = os.path.basename(root)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                known = {r[0] for r in self._conn.execute("SELECT path FROM files WHERE dir = ?", (directory,))}
+                gone = known - pdfs.keys()
+                self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in gone])
+                self._conn.executemany("""
+                    INSERT INTO files (path, root, registry, year, dir, name, name_lower, terms, size, mtime,
+                                       event_date, reg_no)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime,
+                        event_date = excluded.event_date, reg_no = excluded.reg_no
+                """, [
+                    (path, root, registry, year, directory, name, name.lower(), name_terms(name), size, mtime)
+                    + _parsed_values(name)
+                    for path, (name, size, mtime) in pdfs.items()
+                ])
+                stale_dirs = [r[0] for r in self._conn.execute(
+                    "SELECT path FROM dirs WHERE parent = ?", (directory,)) if r[0] not in subdirs]
+                self._conn.execute("""
+                    INSERT INTO dirs (path, parent, mtime, scanned_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, scanned_at = excluded.scanned_at
+                """, (directory, os.path.dirname(directory), dir_mtime, time.time()))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            added = len(pdfs.keys() - known)
+            if added or gone:
+                self.generation += 1
+        stats['files_added'] += added
+        stats['files_removed'] += len(gone)
+        for stale in stale_dirs:
+            stats['files_removed'] += self._forget_tree(stale)
+        return subdirs
+
+    def _forget_tree(self, directory):
+        """Drop a directory that disappeared from the share, with everything below it."""
+        prefix = directory.rstrip(os.sep) + os.sep
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed = self._conn.execute(
+                    "DELETE FROM files WHERE dir = ? OR substr(dir, 1, ?) = ?",
+                    (directory, len(prefix), prefix)).rowcount
+                self._conn.execute(
+                    "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (directory, len(prefix), prefix))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if removed:
+                self.generation += 1
+        return removed
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+    def _scope(self, root, year):
+        if year:
+            return "root = ? AND year = ?", [_norm(root), year]
+        return "root = ?", [_norm(root)]
+
+    def search_terms(self, root: str, year: Optional[str], query: str) -> List[str]:
+        """File names under root/year (every year if empty) containing every query term."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scope, params = self._scope(root, year)
+        sql = f"SELECT name FROM files WHERE {scope}" + " AND instr(terms, ?) > 0" * len(terms)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY name", params + terms).fetchall()
+        return [r[0] for r in rows]
+
+    def search_substring(self, root: str, year: Optional[str], text: str) -> List[str]:
+        """File names under root/year containing `text` verbatim (date/reg-no search)."""
+        text = text.lower()
+        if not text:
+            return []
+        scope, params = self._scope(root, year)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT name FROM files WHERE {scope} AND instr(name_lower, ?) > 0 ORDER BY name",
+                params + [text]).fetchall()
+        return [r[0] for r in rows]
+
+    def search_date(self, root: str, year: Optional[str], date_query) -> List[str]:
+        """File names whose parsed event date matches a ``date_query.DateQuery``."""
+        if date_query.kind == EXACT:
+            dates = [d.isoformat() for d in date_query.values]
+            predicate, values = f"event_date IN ({', '.join('?' * len(dates))})", dates
+        elif date_query.kind == RANGE:
+            start, end = date_query.values
+            predicate, values = "event_date >= ? AND event_date < ?", [start.isoformat(), end.isoformat()]
+        elif date_query.kind == MONTH_DAY:
+            month_days = [f"{month:02d}-{day:02d}" for month, day in date_query.values]
+            predicate = f"substr(event_date, 6, 5) IN ({', '.join('?' * len(month_days))})"
+            values = month_days
+        elif date_query.kind == MONTH:
+            predicate, values = "substr(event_date, 6, 2) = ?", [f"{date_query.values:02d}"]
+        else:
+            raise ValueError(f"Unknown date query kind: {date_query.kind}")
+        scope, params = self._scope(root, year)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT name FROM files WHERE {scope} AND {predicate} ORDER BY name", params + values).fetchall()
+        return [r[0] for r in rows]
+
+    def search_reg_no(self, root: str, year: Optional[str], text: str) -> List[str]:
+        """File names whose parsed registry number equals `text` after normalisation."""
+        reg_no = normalize_reg_no(text)
+        if reg_no is None:
+            return []
+        scope, params = self._scope(root, year)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT name FROM files WHERE {scope} AND reg_no = ? ORDER BY name", params + [reg_no]).fetchall()
+        return [r[0] for r in rows]
+
+    def list_pdfs(self, directory: str, mtime: Optional[float] = None) -> Optional[List[str]]:
+        """PDF names directly in `directory` as of the last scan.
+
+        None if it was never scanned, or if `mtime` (the folder's current
+        mtime) differs from the scanned one, i.e. the listing is stale.
+        """
+        directory = _norm(directory)
+        with self._lock:
+            row = self._conn.execute("SELECT mtime FROM dirs WHERE path = ?", (directory,)).fetchone()
+            if row is None or (mtime is not None and row[0] != mtime):
+                return None
+            rows = self._conn.execute("SELECT name FROM files WHERE dir = ?", (directory,)).fetchall()
+        return [r[0] for r in rows]
+
+    def entries(self, root: str) -> List[tuple]:
+        """(id, year, name, terms) of every PDF under root, for in-memory indexes."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, year, name, terms FROM files WHERE root = ?", (_norm(root),)).fetchall()
+
+    def years(self, root: str) -> List[str]:
+        """Year folders under root that hold catalogued files, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT year FROM files WHERE root = ? ORDER BY year DESC", (_norm(root),)).fetchall()
+        return [r[0] for r in rows]
+
+    def has_year(self, root: str, year: Optional[str]) -> bool:
+        """Whether root/year (or root itself) has been scanned before."""
+        path = _norm(os.path.join(root, year)) if year else _norm(root)
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM dirs WHERE path = ?", (path,)).fetchone() is not None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+_catalog: Optional[FileCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> FileCatalog:
+    """Return the process-wide catalog, opening it on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = FileCatalog()
+    return _catalog
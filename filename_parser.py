@@ -0,0 +1,108 @@
+"""Pull the event date and registry number out of scan file names.
+
+Scanned records are saved under names typed by the scanning clerk, e.g.
+
+    DELA CRUZ, JUAN 12-17-1990.pdf
+    SANTOS MARIA 1990-12-17 REG NO 1990-01234.pdf
+    REYES, ANA DEC 17 1990 1234.pdf
+
+``parse_filename`` recognises those conventions so the file catalog can
+store the event date and registry number as typed, indexed columns instead
+of relying on substring matches of the raw name ("Dec 17 1990" never
+matched "12-17-1990").
+
+Dates: ISO ``YYYY-MM-DD``, numeric ``MM-DD-YYYY`` (day-first when month-first
+is impossible), compact ``YYYYMMDD``, and month names in either order
+("DEC 17 1990", "17 DECEMBER 1990"). ``-``, ``_``, ``.`` and ``/`` separate
+numeric parts.
+
+Registry numbers: an explicit ``REG NO``/``RN``/``#`` marker, otherwise a
+``YY(YY)-NNNN`` year-sequence, otherwise a lone number left after the date.
+They are normalised by ``normalize_reg_no`` (digit groups without leading
+zeros, joined by ``-``) so "1990-01234", "1990 1234" and "1990/1234" agree.
+
+Usage:
+    parsed = parse_filename("DELA CRUZ, JUAN 12-17-1990.pdf")
+    parsed.event_date  # date(1990, 12, 17)
+"""
+
+import os
+import re
+from collections import namedtuple
+from datetime import date
+
+from date_query import MONTHS
+
+ParsedFileName = namedtuple("ParsedFileName", ["event_date", "reg_no"])
+
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_SEP = r"[-_./]"
+
+_DATE_PATTERNS = [
+    # (regex, order of year/month/day groups)
+    (re.compile(rf"(?<!\d)(\d{{4}}){_SEP}(\d{{1,2}}){_SEP}(\d{{1,2}})(?!\d)"), "ymd"),
+    (re.compile(rf"(?<!\d)(\d{{1,2}}){_SEP}(\d{{1,2}}){_SEP}(\d{{4}})(?!\d)"), "mdy"),
+    (re.compile(rf"\b({_MONTH_NAMES})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})(?!\d)", re.I), "Mdy"),
+    (re.compile(rf"(?<!\d)(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_NAMES})\.?,?\s+(\d{{4}})(?!\d)", re.I), "dMy"),
+    (re.compile(r"(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)"), "ymd"),
+]
+
+_REG_PATTERNS = [
+    re.compile(r"\b(?:reg(?:istry)?\.?\s*(?:no\.?|number|#)|rn)\s*[:#\-]?\s*(\d[\d\-/ ]*\d|\d)", re.I),
+    re.compile(r"#\s*(\d[\d\-/]*)"),
+    re.compile(r"(?<![\d\-])(\d{2,4}-\d{1,6})(?![\d\-])"),
+    re.compile(r"(?<![\d\-])(\d{1,7})(?![\d\-])"),
+]
+
+
+def _make_date(year, month, day):
+    try:
+        found = date(year, month, day)
+    except ValueError:
+        return None
+    return found if 1800 <= year <= 2100 else None
+
+
+def _match_date(match, order):
+    a, b, c = match.groups()
+    if order == "ymd":
+        return _make_date(int(a), int(b), int(c))
+    if order == "mdy":
+        # Month-first is the office convention; fall back to day-first
+        return _make_date(int(c), int(a), int(b)) or _make_date(int(c), int(b), int(a))
+    if order == "Mdy":
+        return _make_date(int(c), MONTHS[a.lower()], int(b))
+    return _make_date(int(c), MONTHS[b.lower()], int(a))
+
+
+def normalize_reg_no(text):
+    """Canonical registry number: digit groups without leading zeros, '-'-joined."""
+    groups = re.findall(r"\d+", text or "")
+    if not groups:
+        return None
+    return "-".join(str(int(group)) for group in groups)
+
+
+def parse_filename(file_name):
+    """Return ParsedFileName(event_date, reg_no); missing parts are None."""
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    rest = stem
+
+    event_date = None
+    for pattern, order in _DATE_PATTERNS:
+        for match in pattern.finditer(rest):
+            event_date = _match_date(match, order)
+            if event_date:
+                rest = rest[:match.start()] + " " + rest[match.end():]
+                break
+        if event_date:
+            break
+
+    reg_no = None
+    for pattern in _REG_PATTERNS:
+        match = pattern.search(rest)
+        if match:
+            reg_no = normalize_reg_no(match.group(1))
+            break
+
+    return ParsedFileName(event_date, reg_no)
@@ -7,7 +7,7 @@ from functools import wraps
 import logging
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
 import json
 from urllib.parse import urlparse
 import os
@@ -169,10 +169,8 @@ def retry_request(max_retries=3, delay=1):
     return decorator
 
 def get_db_connection():
-    """Create a new database connection"""
-    conn = psycopg2.connect(**POSTGRES_CONFIG)
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-    return conn
+    """Borrow a database connection from the shared pool"""
+    return get_connection(owner="flask_server")
 
 def close_db_connection(conn, cursor=None):
     """Safely close database connection and cursor"""
@@ -180,7 +178,7 @@ def close_db_connection(conn, cursor=None):
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
+            release_connection(conn)
     except Exception as e:
         logger.error(f"Error closing database connection: {str(e)}")
 
@@ -367,8 +365,7 @@ def store_verification():
         logger.info("Inserting verification record with values: %s", values)
 
         # Connect to PostgreSQL and insert the record
-        conn = psycopg2.connect(**POSTGRES_CONFIG)
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        conn = get_db_connection()
         cursor = conn.cursor()
 
         try:
@@ -385,8 +382,7 @@ def store_verification():
             logger.error(f"Database error while storing verification: {str(e)}")
             return jsonify({'error': str(e)}), 500
         finally:
-            cursor.close()
-            conn.close()
+            close_db_connection(conn, cursor)
 
     except Exception as e:
         logger.error(f"Error in store_verification: {str(e)}")
@@ -11,7 +11,7 @@ from PySide6.QtCore import *
 # IMPORT UI 
 from Manage_User_Widget import Ui_Manage_User_Form
 from audit_logger import AuditLogger
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
 
 from stylesheets import button_style, message_box_style, table_style
 
@@ -97,8 +97,7 @@ class ManageUserForm(QWidget, Ui_Manage_User_Form):
     def create_connection(self):
         if self.connection is None:
             try:
-                self.connection = psycopg2.connect(**POSTGRES_CONFIG)
-                self.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                self.connection = get_connection(owner=self.__class__.__name__)
             except psycopg2.Error as e:
                 # QMessageBox.critical(self, "Database Error", f"Failed to connect to database: {str(e)}")
                 box = QMessageBox()
@@ -112,10 +111,7 @@ class ManageUserForm(QWidget, Ui_Manage_User_Form):
 
     def closeConnection(self):
         if self.connection:
-            try:
-                self.connection.close()
-            except:
-                pass  # Ignore close errors
+            release_connection(self.connection)
             self.connection = None
             self.cursor = None
 
@@ -239,6 +235,7 @@ class ManageUserForm(QWidget, Ui_Manage_User_Form):
                 INSERT INTO users_list (firstname, lastname, username, password)
                 VALUES (%s, %s, %s, %s)
             ''', (fname, lname, username, password))
+            AuditLogger.invalidate_user_cache()
 
             AuditLogger.log_action(
                 conn,
@@ -399,6 +396,7 @@ class ManageUserForm(QWidget, Ui_Manage_User_Form):
                 SET firstname = %s, lastname = %s, username = %s, password = %s
                 WHERE username = %s
             ''', (fname, lname, username, password, old_username))
+            AuditLogger.invalidate_user_cache()
 
             AuditLogger.log_action(
                 conn,
@@ -495,6 +493,7 @@ class ManageUserForm(QWidget, Ui_Manage_User_Form):
 
             if reply == QMessageBox.Yes:
                 cursor.execute("DELETE FROM users_list WHERE username = %s", (username,))
+                AuditLogger.invalidate_user_cache()
                 
                 AuditLogger.log_action(
                     conn,
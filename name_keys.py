@@ -0,0 +1,176 @@
+"""Normalized and phonetic keys for fuzzy name matching.
+
+Registry names are typed from old handwritten books, so the same person
+shows up as "Ygnacio"/"Ignacio", "Peña"/"Pena"/"Penya",
+"Villanueva"/"Vilanueva"/"Bilanueba". Substring search misses those, so
+every name column also stores two derived keys, computed when the record
+is tagged and indexed in PostgreSQL:
+
+- ``<column>_norm``: accents stripped, case-folded, punctuation removed
+  ("Ma. Niña DELA Cruz" -> "ma nina dela cruz"); trigram-indexed.
+- ``<column>_phonetic``: an array holding a primary and an alternate sound
+  code for every word, in the spirit of Double Metaphone but with Spanish
+  and Filipino spelling rules (V/B, Z/S/C, J/G/H, LL, NY, silent H, a
+  leading Y before a consonant, doubled letters); GIN-indexed.
+
+Fuzzy search encodes the query the same way and asks for rows whose
+phonetic array overlaps every query word's codes, so a fuzzy lookup is an
+index probe rather than a table scan.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+MAX_CODE_LENGTH = 6
+WORD_CACHE_SIZE = 50000  # surnames repeat a lot across a bulk import
+VOWELS = set("AEIOU")
+_NON_LETTERS = re.compile(r"[^a-z\s]+")
+
+
+def normalize_name(name):
+    """Unaccent, case-fold and strip punctuation; None for empty input."""
+    if not name:
+        return None
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    text = _NON_LETTERS.sub(" ", text)
+    text = " ".join(text.split())
+    return text or None
+
+
+def phonetic_codes(word):
+    """Return (primary, alternate) sound codes for one normalized word."""
+    word = word.upper()
+    # A leading Y before a consonant is an old spelling of I (Ygnacio)
+    if len(word) > 1 and word[0] == "Y" and word[1] not in VOWELS:
+        word = "I" + word[1:]
+    word = word.replace("PH", "F").replace("TH", "T")
+
+    primary = []
+    alternate = []
+
+    def emit(code, alt=None):
+        primary.append(code)
+        alternate.append(code if alt is None else alt)
+
+    i = 0
+    length = len(word)
+    while i < length:
+        ch = word[i]
+        nxt = word[i + 1] if i + 1 < length else ""
+        after = word[i + 2] if i + 2 < length else ""
+
+        if ch == nxt and ch != "L":
+            # Doubled letters sound single (RR, SS, NN...)
+            i += 1
+            continue
+
+        if ch in VOWELS:
+            if i == 0:
+                emit("A")
+        elif ch in "BV":
+            emit("B")
+        elif ch == "C":
+            if nxt == "H":
+                emit("X", "K")  # Chavez / Kristine spellings
+                i += 1
+            elif nxt in ("E", "I", "Y"):
+                emit("S")
+            else:
+                emit("K")
+        elif ch == "D":
+            emit("T")
+        elif ch == "G":
+            if nxt == "U" and after in ("E", "I"):
+                emit("K")  # Guerrero, Guillermo: silent U
+                i += 1
+            elif nxt in ("E", "I"):
+                emit("H", "K")  # Spanish soft G (Gimenez ~ Jimenez)
+            else:
+                emit("K")
+        elif ch == "H":
+            # Silent in Spanish spellings; Hernandez ~ Ernandez
+            if i == 0 and nxt in VOWELS:
+                emit("A")
+                i += 1
+        elif ch == "J":
+            emit("H", "J")
+        elif ch in "KQ":
+            emit("K")
+            if ch == "Q" and nxt == "U":
+                i += 1
+        elif ch == "L":
+            if nxt == "L":
+                emit("L", "Y")  # Villanueva ~ Vilanueva ~ Viyanueva
+                i += 1
+            else:
+                emit("L")
+        elif ch == "N":
+            emit("N")
+            if nxt == "Y" and after in VOWELS:
+                i += 1  # Penya ~ Pena (from Peña)
+        elif ch == "W":
+            if nxt in VOWELS:
+                emit("W")
+        elif ch == "X":
+            emit("S", "KS")
+        elif ch == "Y":
+            if nxt in VOWELS:
+                emit("Y")
+        elif ch == "Z":
+            emit("S")
+        elif ch in "FMPRST":
+            emit(ch)
+        i += 1
+
+    def finish(codes):
+        # Collapse repeats produced by different spellings (C+S, Z+S)
+        collapsed = []
+        for code in codes:
+            if not collapsed or collapsed[-1] != code:
+                collapsed.append(code)
+        return "".join(collapsed)[:MAX_CODE_LENGTH]
+
+    return finish(primary), finish(alternate)
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def _word_codes(word):
+    primary, alternate = phonetic_codes(word)
+    codes = []
+    for code in (primary, alternate):
+        if code and code not in codes:
+            codes.append(code)
+    return tuple(codes)
+
+
+def word_codes(word):
+    """Distinct non-empty codes for a word (primary first)."""
+    return list(_word_codes(word))
+
+
+def name_keys(name):
+    """Return (normalized name, phonetic code list) for a name column value."""
+    normalized = normalize_name(name)
+    if normalized is None:
+        return None, None
+    codes = []
+    for word in normalized.split():
+        for code in word_codes(word):
+            if code not in codes:
+                codes.append(code)
+    return normalized, codes or None
+
+
+def query_code_groups(query):
+    """Per query word, the codes any one of which must be present in the name."""
+    normalized = normalize_name(query)
+    if normalized is None:
+        return []
+    groups = []
+    for word in normalized.split():
+        codes = word_codes(word)
+        if codes and codes not in groups:
+            groups.append(codes)
+    return groups
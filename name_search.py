@@ -0,0 +1,111 @@
+"""Name search over the birth/death/marriage index tables.
+
+Name lookups are a substring match on a person's name. A ``LIKE '%juan%'``
+predicate can never use a btree, so the tables carry ``pg_trgm`` GIN
+indexes on the name columns (see ``dbase_scripts/add_trigram_name_indexes.py``)
+which serve ``ILIKE`` with leading wildcards directly. ``ILIKE`` is already
+case-insensitive, so one predicate per column replaces the old four
+``LOWER(col) LIKE LOWER(%s)`` variants, and matches are ranked by trigram
+``similarity()`` so the closest names come first.
+
+Fuzzy mode (``fuzzy_name_search_terms``) probes the precomputed
+``<column>_norm``/``<column>_phonetic`` keys from ``name_keys`` instead, so
+misspellings such as "Ygnacio"/"Ignacio" still match through an index.
+
+Usage:
+    sql, params = build_name_search("birth_index", "dela cruz")
+    cursor.execute(sql, params)
+"""
+
+from name_keys import normalize_name, query_code_groups
+
+# Name columns searched per index table (all trigram-indexed)
+NAME_COLUMNS = {
+    "birth_index": ("name",),
+    "death_index": ("name",),
+    "marriage_index": ("husband_name", "wife_name"),
+}
+
+DATE_COLUMNS = {
+    "birth_index": "date_of_birth",
+    "death_index": "date_of_death",
+    "marriage_index": "date_of_marriage",
+}
+
+
+def escape_like(text):
+    """Escape LIKE wildcards so user input only matches literally."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def name_search_terms(table, query):
+    """Return (predicate, params, rank_expression, rank_params) for `query`.
+
+    The rank is cast to numeric so it compares exactly when used as a
+    keyset pagination key (see results_model.py).
+    """
+    if table not in NAME_COLUMNS:
+        raise ValueError(f"Unknown index table: {table}")
+    name_columns = NAME_COLUMNS[table]
+    query = " ".join(query.split())
+    pattern = f"%{escape_like(query)}%"
+
+    predicate = " OR ".join(f"{col} ILIKE %s" for col in name_columns)
+    if len(name_columns) == 1:
+        rank = f"similarity({name_columns[0]}, %s)::numeric"
+    else:
+        rank = "GREATEST(" + ", ".join(f"similarity({col}, %s)" for col in name_columns) + ")::numeric"
+    return predicate, (pattern,) * len(name_columns), rank, (query,) * len(name_columns)
+
+
+def build_name_search(table, query, columns=("file_path",), limit=None):
+    """Return (sql, params) selecting `columns` for rows whose name contains `query`.
+
+    Rows are ordered by best trigram similarity across the table's name
+    columns, then by most recent event date.
+    """
+    predicate, params, rank, rank_params = name_search_terms(table, query)
+    sql = f"""
+        SELECT {', '.join(columns)} FROM {table}
+        WHERE ({predicate})
+        ORDER BY {rank} DESC, {DATE_COLUMNS[table]} DESC
+    """
+    params = list(params) + list(rank_params)
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, tuple(params)
+
+
+def fuzzy_name_search_terms(table, query):
+    """Like name_search_terms(), but matching on phonetic and normalized keys.
+
+    A name column matches when every query word shares a sound code with one
+    of its words (GIN && on <column>_phonetic) or when its unaccented form is
+    trigram-similar to the query (GIN % on <column>_norm). Returns None when
+    the query has no letters to match on.
+    """
+    if table not in NAME_COLUMNS:
+        raise ValueError(f"Unknown index table: {table}")
+    normalized = normalize_name(query)
+    if normalized is None:
+        return None
+    groups = query_code_groups(query)
+
+    clauses = []
+    params = []
+    for col in NAME_COLUMNS[table]:
+        probes = [f"{col}_norm %% %s"]
+        params_for_col = [normalized]
+        if groups:
+            probes.insert(0, "(" + " AND ".join(f"{col}_phonetic && %s" for _ in groups) + ")")
+            params_for_col = list(groups) + params_for_col
+        clauses.append("(" + " OR ".join(probes) + ")")
+        params += params_for_col
+
+    similarities = [f"similarity({col}_norm, %s)" for col in NAME_COLUMNS[table]]
+    if len(similarities) == 1:
+        rank = f"{similarities[0]}::numeric"
+    else:
+        rank = "GREATEST(" + ", ".join(similarities) + ")::numeric"
+    return " OR ".join(clauses), tuple(params), rank, (normalized,) * len(similarities)
@@ -0,0 +1,16 @@
+"""Helpers for the archive file paths stored in the *_index tables.
+
+The same PDF can reach the database as ``\\\\server\\MCR\\LIVE BIRTH\\2001\\x.pdf``
+(Windows clients) or with forward slashes (the Flask server, older
+imports). ``canonical_path()`` folds every backslash into ``/`` exactly like
+the ``normalize_path()`` SQL function did, and the result is stored in the
+indexed ``canonical_path`` column so lookups are a single index probe
+instead of a function call on every row.
+"""
+
+
+def canonical_path(path):
+    """Return the slash-normalized form of `path` stored in canonical_path."""
+    if path is None:
+        return None
+    return str(path).replace('\\', '/')
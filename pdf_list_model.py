@@ -0,0 +1,191 @@
+"""Virtualized file list for the tagging windows.
+
+``load_pdfs`` used to build a QListWidgetItem with a rendered QPixmap for
+every file in the folder behind a modal progress dialog. ``PdfListModel``
+instead holds only the (naturally sorted) file paths, so the list appears
+as soon as the folder is listed. Thumbnails are requested from
+``data(DecorationRole)`` - which the view only calls for rows it paints -
+at visible priority on the multi-core ``render_service``; when one arrives
+the row is repainted. The rest of the folder is queued behind them at
+prefetch priority, which only fills the on-disk thumbnail cache.
+
+Decoded pixmaps are kept in a bounded LRU (``PIXMAP_CACHE_SIZE``), so
+memory follows the viewport rather than the folder size.
+
+A file whose render was lost to a crashed worker pool (``WORKER_CRASHED``)
+is asked for again when its row is next painted, up to ``CRASH_RETRIES``
+times, so files that merely shared the pool with a bad PDF still get their
+thumbnail; other failures are kept until the folder is reloaded.
+
+``set_tagged()`` marks which files already have an index row; the list then
+shows a tagged / untagged badge next to every name. ``set_claims()`` adds
+who is working on a file (see work_queue.py).
+
+Rows expose the file name as DisplayRole and the full path as
+Qt.UserRole, matching what the QListWidget items carried, so
+``index.data(Qt.UserRole)`` works wherever ``item.data(Qt.UserRole)`` did.
+"""
+
+import os
+from collections import OrderedDict
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, QSize, Qt, Signal
+from PySide6.QtGui import QPixmap
+
+from render_service import get_render_service, PRIORITY_VISIBLE, PRIORITY_PREFETCH, WORKER_CRASHED
+
+PIXMAP_CACHE_SIZE = 300   # decoded thumbnails kept in memory
+ROW_HEIGHT = 40
+CRASH_RETRIES = 2         # re-requests of a thumbnail lost to a crashed worker pool
+TAGGED_BADGE = "\u2714 Tagged"
+UNTAGGED_BADGE = "\u25cb Untagged"
+MY_CLAIM_BADGE = "\u25b6 Assigned to you"
+
+
+class _ThumbnailSignals(QObject):
+    # Carries render-service callbacks over to the GUI thread
+    done = Signal(int, str, bytes, str)  # generation, path, jpeg data, error
+
+
+class PdfListModel(QAbstractListModel):
+    """List of PDF paths whose thumbnails load lazily for visible rows."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths = []
+        self._rows = {}
+        self._pixmaps = OrderedDict()
+        self._pending = set()
+        self._failed = {}
+        self._crashes = {}  # path -> renders lost to a crashed worker pool
+        self._tagged = None  # set of tagged paths, None while unknown
+        self._claims = {}    # path -> clerk holding it
+        self._username = None
+        self._generation = 0
+        self._signals = _ThumbnailSignals()
+        self._signals.done.connect(self._on_thumbnail)
+        self._placeholder = QPixmap(100, 140)
+        self._placeholder.fill(Qt.lightGray)
+
+    def set_files(self, paths):
+        """Show `paths` (already sorted) and drop everything from the previous folder."""
+        self.beginResetModel()
+        self._generation += 1
+        service = get_render_service()
+        service.cancel(self._paths)  # queued jobs of the old folder
+        self._paths = list(paths)
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self._pixmaps.clear()
+        self._pending.clear()
+        self._failed.clear()
+        self._crashes.clear()
+        self._tagged = None
+        self._claims = {}
+        self.endResetModel()
+        # Warm the thumbnail cache for the whole folder behind the visible rows
+        for path in self._paths:
+            service.request(path, PRIORITY_PREFETCH)
+
+    def clear(self):
+        self.set_files([])
+
+    def set_tagged(self, paths):
+        """Mark the listed files that have tags; None hides the badges."""
+        self._tagged = set(paths) if paths is not None else None
+        if self._paths:
+            self.dataChanged.emit(self.index(0), self.index(len(self._paths) - 1), [Qt.DisplayRole])
+
+    def set_path_tagged(self, path, tagged):
+        """Update one file's badge after its tags were saved or deleted."""
+        row = self._rows.get(path)
+        if row is None or self._tagged is None:
+            return
+        if tagged:
+            self._tagged.add(path)
+        else:
+            self._tagged.discard(path)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def set_claims(self, claims, username):
+        """Show which clerk holds each claimed file; `username` gets MY_CLAIM_BADGE."""
+        self._claims = dict(claims)
+        self._username = username
+        if self._paths:
+            self.dataChanged.emit(self.index(0), self.index(len(self._paths) - 1), [Qt.DisplayRole])
+
+    def claimed_by(self, path):
+        """Clerk holding `path`, or None."""
+        return self._claims.get(path)
+
+    def row_of(self, path):
+        """Row of `path`, or -1 if it is not listed."""
+        return self._rows.get(path, -1)
+
+    def paths_after(self, path, count):
+        """Up to `count` paths listed after `path`, in list order."""
+        row = self._rows.get(path)
+        if row is None:
+            return []
+        return self._paths[row + 1:row + 1 + count]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._paths):
+            return None
+        path = self._paths[index.row()]
+        if role == Qt.DisplayRole:
+            text = os.path.basename(path)
+            if self._tagged is not None:
+                tagged = path in self._tagged
+                text = f"{text}    {TAGGED_BADGE if tagged else UNTAGGED_BADGE}"
+                clerk = None if tagged else self._claims.get(path)
+                if clerk:
+                    text += f"    {MY_CLAIM_BADGE if clerk == self._username else clerk}"
+            return text
+        if role == Qt.UserRole:
+            return path
+        if role == Qt.DecorationRole:
+            pixmap = self._pixmaps.get(path)
+            if pixmap is not None:
+                self._pixmaps.move_to_end(path)
+                return pixmap
+            self._request(path)
+            return self._placeholder
+        if role == Qt.ToolTipRole and path in self._failed:
+            return f"Failed to generate thumbnail: {self._failed[path]}"
+        if role == Qt.SizeHintRole:
+            return QSize(0, ROW_HEIGHT)
+        return None
+
+    def _request(self, path):
+        if path in self._pending or path in self._failed:
+            return
+        self._pending.add(path)
+        generation = self._generation
+        get_render_service().request(
+            path, PRIORITY_VISIBLE,
+            lambda path, data, error: self._signals.done.emit(generation, path, data or b"", error or ""))
+
+    def _on_thumbnail(self, generation, path, data, error):
+        if generation != self._generation:
+            return
+        self._pending.discard(path)
+        row = self._rows.get(path)
+        if row is None:
+            return
+        pixmap = QPixmap()
+        if error == WORKER_CRASHED and self._crashes.get(path, 0) < CRASH_RETRIES:
+            # Possibly not this file's fault; the repaint requests it again
+            self._crashes[path] = self._crashes.get(path, 0) + 1
+        elif error or not pixmap.loadFromData(data, "JPEG"):
+            self._failed[path] = error or "Unreadable thumbnail image"
+            print(f"Failed to generate thumbnail for {path}: {self._failed[path]}")
+        else:
+            self._pixmaps[path] = pixmap
+            while len(self._pixmaps) > PIXMAP_CACHE_SIZE:
+                self._pixmaps.popitem(last=False)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole, Qt.ToolTipRole])
@@ -6,12 +6,68 @@ from matplotlib.backends.backend_pdf import PdfPages
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from PySide6.QtWidgets import *
-from PySide6.QtCore import Qt, QDate, QSize, QTimer
+from collections import OrderedDict
+from PySide6.QtCore import Qt, QDate, QSize, QTimer, QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtGui import QPixmap, QImage, QIcon
 from stylesheets import button_style
 
+
+def fit_zoom(page_rect, target_width):
+    """Zoom factor that fits a page into target_width (20px padding on each side)."""
+    available_width = target_width - 40
+    return available_width / page_rect.width
+
+
+def render_pages(file_path, zoom_factor=None, target_width=1000):
+    """Rasterize every page of a PDF; returns (zoom_factor, [QImage]).
+
+    With zoom_factor None the page-width fit for target_width is used.
+    Safe to call off the GUI thread (QImages are detached from pymupdf).
+    """
+    doc = pymupdf.open(file_path)
+    try:
+        if zoom_factor is None:
+            zoom_factor = fit_zoom(doc[0].rect, target_width) if len(doc) > 0 else 1.0
+        matrix = pymupdf.Matrix(zoom_factor, zoom_factor)
+        images = []
+        for page in doc:
+            pix = page.get_pixmap(matrix=matrix)
+            images.append(QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888).copy())
+        return zoom_factor, images
+    finally:
+        doc.close()
+
+
+class _PrefetchSignals(QObject):
+    done = Signal(object, object)  # cache key, (zoom_factor, images) or None
+
+
+class _PrefetchJob(QRunnable):
+    def __init__(self, key, file_path, zoom_factor, target_width):
+        super().__init__()
+        self.key = key
+        self.file_path = file_path
+        self.zoom_factor = zoom_factor
+        self.target_width = target_width
+        self.signals = _PrefetchSignals()
+
+    def run(self):
+        try:
+            result = render_pages(self.file_path, self.zoom_factor, self.target_width)
+        except Exception as e:
+            print(f"Error prefetching PDF {self.file_path}: {e}")
+            result = None
+        self.signals.done.emit(self.key, result)
+
 class PDFViewer(QScrollArea):
-    """PDF Viewer with zoom support optimized for landscape files."""
+    """PDF Viewer with zoom support optimized for landscape files.
+
+    prefetch() renders upcoming files in the background at the current zoom;
+    load_pdf() of a prefetched file then only places the ready pages.
+    prefetch_stats counts hits and misses for tuning the look-ahead.
+    """
+    PREFETCH_CACHE_SIZE = 6  # rendered files kept for look-ahead
+
     def __init__(self, parent=None):
         super().__init__(parent)      
         self.setWidgetResizable(True)
@@ -34,6 +90,38 @@ class PDFViewer(QScrollArea):
         self.last_width = self.width()
         self.manual_zoom = False  # Flag to track if zoom was set manually
 
+        self.prefetched = OrderedDict()  # render key -> (zoom_factor, [QImage])
+        self.prefetch_pending = set()
+        self.prefetch_stats = {"hits": 0, "misses": 0, "prefetched": 0}
+        self.prefetch_pool = QThreadPool(self)
+        self.prefetch_pool.setMaxThreadCount(1)  # stay out of the way of the GUI
+
+    def render_key(self, file_path):
+        """Cache key for file_path at the current zoom setting."""
+        if self.manual_zoom:
+            return (file_path, "manual", round(self.zoom_factor, 4))
+        return (file_path, "fit", self.target_width)
+
+    def prefetch(self, file_paths):
+        """Render these files in the background at the current zoom, oldest request first."""
+        for file_path in file_paths:
+            key = self.render_key(file_path)
+            if key in self.prefetched or key in self.prefetch_pending:
+                continue
+            self.prefetch_pending.add(key)
+            job = _PrefetchJob(key, file_path, self.zoom_factor if self.manual_zoom else None, self.target_width)
+            job.signals.done.connect(self._on_prefetched)
+            self.prefetch_pool.start(job)
+
+    def _on_prefetched(self, key, result):
+        self.prefetch_pending.discard(key)
+        if result is None:
+            return
+        self.prefetched[key] = result
+        self.prefetch_stats["prefetched"] += 1
+        while len(self.prefetched) > self.PREFETCH_CACHE_SIZE:
+            self.prefetched.popitem(last=False)
+
     def load_pdf(self, file_path):
         """Loads and displays the PDF with optimized scaling for landscape."""
         self.current_file = file_path
@@ -46,33 +134,20 @@ class PDFViewer(QScrollArea):
             if not self.current_file:
                 return
 
-            # Open the PDF file
-            doc = pymupdf.open(self.current_file)
+            key = self.render_key(self.current_file)
+            rendered = self.prefetched.get(key)
+            if rendered is not None:
+                self.prefetch_stats["hits"] += 1
+                self.prefetched.move_to_end(key)
+            else:
+                self.prefetch_stats["misses"] += 1
+                # Fit width (landscape and portrait alike) unless zoom was set manually
+                rendered = render_pages(
+                    self.current_file, self.zoom_factor if self.manual_zoom else None, self.target_width)
+            self.zoom_factor, images = rendered
             self.clear_pdf()
-            
-            # Calculate optimal zoom factor for landscape pages (only if not manual zoom)
-            if not self.manual_zoom and len(doc) > 0:
-                first_page = doc[0]
-                page_width = first_page.rect.width
-                page_height = first_page.rect.height
-                
-                # Calculate zoom factor to fit width
-                if page_width > page_height:  # Landscape
-                    # Scale to fit width with some padding
-                    available_width = self.target_width - 40  # 20px padding on each side
-                    self.zoom_factor = available_width / page_width
-                else:  # Portrait
-                    # Scale to fit width but maintain aspect ratio
-                    available_width = self.target_width - 40
-                    self.zoom_factor = available_width / page_width
-
-            dpi = 72 * self.zoom_factor
-
-            for page_number in range(len(doc)):
-                page = doc[page_number]
-                matrix = pymupdf.Matrix(dpi / 72, dpi / 72)
-                pix = page.get_pixmap(matrix=matrix)
-                image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
+
+            for image in images:
                 pixmap = QPixmap.fromImage(image)
 
                 label = QLabel()
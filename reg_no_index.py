@@ -0,0 +1,86 @@
+"""In-memory registry numbers of one registry and registration year.
+
+Registry numbers are unique per registry (table) and registration year,
+compared in their normalized form (``filename_parser.normalize_reg_no``:
+digit groups without leading zeros). The database enforces this with the
+``uq_<table>_reg_no`` unique index (dbase_scripts/add_reg_no_unique_indexes.py);
+the tagging windows load the numbers of the open folder's year into a
+``RegNoIndex`` with one query, so ``reg_no_input`` is checked while the clerk
+types without touching the database.
+
+Usage:
+    index = RegNoIndex.load(cursor, "birth_index", year_from_path(folder))
+    existing_file = index.conflict(typed_reg_no, current_file)
+"""
+
+import re
+from datetime import date
+
+from filename_parser import normalize_reg_no
+
+_YEAR_FOLDER = re.compile(r"^(18|19|20)\d\d$")
+
+
+def unique_index_name(table):
+    """Name of the (registration year, normalized reg_no) unique index of `table`."""
+    return f"uq_{table}_reg_no"
+
+
+def year_from_path(path):
+    """Year of the closest 4-digit year folder in `path`, or None."""
+    for part in reversed(re.split(r"[\\/]+", path or "")):
+        if _YEAR_FOLDER.match(part.strip()):
+            return int(part.strip())
+    return None
+
+
+class RegNoIndex:
+    """Normalized reg_no -> file paths for one registration year."""
+
+    def __init__(self, year=None, rows=()):
+        self.year = year
+        self._files = {}    # normalized reg_no -> set of file paths
+        self._by_file = {}  # file path -> normalized reg_no
+        for file_path, reg_no in rows:
+            self.add(file_path, reg_no)
+
+    @classmethod
+    def load(cls, cursor, table, year):
+        """Read the registry numbers registered in `year` from `table` in one query."""
+        cursor.execute(f"""
+            SELECT file_path, reg_no FROM {table}
+            WHERE reg_no IS NOT NULL AND date_of_reg >= %s AND date_of_reg < %s
+        """, (date(year, 1, 1), date(year + 1, 1, 1)))
+        return cls(year, cursor.fetchall())
+
+    def __len__(self):
+        return len(self._by_file)
+
+    def add(self, file_path, reg_no):
+        """Record (or move) the registry number of a file."""
+        self.discard(file_path)
+        normalized = normalize_reg_no(reg_no)
+        if normalized:
+            self._files.setdefault(normalized, set()).add(file_path)
+            self._by_file[file_path] = normalized
+
+    def discard(self, file_path):
+        normalized = self._by_file.pop(file_path, None)
+        if normalized:
+            files = self._files[normalized]
+            files.discard(file_path)
+            if not files:
+                del self._files[normalized]
+
+    def update(self, file_path, reg_no, date_of_reg):
+        """Apply a saved row: keep it only if it was registered in this index's year."""
+        if date_of_reg is not None and date_of_reg.year == self.year:
+            self.add(file_path, reg_no)
+        else:
+            self.discard(file_path)
+
+    def conflict(self, reg_no, file_path=None):
+        """Another file already using `reg_no` this year, or None."""
+        normalized = normalize_reg_no(reg_no)
+        others = self._files.get(normalized, set()) - {file_path}
+        return min(others) if others else None
@@ -3,7 +3,7 @@ from PySide6.QtWidgets import *
 from PySide6.QtGui import *
 from PySide6.QtCore import *
 import psycopg2
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
 from datetime import datetime
 from everify_form import eVerifyForm
 from audit_logger import AuditLogger
@@ -130,8 +130,7 @@ class ReleaseDocumentWindow(QMainWindow):
     def create_connection(self):
         """Create a database connection"""
         try:
-            conn = psycopg2.connect(**POSTGRES_CONFIG)
-            return conn
+            return get_connection(autocommit=False, owner=self.__class__.__name__)
         except psycopg2.Error as e:
             QMessageBox.critical(self, "Database Error", 
                                f"Could not connect to database: {str(e)}")
@@ -140,10 +139,7 @@ class ReleaseDocumentWindow(QMainWindow):
     def closeConnection(self, conn=None):
         """Safely close the database connection"""
         if conn:
-            try:
-                conn.close()
-            except Exception as e:
-                print(f"Error closing connection: {str(e)}")
+            release_connection(conn)
             
     def release_document(self):
         """Handle document release"""
@@ -274,7 +270,7 @@ class ReleaseDocumentWindow(QMainWindow):
                 )
                 conn.commit()
         finally:
-            self.closeConnection()
+            self.closeConnection(conn)
     
     
     def populate_received_by_field(self, full_name):
@@ -0,0 +1,235 @@
+"""Multi-core thumbnail rendering for the tagging windows.
+
+Rasterizing page 1 with pymupdf is CPU-bound, and the QThreadPool jobs of
+``PdfListModel`` all ran under one interpreter lock, so a 2,000-file book
+folder rendered on a single core. ``RenderService`` renders on a
+``ProcessPoolExecutor`` with one worker per core instead. Workers open the
+PDFs themselves and return the encoded thumbnail bytes; the parent only
+checks and fills the ``ThumbnailCache``.
+
+Requests go through a priority queue (lower number first), and only about
+two jobs per worker are handed to the pool at a time, so the rows a clerk is
+looking at (``PRIORITY_VISIBLE``) overtake a folder-wide background
+prefetch (``PRIORITY_PREFETCH``) queued earlier. Asking again for a queued
+path with a better priority moves it up.
+
+Callbacks are called as ``callback(path, data, error)`` from a service
+thread; Qt code must forward them to the GUI thread with a signal. When a
+worker process dies, every render in flight on that pool fails with
+``WORKER_CRASHED`` - not necessarily because of its own file - and the next
+request starts a fresh pool.
+
+Usage:
+    service = get_render_service()
+    service.request(path, PRIORITY_VISIBLE, on_done)
+    service.stats()["renders_per_second"]
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+from thumbnail_cache import get_thumbnail_cache, render_thumbnail
+
+PRIORITY_VISIBLE = 0
+PRIORITY_PREFETCH = 10
+JOBS_PER_WORKER = 2  # pool submissions kept ahead of the workers
+WORKER_CRASHED = "Render worker crashed"  # error of renders lost with a broken pool
+
+
+class _Request:
+    __slots__ = ("priority", "callbacks", "running")
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.callbacks = []
+        self.running = False
+
+
+class RenderService:
+    """Priority-ordered thumbnail rendering on a process pool."""
+
+    def __init__(self, workers: Optional[int] = None, cache=None, renderer=render_thumbnail):
+        self.workers = workers or os.cpu_count() or 2
+        self._cache = cache
+        self._renderer = renderer
+        self._executor = None
+        self._heap = []
+        self._seq = itertools.count()
+        self._requests: Dict[str, _Request] = {}
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._stopped = False
+        self._busy_since = None
+        self._stats = {
+            'rendered': 0,
+            'cache_hits': 0,
+            'failed': 0,
+            'busy_seconds': 0.0,
+        }
+        self._thread = threading.Thread(target=self._dispatch, name="RenderService", daemon=True)
+        self._thread.start()
+
+    def request(self, path: str, priority: int = PRIORITY_VISIBLE,
+                callback: Optional[Callable[[str, Optional[bytes], Optional[str]], None]] = None):
+        """Queue a thumbnail; a better priority for an already queued path moves it up."""
+        with self._cond:
+            entry = self._requests.get(path)
+            if entry is None:
+                entry = self._requests[path] = _Request(priority)
+                heapq.heappush(self._heap, (priority, next(self._seq), path))
+            elif priority < entry.priority and not entry.running:
+                entry.priority = priority
+                heapq.heappush(self._heap, (priority, next(self._seq), path))
+            if callback is not None:
+                entry.callbacks.append(callback)
+            self._cond.notify()
+
+    def cancel(self, paths):
+        """Drop queued requests for `paths` (e.g. the folder changed); running ones finish."""
+        with self._cond:
+            for path in paths:
+                entry = self._requests.get(path)
+                if entry is not None and not entry.running:
+                    del self._requests[path]  # its heap item is skipped when popped
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            snapshot = dict(self._stats)
+            if self._busy_since is not None:
+                snapshot['busy_seconds'] += time.monotonic() - self._busy_since
+            snapshot['queued'] = len(self._requests) - self._in_flight
+            snapshot['in_flight'] = self._in_flight
+        snapshot['workers'] = self.workers
+        busy = snapshot['busy_seconds']
+        snapshot['renders_per_second'] = snapshot['rendered'] / busy if busy else 0.0
+        return snapshot
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._heap.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        with self._cond:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self):
+        max_in_flight = self.workers * JOBS_PER_WORKER
+        while True:
+            with self._cond:
+                while not self._stopped and (not self._heap or self._in_flight >= max_in_flight):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                priority, _, path = heapq.heappop(self._heap)
+                entry = self._requests.get(path)
+                if entry is None or entry.running or entry.priority != priority:
+                    continue  # cleared, or superseded by a better priority
+                entry.running = True
+                if self._in_flight == 0:
+                    self._busy_since = time.monotonic()
+                self._in_flight += 1
+
+            cache = self._cache or get_thumbnail_cache()
+            try:
+                info = os.stat(path)
+                data = cache.get(path, info.st_size, info.st_mtime)
+            except Exception as e:
+                self._finish(path, None, str(e), 'failed')
+                continue
+            if data is not None:
+                self._finish(path, data, None, 'cache_hits')
+                continue
+
+            executor = None
+            try:
+                with self._cond:
+                    if self._stopped:
+                        raise RuntimeError("Render service stopped")
+                    if self._executor is None:
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    executor = self._executor
+                    future = executor.submit(self._renderer, path)
+            except BrokenProcessPool:
+                self._drop_executor(executor)
+                self._finish(path, None, WORKER_CRASHED, 'failed')
+                continue
+            except Exception as e:
+                self._finish(path, None, str(e), 'failed')
+                continue
+            future.add_done_callback(
+                lambda f, path=path, info=info, cache=cache, executor=executor:
+                    self._rendered(f, path, info, cache, executor))
+
+    def _drop_executor(self, executor):
+        """Forget a broken pool so the next submission starts a fresh one."""
+        with self._cond:
+            # Other futures of the same pool fail too; only the first one resets
+            if executor is None or self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _rendered(self, future, path, info, cache, executor):
+        try:
+            data = future.result()
+        except BrokenProcessPool:
+            # A worker died (e.g. a malformed PDF crashed pymupdf); start a fresh pool
+            self._drop_executor(executor)
+            self._finish(path, None, WORKER_CRASHED, 'failed')
+            return
+        except Exception as e:
+            self._finish(path, None, str(e), 'failed')
+            return
+        try:
+            cache.put(path, info.st_size, info.st_mtime, data)
+        except Exception as e:
+            print(f"Failed to cache thumbnail for {path}: {str(e)}")
+        self._finish(path, data, None, 'rendered')
+
+    def _finish(self, path, data, error, counter):
+        with self._cond:
+            entry = self._requests.pop(path, None)
+            self._stats[counter] += 1
+            self._in_flight -= 1
+            if self._in_flight == 0 and self._busy_since is not None:
+                self._stats['busy_seconds'] += time.monotonic() - self._busy_since
+                self._busy_since = None
+            self._cond.notify_all()
+        for callback in (entry.callbacks if entry else []):
+            try:
+                callback(path, data, error)
+            except Exception as e:
+                print(f"Thumbnail callback failed: {str(e)}")
+
+
+_service: Optional[RenderService] = None
+_service_lock = threading.Lock()
+
+
+def get_render_service() -> RenderService:
+    """Return the process-wide render service, starting it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = RenderService()
+    return _service
+
+
+def shutdown_render_service():
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.shutdown()
+            _service = None
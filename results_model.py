@@ -0,0 +1,165 @@
+"""Paged list model for the Verify windows' search results.
+
+A common surname can match thousands of records; fetching them all and
+filling a QListWidget froze the window. ``KeysetResultsModel`` loads one
+page (``PAGE_SIZE`` rows) when a search starts and lets the view pull the
+next page through ``canFetchMore()``/``fetchMore()`` as the clerk scrolls.
+
+Pages use keyset pagination rather than OFFSET: rows are ordered by a list
+of sort keys (all descending) with ``id`` as a tie-breaker, and every page
+continues strictly after the last row already shown:
+
+    SELECT file_path, <keys...>, id FROM <table>
+    WHERE (<predicate>) AND (<keys...>, id) < (<last row's values>)
+    ORDER BY 2 DESC, 3 DESC, ... LIMIT <page size>
+
+so late pages cost the same as the first one and rows inserted while the
+clerk scrolls never shift the list. Sort keys must be NOT NULL and must
+round-trip exactly through Python (COALESCE dates, cast floats to numeric).
+"""
+
+import os
+
+import psycopg2
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal
+
+from db_pool import pooled_connection
+
+
+def date_sort_key(column):
+    """Sort key for an event date column; undated records sort last."""
+    return (f"COALESCE({column}, DATE '0001-01-01')", ())
+
+
+class KeysetResultsModel(QAbstractListModel):
+    """List of matching file names, fetched page by page from an index table."""
+
+    PAGE_SIZE = 200
+    PathRole = Qt.UserRole  # full file_path of a row
+
+    fetchFailed = Signal(str)
+    pageLoaded = Signal(int)  # rows loaded so far
+
+    def __init__(self, parent=None, page_size=PAGE_SIZE):
+        super().__init__(parent)
+        self.page_size = page_size
+        self._rows = []        # (file_path, file name)
+        self._last_key = None  # sort key values of the last loaded row
+        self._exhausted = True
+        self._query = None
+
+    # ------------------------------------------------------------------ #
+    # Search lifecycle
+    # ------------------------------------------------------------------ #
+    def start(self, table, predicate, params=(), sort_keys=()):
+        """Reset the model to a new search and load the first page.
+
+        `sort_keys` is a list of (sql expression, params) sorted descending;
+        `id DESC` is always appended. Returns the number of rows loaded.
+        Database errors propagate so the caller can report them.
+        """
+        self.beginResetModel()
+        self._rows = []
+        self._last_key = None
+        self._exhausted = False
+        self._query = (table, predicate, tuple(params), list(sort_keys))
+        self.endResetModel()
+        self._fetch_page(raise_errors=True)
+        return len(self._rows)
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._last_key = None
+        self._exhausted = True
+        self._query = None
+        self.endResetModel()
+
+    def has_more(self):
+        return not self._exhausted
+
+    def file_path(self, row):
+        return self._rows[row][0]
+
+    def file_name(self, row):
+        return self._rows[row][1]
+
+    # ------------------------------------------------------------------ #
+    # QAbstractListModel
+    # ------------------------------------------------------------------ #
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        path, name = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role in (self.PathRole, Qt.ToolTipRole):
+            return path
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        self._fetch_page()
+
+    # ------------------------------------------------------------------ #
+    # Paging
+    # ------------------------------------------------------------------ #
+    def _page_sql(self):
+        table, predicate, params, sort_keys = self._query
+        keys = [expr for expr, _ in sort_keys] + ["id"]
+        key_params = [p for _, expr_params in sort_keys for p in expr_params]
+
+        select_params = list(key_params)
+        where = f"({predicate})"
+        where_params = list(params)
+        if self._last_key is not None:
+            placeholders = ", ".join(["%s"] * len(keys))
+            where += f" AND ({', '.join(keys)}) < ({placeholders})"
+            where_params += key_params + list(self._last_key)
+        order = ", ".join(f"{position} DESC" for position in range(2, len(keys) + 2))
+
+        sql = f"""
+            SELECT file_path, {', '.join(keys)} FROM {table}
+            WHERE {where}
+            ORDER BY {order}
+            LIMIT %s
+        """
+        return sql, tuple(select_params + where_params + [self.page_size])
+
+    def _fetch_page(self, raise_errors=False):
+        if self._exhausted or self._query is None:
+            return
+        sql, params = self._page_sql()
+        try:
+            with pooled_connection(owner=self.__class__.__name__) as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(sql, params)
+                    records = cursor.fetchall()
+                finally:
+                    cursor.close()
+        except psycopg2.Error as e:
+            self._exhausted = True
+            print(f"Error fetching search results: {str(e)}")
+            if raise_errors:
+                raise
+            self.fetchFailed.emit(str(e))
+            return
+
+        if len(records) < self.page_size:
+            self._exhausted = True
+        if not records:
+            return
+        self._last_key = tuple(records[-1][1:])
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self._rows.extend((record[0], os.path.basename(record[0])) for record in records)
+        self.endInsertRows()
+        self.pageLoaded.emit(len(self._rows))
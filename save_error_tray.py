@@ -0,0 +1,91 @@
+"""Non-modal list of tag saves that failed in the background.
+
+A tagging window adds every failed ``SaveJob`` with ``add_failure()``; the
+tray shows itself without blocking the window, so the clerk can keep
+tagging and deal with the failures later. "Retry" resubmits the selected
+(or all) jobs to the save queue, "Dismiss" drops them, and double-clicking
+a row asks the window to open that file (``open_requested``).
+"""
+
+import os
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QPushButton, QVBoxLayout, QWidget
+
+from save_queue import get_save_queue
+from stylesheets import button_style
+
+
+class SaveErrorTray(QWidget):
+    """Tool window listing failed saves with retry."""
+
+    open_requested = Signal(str)  # file path
+
+    def __init__(self, title, parent=None):
+        super().__init__(parent, Qt.Tool)
+        self.setWindowTitle(title)
+        self.resize(520, 260)
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.error_list = QListWidget()
+        self.error_list.setSelectionMode(QListWidget.ExtendedSelection)
+        self.error_list.itemDoubleClicked.connect(
+            lambda item: self.open_requested.emit(item.data(Qt.UserRole).file_path))
+        layout.addWidget(self.error_list)
+
+        buttons = QHBoxLayout()
+        for text, handler in (("Retry", self.retry_selected), ("Retry All", self.retry_all),
+                              ("Dismiss", self.dismiss_selected)):
+            button = QPushButton(text)
+            button.setStyleSheet(button_style)
+            button.clicked.connect(handler)
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+
+    def add_failure(self, job, error):
+        """List a failed job (replacing an older failure of the same file) and show the tray."""
+        self.remove_file(job.file_path)
+        item = QListWidgetItem(f"{os.path.basename(job.file_path)} - {error}")
+        item.setData(Qt.UserRole, job)
+        item.setToolTip(job.file_path)
+        self.error_list.addItem(item)
+        self.update_summary()
+        self.show()
+        self.raise_()
+
+    def remove_file(self, file_path):
+        """Drop the entry of a file that has since been saved."""
+        for row in reversed(range(self.error_list.count())):
+            if self.error_list.item(row).data(Qt.UserRole).file_path == file_path:
+                self.error_list.takeItem(row)
+        self.update_summary()
+
+    def retry_selected(self):
+        self.retry(self.error_list.selectedItems())
+
+    def retry_all(self):
+        self.retry([self.error_list.item(row) for row in range(self.error_list.count())])
+
+    def retry(self, items):
+        save_queue = get_save_queue()
+        for item in items:
+            if save_queue.submit(item.data(Qt.UserRole)):
+                self.error_list.takeItem(self.error_list.row(item))
+        self.update_summary()
+
+    def dismiss_selected(self):
+        for item in self.error_list.selectedItems():
+            self.error_list.takeItem(self.error_list.row(item))
+        self.update_summary()
+
+    def failure_count(self):
+        return self.error_list.count()
+
+    def update_summary(self):
+        count = self.error_list.count()
+        self.summary_label.setText(f"{count} save(s) failed. Double-click to open the file.")
+        if count == 0:
+            self.hide()
@@ -0,0 +1,385 @@
+"""Write-behind queue for the tagging windows' tag saves.
+
+``save_tags`` used to check the registry number, run the
+``INSERT ... ON CONFLICT(file_path) DO UPDATE`` and log the audit row on the
+GUI thread, then stop the clerk with a "saved" message box. The windows now
+validate the form locally and ``submit()`` a ``SaveJob``; a daemon thread
+collects whatever was queued within ``FLUSH_INTERVAL`` and writes it in one
+transaction per table: one ``execute_values`` upsert writes them and returns
+the stored rows.
+
+Duplicate registry numbers are caught by the ``uq_<table>_reg_no`` unique
+index (see reg_no_index.py) rather than a SELECT before every save. If the
+batch transaction fails, the jobs are retried one by one so a single bad
+record does not fail the others; a job that alone violates the index is
+reported with a ``DuplicateRegNoError`` naming the record that holds the
+number. Connection errors are not retried here; the jobs are reported
+failed and can be resubmitted.
+
+Until dbase_scripts/add_reg_no_unique_indexes.py has built a table's index
+(it skips tables that still hold duplicates) the queue checks every job's
+registry number with a SELECT before writing, as ``save_tags`` used to,
+and prints a warning; the index is looked for again every
+``INDEX_RECHECK_SECONDS``.
+
+Every job's ``on_done(job, row, error)`` is called from the worker thread -
+Qt code must forward it to the GUI thread with a signal - with either the
+stored row (``returning`` column order) or the exception.
+
+Usage:
+    job = SaveJob("birth_index", {"file_path": path, ...}, returning="name, ...", on_done=cb)
+    get_save_queue().submit(job)
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, Optional, Sequence
+
+import psycopg2
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+
+from db_pool import get_connection, release_connection
+from filename_parser import normalize_reg_no
+from reg_no_index import unique_index_name
+
+# normalize_reg_no() of the migration, inlined for databases that lack it
+_NORMALIZED_REG_NO = (r"(SELECT string_agg((m[1])::numeric::text, '-' ORDER BY n) "
+                      r"FROM regexp_matches(reg_no, '\d+', 'g') WITH ORDINALITY AS t(m, n))")
+
+
+class DuplicateRegNoError(Exception):
+    """A saved record's registry number is already used by another file."""
+
+    def __init__(self, reg_no, existing_file, existing):
+        self.reg_no = reg_no
+        self.existing_file = existing_file
+        self.existing = tuple(existing)  # the other record's label_columns values
+        super().__init__(
+            f"Registry number '{reg_no}' already exists ({os.path.basename(existing_file)})")
+
+
+class SaveJob:
+    """One queued upsert of a tag row, keyed by its file_path."""
+
+    __slots__ = ("table", "row", "returning", "label_columns", "on_done", "attempts", "queued_at")
+
+    def __init__(self, table: str, row: Dict[str, object], returning: str,
+                 label_columns: Sequence[str] = ("name",),
+                 on_done: Optional[Callable[["SaveJob", Optional[tuple], Optional[Exception]], None]] = None):
+        self.table = table
+        self.row = dict(row)  # column -> value, INSERT column order
+        self.returning = returning
+        self.label_columns = tuple(label_columns)
+        self.on_done = on_done
+        self.attempts = 0
+        self.queued_at = None
+
+    @property
+    def file_path(self):
+        return self.row["file_path"]
+
+    def group_key(self):
+        return (self.table, tuple(self.row), self.returning, self.label_columns)
+
+
+class SaveQueue:
+    """Background batch writer for SaveJobs."""
+
+    QUEUE_SIZE = 1000      # jobs buffered before submit() refuses more
+    BATCH_SIZE = 100       # jobs per transaction
+    FLUSH_INTERVAL = 0.2   # seconds to wait for more jobs before writing
+    INDEX_RECHECK_SECONDS = 300  # how often a missing reg_no index is looked for again
+
+    _STOP = object()
+
+    def __init__(self, connect=None, release=None):
+        self._connect = connect or (lambda: get_connection(autocommit=False, owner="SaveQueue"))
+        self._release = release or release_connection
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._unique_index = {}  # table -> (index usable, time.monotonic() of the check)
+        self._stats = {
+            'enqueued': 0,
+            'saved': 0,
+            'rejected': 0,
+            'failed': 0,
+            'batches': 0,
+            'last_batch_size': 0,
+            'last_flush_seconds': 0.0,
+            'last_error': None,
+        }
+        self._thread = threading.Thread(target=self._run, name="SaveQueue", daemon=True)
+        self._thread.start()
+
+    def submit(self, job: SaveJob) -> bool:
+        """Queue a job without blocking. Returns False if the queue is full."""
+        job.attempts += 1
+        job.queued_at = time.monotonic()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            print(f"Save queue full ({self.QUEUE_SIZE} jobs) - could not queue {job.file_path}")
+            return False
+        with self._lock:
+            self._stats['enqueued'] += 1
+        return True
+
+    def flush(self, timeout=5.0):
+        """Wait until every queued job has been written or failed. Returns True if drained."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not self._thread.is_alive():
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout=5.0):
+        """Write pending jobs and stop the worker thread."""
+        drained = self.flush(timeout)
+        try:
+            self._queue.put(self._STOP, timeout=1.0)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=1.0)
+        return drained
+
+    def pending(self):
+        """Jobs submitted but not yet written or failed."""
+        return self._queue.unfinished_tasks
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['queue_depth'] = self._queue.qsize()
+        snapshot['pending'] = self.pending()
+        return snapshot
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                groups = {}
+                for job in batch:
+                    groups.setdefault(job.group_key(), []).append(job)
+                for jobs in groups.values():
+                    try:
+                        self._write_group(jobs, isolate=True)
+                    except Exception as e:
+                        # Never let one group stop the worker: queued jobs would never be written
+                        print(f"Save queue failed on {len(jobs)} job(s): {str(e)}")
+                        self._fail(jobs, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def _write_group(self, jobs, isolate):
+        # A later save of the same file replaces an earlier one
+        latest = {}
+        for job in jobs:
+            latest.pop(job.file_path, None)
+            latest[job.file_path] = job
+        started = time.monotonic()
+        try:
+            rows, rejected = self._write(list(latest.values()))
+        except Exception as e:
+            # Connection problems, an unadaptable value or a bug in _write alike
+            print(f"Error saving {len(latest)} tag record(s): {str(e)}")
+            if (isolate and len(latest) > 1 and isinstance(e, psycopg2.Error)
+                    and not isinstance(e, psycopg2.OperationalError)):
+                for path in latest:
+                    self._write_group([job for job in jobs if job.file_path == path], isolate=False)
+                return
+            self._fail(jobs, e)
+            return
+
+        with self._lock:
+            self._stats['saved'] += len(rows)
+            self._stats['rejected'] += len(rejected)
+            self._stats['batches'] += 1
+            self._stats['last_batch_size'] = len(latest)
+            self._stats['last_flush_seconds'] = time.monotonic() - started
+        for job in jobs:
+            path = job.file_path
+            if path in rejected:
+                self._done(job, None, rejected[path])
+            elif path in rows:
+                self._done(job, rows[path], None)
+            else:
+                self._done(job, None, Exception("Record was not returned by the database"))
+
+    def _write(self, jobs):
+        """Upsert jobs in one transaction. Returns ({path: row}, {path: DuplicateRegNoError})."""
+        first = jobs[0]
+        columns = list(first.row)
+        updates = ",\n".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "file_path")
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            rejected = {}
+            if not self._has_unique_index(cursor, first.table):
+                rejected = self._check_duplicates(cursor, jobs)
+                jobs = [job for job in jobs if job.file_path not in rejected]
+                if not jobs:
+                    conn.rollback()
+                    return {}, rejected
+            result = execute_values(cursor, f"""
+                INSERT INTO {first.table} ({", ".join(columns)})
+                VALUES %s
+                ON CONFLICT(file_path) DO UPDATE SET
+                    {updates}
+                RETURNING file_path, {first.returning}
+            """, [tuple(job.row[column] for column in columns) for job in jobs],
+                page_size=self.BATCH_SIZE, fetch=True)
+            conn.commit()
+            return {row[0]: tuple(row[1:]) for row in result}, rejected
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass  # Ignore rollback errors
+            if (len(jobs) == 1 and isinstance(e, errors.UniqueViolation)
+                    and e.diag.constraint_name == unique_index_name(first.table)):
+                return {}, {jobs[0].file_path: self._duplicate_of(cursor, jobs[0])}
+            raise
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass  # Ignore cursor close errors
+            self._release(conn)
+
+    def _has_unique_index(self, cursor, table):
+        """Whether `table` has a valid uq_<table>_reg_no index (cached; a missing one is rechecked)."""
+        known = self._unique_index.get(table)
+        if known is not None and (known[0] or time.monotonic() - known[1] < self.INDEX_RECHECK_SECONDS):
+            return known[0]
+        index_name = unique_index_name(table)
+        cursor.execute("""
+            SELECT i.indisvalid
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+        """, (index_name,))
+        row = cursor.fetchone()
+        usable = bool(row and row[0])
+        if not usable:
+            print(f"Warning: unique index {index_name} is missing or invalid - checking registry numbers "
+                  f"before each save. Run dbase_scripts/add_reg_no_unique_indexes.py to add it.")
+        self._unique_index[table] = (usable, time.monotonic())
+        return usable
+
+    def _check_duplicates(self, cursor, jobs):
+        """{path: DuplicateRegNoError} for jobs whose registry number is taken (no unique index)."""
+        rejected = {}
+        claimed = {}  # (year, normalized reg_no) -> earlier job of this batch
+        for job in jobs:
+            reg_no = normalize_reg_no(job.row.get("reg_no"))
+            date_of_reg = job.row.get("date_of_reg")
+            if reg_no is None or date_of_reg is None:
+                continue
+            earlier = claimed.get((date_of_reg.year, reg_no))
+            if earlier is not None:
+                rejected[job.file_path] = DuplicateRegNoError(
+                    job.row["reg_no"], earlier.file_path, [earlier.row.get(c) for c in job.label_columns])
+                continue
+            cursor.execute(f"""
+                SELECT file_path, {", ".join(job.label_columns)} FROM {job.table}
+                WHERE date_of_reg >= %s AND date_of_reg <= %s AND file_path <> %s
+                  AND {_NORMALIZED_REG_NO} = %s
+                LIMIT 1
+            """, (date(date_of_reg.year, 1, 1), date(date_of_reg.year, 12, 31), job.file_path, reg_no))
+            row = cursor.fetchone()
+            if row is not None:
+                rejected[job.file_path] = DuplicateRegNoError(job.row["reg_no"], row[0], row[1:])
+            else:
+                claimed[(date_of_reg.year, reg_no)] = job
+        return rejected
+
+    def _duplicate_of(self, cursor, job):
+        """DuplicateRegNoError naming the record that holds job's registry number."""
+        cursor.execute(f"""
+            SELECT file_path, {", ".join(job.label_columns)} FROM {job.table}
+            WHERE EXTRACT(YEAR FROM date_of_reg) = EXTRACT(YEAR FROM %s::date)
+              AND normalize_reg_no(reg_no) = normalize_reg_no(%s)
+              AND file_path <> %s
+            LIMIT 1
+        """, (job.row.get("date_of_reg"), job.row.get("reg_no"), job.file_path))
+        row = cursor.fetchone()
+        cursor.connection.rollback()
+        if row is None:  # the other record changed in the meantime
+            return DuplicateRegNoError(job.row.get("reg_no"), "", [None] * len(job.label_columns))
+        return DuplicateRegNoError(job.row.get("reg_no"), row[0], row[1:])
+
+    def _fail(self, jobs, error):
+        with self._lock:
+            self._stats['failed'] += len({job.file_path for job in jobs})
+            self._stats['last_error'] = str(error)
+        for job in jobs:
+            self._done(job, None, error)
+
+    def _done(self, job, row, error):
+        if job.on_done is None:
+            return
+        try:
+            job.on_done(job, row, error)
+        except Exception as e:
+            print(f"Save callback failed: {str(e)}")
+
+
+_queue: Optional[SaveQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_save_queue() -> SaveQueue:
+    """Return the process-wide save queue, starting it on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = SaveQueue()
+    return _queue
+
+
+def flush_save_queue(timeout=5.0):
+    """Wait for queued saves (without starting the queue). Returns the number still pending."""
+    save_queue = _queue
+    if save_queue is None:
+        return 0
+    save_queue.flush(timeout)
+    return save_queue.pending()
+
+
+def shutdown_save_queue(timeout=5.0):
+    """Write pending saves and stop the worker; called once on application exit."""
+    global _queue
+    with _queue_lock:
+        if _queue is not None:
+            _queue.stop(timeout)
+            _queue = None
@@ -1,5 +1,6 @@
 import sys
 import os
+import time
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import requests
@@ -18,7 +19,9 @@ from Search_Birth_Window import Ui_SearchBirthWindow
 from Search_Death_Window import Ui_SearchDeathWindow
 from Search_Marriage_Window import Ui_SearchMarriageWindow
 from audit_logger import AuditLogger
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
+from token_index import get_token_index
+from search_worker import FilenameSearchWorker
 
 from stylesheets import search_button_style, everify_button_style, button_style, message_box_style
 
@@ -103,6 +106,8 @@ class SearchWindowBase(QMainWindow):
                 background-color: #fef2f4;
             }
         """)
+        # Leaving the year empty searches every year folder
+        self.ui.regyear_textEdit.setPlaceholderText("All years")
         self.ui.search_by_comboBox.setFixedWidth(100)
         self.ui.search_by_comboBox.setStyleSheet("""
             QComboBox {
@@ -148,10 +153,26 @@ class SearchWindowBase(QMainWindow):
         
         # List for found PDFs
         self.found_pdfs = []
+
+        # In-flight background filename search (see search_worker)
+        self.search_worker = None
+        self.search_id = 0
+        self.search_params = {}
         
         # Open file on double-click
         self.ui.results_list.itemDoubleClicked.connect(self.open_selected_file)
 
+        # Filter name results live as the clerk types, from the in-memory
+        # token index (built in the background on first use); the filter runs
+        # once typing pauses, not on every keystroke
+        self.live_search_timer = QTimer(self)
+        self.live_search_timer.setSingleShot(True)
+        self.live_search_timer.setInterval(self.LIVE_SEARCH_DELAY_MS)
+        self.live_search_timer.timeout.connect(self.live_search)
+        self.ui.search_textEdit.textChanged.connect(lambda _: self.live_search_timer.start())
+        self.ui.regyear_textEdit.textChanged.connect(lambda _: self.live_search_timer.start())
+        get_token_index(self.search_path)
+
         # Add eVerify button
         self.ui.everify_button.setIcon(QIcon("icons/everify-icon.png"))
         self.ui.everify_button.setIconSize(QSize(130, 40))
@@ -169,8 +190,7 @@ class SearchWindowBase(QMainWindow):
     def create_connection(self):
         try:
             if self.connection is None:
-                self.connection = psycopg2.connect(**POSTGRES_CONFIG)
-                self.connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                self.connection = get_connection(owner=self.__class__.__name__)
             return self.connection
         except psycopg2.Error as e:
             print(f"Error connecting to database: {str(e)}")
@@ -178,10 +198,7 @@ class SearchWindowBase(QMainWindow):
 
     def closeConnection(self):
         if self.connection:
-            try:
-                self.connection.close()
-            except:
-                pass  # Ignore close errors
+            release_connection(self.connection)
             self.connection = None
     
     def open_form_file(self):
@@ -275,7 +292,8 @@ class SearchWindowBase(QMainWindow):
             self.closeConnection()
     
     def open_selected_file(self, item):
-        regyear = self.ui.regyear_textEdit.text().strip()
+        # All-years results carry their own year folder
+        regyear = item.data(Qt.UserRole) or self.ui.regyear_textEdit.text().strip()
         if not regyear:
             # QMessageBox.warning(self, "Error", "Please enter a registration year before opening a file.")
             box = QMessageBox(self)
@@ -286,7 +304,8 @@ class SearchWindowBase(QMainWindow):
             box.setStyleSheet(message_box_style)
             box.exec()
             return
-        file_path = os.path.join(self.search_path, regyear, item.text())
+        file_name = item.data(Qt.UserRole + 1) or item.text()
+        file_path = os.path.join(self.search_path, regyear, file_name)
         conn = self.create_connection()
         try:
             os.startfile(file_path)
@@ -294,7 +313,7 @@ class SearchWindowBase(QMainWindow):
                 conn,
                 self.current_user,
                 "FILE_OPENED",
-                {"file": item.text(), "path": file_path}
+                {"file": file_name, "path": file_path}
             )
             conn.commit()
         except FileNotFoundError:
@@ -319,7 +338,7 @@ class SearchWindowBase(QMainWindow):
                 conn,
                 self.current_user,
                 "FILE_OPEN_ERROR",
-                {"error": str(e), "file": item.text()}
+                {"error": str(e), "file": file_name}
             )
             conn.commit()
         finally:
@@ -356,6 +375,8 @@ class SearchWindowBase(QMainWindow):
             self.closeConnection()
     def search_pdfs(self):
         print(f"DEBUG - Current user during search: {self.current_user}")
+        self.live_search_timer.stop()
+        self.cancel_search()
         self.ui.results_list.clear()
         query = self.ui.search_textEdit.text().strip()
         folder = os.path.join(self.search_path, self.ui.regyear_textEdit.text().strip())
@@ -379,58 +400,150 @@ class SearchWindowBase(QMainWindow):
             )
             conn.commit()
 
-            if not folder or not os.path.exists(folder):
+            if not query:
                 AuditLogger.log_action(
                     conn,
                     self.current_user,
                     "SEARCH_ERROR",
-                    {"error": "Invalid folder path", "year": search_year}
+                    {"error": "Empty search query"}
                 )
                 conn.commit()
-                # QMessageBox.warning(self, "Warning", "Cannot find location. Please check the year.")
+                # QMessageBox.warning(self, "Warning", "Please enter a name or date to search.")
                 box = QMessageBox(self)
                 box.setIcon(QMessageBox.Warning)
                 box.setWindowTitle("Warning")
-                box.setText("Cannot find location. Please check the year.")
+                box.setText("Please enter a name or date to search.")
                 box.setStandardButtons(QMessageBox.Ok)
                 box.setStyleSheet(message_box_style)
                 box.exec()
                 return
-            if not query:
+
+            # Catalog refresh and matching run on the thread pool; results
+            # arrive through on_search_chunk / on_search_finished
+            self.search_id += 1
+            worker = FilenameSearchWorker(self.search_id, self.search_path, search_year, search_type, query)
+            worker.signals.progress.connect(self.on_search_progress)
+            worker.signals.chunk.connect(self.on_search_chunk)
+            worker.signals.finished.connect(self.on_search_finished)
+            worker.signals.failed.connect(self.on_search_failed)
+            self.search_worker = worker
+            self.search_params = {"type": search_type, "query": query, "year": search_year}
+            self.ui.status_label.setText("Searching...")
+            QThreadPool.globalInstance().start(worker)
+        except Exception as e:
+            self.cancel_search()
+            self.ui.status_label.clear()
+            try:
                 AuditLogger.log_action(
                     conn,
                     self.current_user,
                     "SEARCH_ERROR",
-                    {"error": "Empty search query"}
+                    {
+                        "error": str(e),
+                        "type": self.ui.search_by_comboBox.currentText(),
+                        "query": query,
+                        "year": self.ui.regyear_textEdit.text().strip()
+                    }
                 )
                 conn.commit()
-                # QMessageBox.warning(self, "Warning", "Please enter a name or date to search.")
+            except Exception as log_error:
+                print(f"Failed to log search error: {str(log_error)}")
+            # QMessageBox.critical(self, "Error", f"An error occurred during search: {str(e)}")
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Critical)
+            box.setWindowTitle("Error")
+            box.setText(f"An error occurred during search: {str(e)}")
+            box.setStandardButtons(QMessageBox.Ok)
+            box.setStyleSheet(message_box_style)
+            box.exec()
+        finally:
+            self.closeConnection()
+
+    def cancel_search(self):
+        """Stop the in-flight filename search, if any; its late signals are ignored."""
+        if self.search_worker is not None:
+            self.search_worker.cancel()
+            self.search_worker = None
+            self.search_id += 1
+
+    def on_search_progress(self, search_id, message):
+        if search_id == self.search_id:
+            self.ui.status_label.setText(message)
+
+    def on_search_chunk(self, search_id, pdf_files):
+        if search_id != self.search_id:
+            return
+        self.add_result_items(pdf_files, label_years=not self.search_params["year"])
+        self.ui.status_label.setText(f"Searching... {len(self.found_pdfs)} files found.")
+
+    def add_result_items(self, pdf_files, label_years):
+        """Append (year, name) matches; all-years results show their year."""
+        for year, name in pdf_files:
+            item = QListWidgetItem(f"{name}  [{year}]" if label_years and year else name)
+            item.setData(Qt.UserRole, year)
+            item.setData(Qt.UserRole + 1, name)
+            self.ui.results_list.addItem(item)
+            self.found_pdfs.append(name)
+
+    def on_search_finished(self, search_id, summary):
+        params = {"type": summary['type'], "query": summary['query'], "year": summary['year']}
+        if summary['cancelled']:
+            # Superseded by a newer search or closed window; only record it
+            conn = self.create_connection()
+            try:
+                AuditLogger.log_action(
+                    conn,
+                    self.current_user,
+                    "SEARCH_CANCELLED",
+                    {**params, "elapsed_ms": summary['elapsed_ms']}
+                )
+                conn.commit()
+            finally:
+                self.closeConnection()
+            return
+        if search_id != self.search_id:
+            return
+        self.search_worker = None
+        conn = self.create_connection()
+        try:
+            if summary['missing']:
+                self.ui.status_label.clear()
+                AuditLogger.log_action(
+                    conn,
+                    self.current_user,
+                    "SEARCH_ERROR",
+                    {"error": "Invalid folder path", "year": params["year"], "elapsed_ms": summary['elapsed_ms']}
+                )
+                conn.commit()
+                # QMessageBox.warning(self, "Warning", "Cannot find location. Please check the year.")
                 box = QMessageBox(self)
                 box.setIcon(QMessageBox.Warning)
                 box.setWindowTitle("Warning")
-                box.setText("Please enter a name or date to search.")
+                box.setText("Cannot find location. Please check the year.")
                 box.setStandardButtons(QMessageBox.Ok)
                 box.setStyleSheet(message_box_style)
                 box.exec()
-                return
-            search_method = self.find_pdfs_name if search_type in ["Name", "Reg No."] else self.find_pdfs_date
-            pdf_files = search_method(folder, query)
-
-            if pdf_files:
-                self.ui.results_list.addItems(pdf_files)
-                self.found_pdfs.extend(pdf_files)
-                self.ui.status_label.setText(f"Found {len(self.found_pdfs)} files.")
+            elif summary['count']:
+                if summary['capped']:
+                    self.ui.status_label.setText(
+                        f"Showing first {summary['count']} files across all years - enter a year to narrow the search.")
+                else:
+                    self.ui.status_label.setText(
+                        f"Found {len(self.found_pdfs)} files ({summary['elapsed_ms']} ms).")
                 AuditLogger.log_action(
                     conn,
                     self.current_user,
                     "SEARCH_COMPLETED",
                     {
-                        "result_count": len(pdf_files),
-                        "type": search_type,
-                        "year": search_year
+                        "result_count": summary['count'],
+                        "type": params["type"],
+                        "year": params["year"] or "all",
+                        "capped": summary['capped'],
+                        "elapsed_ms": summary['elapsed_ms']
                     }
                 )
             else:
+                self.ui.status_label.clear()
                 # QMessageBox.information(self, "No Results", "No PDF files found.")
                 box = QMessageBox(self)
                 box.setIcon(QMessageBox.Information)
@@ -443,107 +556,70 @@ class SearchWindowBase(QMainWindow):
                     conn,
                     self.current_user,
                     "SEARCH_NO_RESULTS",
-                    {
-                        "type": search_type,
-                        "query": query,
-                        "year": search_year
-                    }
+                    {**params, "elapsed_ms": summary['elapsed_ms']}
                 )
             conn.commit()
-        except Exception as e:
+        finally:
+            self.closeConnection()
+
+    def on_search_failed(self, search_id, error):
+        if search_id != self.search_id:
+            return
+        self.search_worker = None
+        self.ui.status_label.clear()
+        conn = self.create_connection()
+        try:
             AuditLogger.log_action(
                 conn,
                 self.current_user,
                 "SEARCH_ERROR",
-                {
-                    "error": str(e),
-                    "type": self.ui.search_by_comboBox.currentText(),
-                    "query": query,
-                    "year": self.ui.regyear_textEdit.text().strip()
-                }
+                {"error": error, **self.search_params}
             )
             conn.commit()
-            # QMessageBox.critical(self, "Error", f"An error occurred during search: {str(e)}")
-            box = QMessageBox(self)
-            box.setIcon(QMessageBox.Critical)
-            box.setWindowTitle("Error")
-            box.setText(f"An error occurred during search: {str(e)}")
-            box.setStandardButtons(QMessageBox.Ok)
-            box.setStyleSheet(message_box_style)
-            box.exec()
         finally:
             self.closeConnection()
-    
-    def find_pdfs_name(self, folder, query):
-        pdf_files = []
-        search_terms = [term.strip().lower() for term in query.split(" ")]
-        try:
-            for root, _, files in os.walk(folder):
-                for file in files:
-                    if file.lower().endswith('.pdf') and all(term in file.lower() for term in search_terms):
-                        pdf_files.append(file)
-        except Exception as e:
-            conn = self.create_connection()
-            try:
-                AuditLogger.log_action(
-                    conn,
-                    self.current_user,
-                    "SEARCH_ERROR",
-                    {
-                        "method": "name_search",
-                        "error": str(e),
-                        "folder": folder,
-                        "query": query
-                    }
-                )
-                conn.commit()
-            finally:
-                self.closeConnection()
-            # QMessageBox.critical(self, "Error", f"An error occurred while searching: {str(e)}")
-            box = QMessageBox(self)
-            box.setIcon(QMessageBox.Critical)
-            box.setWindowTitle("Error")
-            box.setText(f"An error occurred while searching: {str(e)}")
-            box.setStandardButtons(QMessageBox.Ok)
-            box.setStyleSheet(message_box_style)
-            box.exec()
-        return pdf_files
+        # QMessageBox.critical(self, "Error", f"An error occurred during search: {str(e)}")
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Critical)
+        box.setWindowTitle("Error")
+        box.setText(f"An error occurred during search: {error}")
+        box.setStandardButtons(QMessageBox.Ok)
+        box.setStyleSheet(message_box_style)
+        box.exec()
+
+    LIVE_RESULT_LIMIT = 500  # rows shown while typing; the Search button lists everything
+    LIVE_SEARCH_DELAY_MS = 150  # pause in typing before the live filter runs
+    LIVE_MIN_CHARS = 3  # shorter queries match most of the archive; use the Search button
+
+    def live_search(self):
+        """Filter the results list once typing pauses (Name search only)."""
+        if self.ui.search_by_comboBox.currentText() != "Name":
+            return
+        self.cancel_search()
+        query = self.ui.search_textEdit.text().strip()
+        if len(query) < self.LIVE_MIN_CHARS:
+            self.ui.results_list.clear()
+            self.found_pdfs.clear()
+            self.ui.status_label.clear()
+            return
+        index = get_token_index(self.search_path)
+        if index is None:
+            self.ui.status_label.setText("Indexing archive...")
+            return
+
+        year = self.ui.regyear_textEdit.text().strip()
+        started = time.perf_counter()
+        pdf_files = index.search(query, year, limit=self.LIVE_RESULT_LIMIT, with_years=True)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.ui.results_list.clear()
+        self.found_pdfs = []
+        self.add_result_items(pdf_files, label_years=not year)
+        if len(pdf_files) >= self.LIVE_RESULT_LIMIT:
+            self.ui.status_label.setText(f"Showing first {len(pdf_files)} files ({elapsed_ms:.0f} ms).")
+        else:
+            self.ui.status_label.setText(f"Found {len(pdf_files)} files ({elapsed_ms:.0f} ms).")
 
-    def find_pdfs_date(self, folder, query):
-        pdf_files = []
-        try:
-            for root, _, files in os.walk(folder):
-                for file in files:
-                    if file.lower().endswith('.pdf') and query.lower() in file.lower():
-                        pdf_files.append(file)
-        except Exception as e:
-            conn = self.create_connection()
-            try:
-                AuditLogger.log_action(
-                    conn,
-                    self.current_user,
-                    "SEARCH_ERROR",
-                    {
-                        "method": "date_search",
-                        "error": str(e),
-                        "folder": folder,
-                        "query": query
-                    }
-                )
-                conn.commit()
-            finally:
-                self.closeConnection()
-            # QMessageBox.critical(self, "Error", f"An error occurred while searching: {str(e)}")
-            box = QMessageBox(self)
-            box.setIcon(QMessageBox.Critical)
-            box.setWindowTitle("Error")
-            box.setText(f"An error occurred while searching: {str(e)}")
-            box.setStandardButtons(QMessageBox.Ok)
-            box.setStyleSheet(message_box_style)
-            box.exec()
-        return pdf_files
-    
-    
     def start_everify_flow(self):
         conn = self.create_connection()
         try:
@@ -627,6 +703,7 @@ class SearchWindowBase(QMainWindow):
             self.closeConnection()
 
     def closeEvent(self, event):
+        self.cancel_search()
         conn = self.create_connection()
         try:
             AuditLogger.log_action(
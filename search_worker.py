@@ -0,0 +1,182 @@
+"""Filename search for the Search windows, run on a QThreadPool worker.
+
+``search_pdfs`` used to refresh the file catalog and query it on the Qt main
+thread; while a year folder was being listed over SMB the window showed
+"Not Responding". ``FilenameSearchWorker`` does that work on the global
+thread pool instead and reports back through ``FilenameSearchSignals``:
+
+    progress(search_id, message)   - refresh / search status text
+    chunk(search_id, names)        - matches, in chunks of CHUNK_SIZE
+    finished(search_id, summary)   - count, elapsed_ms, missing, cancelled,
+                                     plus the search's type, query and year
+    failed(search_id, error)
+
+Every search carries an id; a window starting a new search cancels the
+previous worker and ignores signals whose id is no longer current.
+
+Chunks are lists of (year, name) pairs. With no registration year the
+search runs in "all years" mode: the year subfolders of the registry are
+refreshed and matched one at a time, newest first, so the first matches show
+while older years are still unlisted; the search stops, without listing the
+remaining years, once ALL_YEARS_RESULT_CAP files were found or it is cancelled.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from archive_scanner import get_scanner
+from date_query import parse_date_query
+from file_catalog import get_catalog
+from token_index import get_token_index
+
+CHUNK_SIZE = 200  # names per chunk signal
+ALL_YEARS_RESULT_CAP = 1000  # stop an all-years search after this many files
+
+
+class FilenameSearchSignals(QObject):
+    progress = Signal(int, str)
+    chunk = Signal(int, list)
+    finished = Signal(int, dict)
+    failed = Signal(int, str)
+
+
+class FilenameSearchWorker(QRunnable):
+    """Refresh the catalog for root/year and stream the matching file names."""
+
+    def __init__(self, search_id, root, year, search_type, query):
+        super().__init__()
+        self.search_id = search_id
+        self.root = root
+        self.year = year
+        self.search_type = search_type
+        self.query = query
+        self.signals = FilenameSearchSignals()
+        self._cancelled = threading.Event()
+        self._stale_years = None  # all-years mode: year folders to refresh while matching
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        started = time.perf_counter()
+        summary = {'count': 0, 'missing': False, 'cancelled': False, 'capped': False,
+                   'type': self.search_type, 'query': self.query, 'year': self.year}
+        try:
+            missing = self._refresh()
+            if self.is_cancelled():
+                summary['cancelled'] = True
+            elif missing:
+                summary['missing'] = True
+            else:
+                self.signals.progress.emit(self.search_id, "Searching...")
+                for pairs in self._match():
+                    if self.is_cancelled():
+                        summary['cancelled'] = True
+                        break
+                    if not self.year and summary['count'] + len(pairs) >= ALL_YEARS_RESULT_CAP:
+                        pairs = pairs[:ALL_YEARS_RESULT_CAP - summary['count']]
+                        summary['capped'] = True
+                    self.signals.chunk.emit(self.search_id, pairs)
+                    summary['count'] += len(pairs)
+                    if summary['capped']:
+                        break
+                if self.is_cancelled() and not summary['capped']:
+                    summary['cancelled'] = True
+        except Exception as e:
+            print(f"Filename search failed: {str(e)}")
+            self.signals.failed.emit(self.search_id, str(e))
+            return
+        summary['elapsed_ms'] = round((time.perf_counter() - started) * 1000)
+        self.signals.finished.emit(self.search_id, summary)
+
+    def _refresh(self):
+        """Bring the catalog up to date; returns True when the folder does not exist."""
+        catalog = get_catalog()
+        scanner = get_scanner()
+        # The background archive scanner keeps the catalog fresh once it has
+        # covered this registry, so the search can skip the share entirely.
+        if scanner is not None and scanner.has_scanned(self.root):
+            return not catalog.has_year(self.root, self.year)
+        if not self.year:
+            return self._list_years(catalog)
+        self.signals.progress.emit(self.search_id, "Checking archive folders...")
+        try:
+            return bool(catalog.refresh(self.root, self.year, should_stop=self.is_cancelled)['missing'])
+        except OSError as e:
+            # Share unreachable: answer from what the catalog already knows
+            print(f"File catalog refresh failed: {str(e)}")
+            return not catalog.has_year(self.root, self.year)
+
+    def _list_years(self, catalog):
+        """List the year folders to refresh during the match; returns True when the registry is missing."""
+        self.signals.progress.emit(self.search_id, "Listing year folders...")
+        try:
+            with os.scandir(self.root) as entries:
+                self._stale_years = sorted((entry.name for entry in entries if entry.is_dir()), reverse=True)
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            print(f"File catalog refresh failed: {str(e)}")
+            return not catalog.years(self.root)
+        return False
+
+    def _match(self):
+        """Yield lists of (year, name) matches, at most CHUNK_SIZE long."""
+        date_query = parse_date_query(self.query) if self.search_type == "Date" else None
+        if self._stale_years is not None:
+            yield from self._match_year_by_year(self._stale_years, date_query)
+            return
+        if self.search_type == "Name":
+            index = get_token_index(self.root, current=True)
+            if index is not None:
+                yield from _chunks(index.search(self.query, self.year, with_years=True))
+                return
+        catalog = get_catalog()
+        for year in ([self.year] if self.year else [y for y in catalog.years(self.root) if y]):
+            yield from _chunks(self._year_matches(catalog, year, date_query))
+
+    def _match_year_by_year(self, years, date_query):
+        """Refresh each year folder, newest first, and yield its matches before listing the next."""
+        catalog = get_catalog()
+        for done, year in enumerate(years, 1):
+            if self.is_cancelled():
+                return
+            self.signals.progress.emit(self.search_id, f"Searching year folders... {done}/{len(years)}")
+            try:
+                catalog.refresh(self.root, year, should_stop=self.is_cancelled)
+            except OSError as e:
+                # Unreachable year folder: match what the catalog already knows
+                print(f"File catalog refresh failed: {str(e)}")
+            if self.is_cancelled():
+                return
+            yield from _chunks(self._year_matches(catalog, year, date_query))
+
+    def _year_matches(self, catalog, year, date_query):
+        """(year, name) pairs of the catalogued files in one year folder that match."""
+        if self.search_type == "Name":
+            names = catalog.search_terms(self.root, year, self.query)
+        else:
+            # Indexed lookup on the parsed date / registry number; names the
+            # parser could not read are still found by a verbatim match.
+            if self.search_type == "Reg No.":
+                names = catalog.search_reg_no(self.root, year, self.query)
+            elif date_query is not None:
+                names = catalog.search_date(self.root, year, date_query)
+            else:
+                names = []
+            if not names:
+                names = catalog.search_substring(self.root, year, self.query)
+        return [(year, name) for name in names]
+
+
+def _chunks(pairs):
+    for offset in range(0, len(pairs), CHUNK_SIZE):
+        yield pairs[offset:offset + CHUNK_SIZE]
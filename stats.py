@@ -11,7 +11,7 @@ from PySide6.QtCore import Qt, QDate, QSize
 from PySide6.QtGui import QPixmap, QImage, QIcon
 from stylesheets import button_style, date_picker_style
 from audit_logger import AuditLogger
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
 
 
 
@@ -37,16 +37,12 @@ class StatisticsWindow(QWidget):
 
     def create_connection(self):
         if self.connection is None:
-            self.connection = psycopg2.connect(**POSTGRES_CONFIG)
-            self.connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            self.connection = get_connection(owner=self.__class__.__name__)
         return self.connection
 
     def closeConnection(self):
         if self.connection:
-            try:
-                self.connection.close()
-            except Exception:
-                pass
+            release_connection(self.connection)
             self.connection = None
 
     def init_ui(self):
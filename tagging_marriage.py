@@ -2,6 +2,7 @@ import os
 import re
 import subprocess
 import sys
+import time
 import pymupdf  
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
@@ -9,7 +10,7 @@ from matplotlib.backends.backend_pdf import PdfPages
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from PySide6.QtWidgets import *
-from PySide6.QtCore import Qt, QDate, QSize, QUrl, QSettings
+from PySide6.QtCore import Qt, QDate, QSize, QUrl, QSettings, Signal, QTimer
 from PySide6.QtGui import QPixmap, QImage, QIcon, QShortcut, QKeySequence
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from stylesheets import button_style, date_picker_style, combo_box_style, message_box_style
@@ -17,10 +18,30 @@ from pdfviewer import PDFViewer
 from audit_logger import AuditLogger
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
+from archive_scanner import list_pdf_names
+from pdf_list_model import PdfListModel
+from save_queue import SaveJob, DuplicateRegNoError, get_save_queue
+from save_error_tray import SaveErrorTray
+from reg_no_index import RegNoIndex, year_from_path
+from work_queue import WorkQueue, CLAIM_BATCH, LEASE_MINUTES
+from path_utils import canonical_path
+from name_keys import name_keys
 
 
 class MarriageTaggingWindow(QWidget):
+    save_done = Signal(object, object, object)  # SaveJob, stored row, error
+    LOOKAHEAD = 3  # files after the current one rendered in the background
+
+    # Columns of a tag row, in the order load_existing_tags unpacks them
+    TAG_COLUMNS = """
+        husband_name, wife_name, date_of_marriage, page_no, book_no, reg_no,
+        husband_age, wife_age, husb_nationality, wife_nationality,
+        husb_civil_status, wife_civil_status, husb_mother, wife_mother,
+        husb_father, wife_father, date_of_reg, place_of_marriage,
+        ceremony_type, late_registration
+    """
+
     def __init__(self, username, parent=None):
         super().__init__(parent)
         self.current_user = username
@@ -74,18 +95,34 @@ class MarriageTaggingWindow(QWidget):
         self.last_date_of_marriage = None
         self.settings = QSettings("OCCR", "RVS")
         self.pending_select_pdf = None
+        # Tag rows of the listed folder, fetched in one query (see prefetch_tags)
+        self.tag_rows = {}
+        self.tag_scope = set()
+        # Registry numbers of the folder's year, for validate_reg_no
+        self.reg_no_index = RegNoIndex()
+        # Files of the folder shared out between clerks (see work_queue.py)
+        self.work_queue = WorkQueue("marriage_index", self.current_user)
+        self.current_folder = None
+        self.lease_timer = QTimer(self)
+        self.lease_timer.setInterval(LEASE_MINUTES * 60 * 1000 // 3)
+        self.lease_timer.timeout.connect(self.renew_claims)
+
+        self.save_done.connect(self.on_save_done)
+        self.save_error_tray = SaveErrorTray("Marriage Tagging - Failed Saves", self)
+        self.save_error_tray.open_requested.connect(self.select_file)
 
         self.init_ui()
+        self.reg_no_input.textChanged.connect(self.validate_reg_no)
+        self.date_of_reg_input.dateChanged.connect(self.validate_reg_no)
     
     def create_connection(self):
         if self.connection is None:
-            self.connection = psycopg2.connect(**POSTGRES_CONFIG)
-            self.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            self.connection = get_connection(owner=self.__class__.__name__)
         return self.connection
 
     def closeConnection(self):
         if self.connection:
-            self.connection.close()
+            release_connection(self.connection)
             self.connection = None
 
     def init_ui(self):
@@ -97,7 +134,18 @@ class MarriageTaggingWindow(QWidget):
         self.folder_button.setStyleSheet(button_style)
         self.folder_button.setFixedWidth(130)
         self.folder_button.clicked.connect(self.select_folder)
-        main_layout.addWidget(self.folder_button)
+
+        # Reserve the next untagged files so other clerks skip them
+        self.claim_button = QPushButton(f"Assign Me Next {CLAIM_BATCH}")
+        self.claim_button.setStyleSheet(button_style)
+        self.claim_button.setToolTip("Reserve the next untagged files of this folder for you")
+        self.claim_button.clicked.connect(self.claim_next_files)
+
+        folder_row = QHBoxLayout()
+        folder_row.addWidget(self.folder_button)
+        folder_row.addWidget(self.claim_button)
+        folder_row.addStretch()
+        main_layout.addLayout(folder_row)
 
         # Create a scroll area for the form
         scroll_area = QScrollArea()
@@ -139,6 +187,12 @@ class MarriageTaggingWindow(QWidget):
         self.reg_no_input.setFixedWidth(220)
         reg_no_container.addWidget(QLabel("Registry No.:"))
         reg_no_container.addWidget(self.reg_no_input)
+        self.reg_no_warning = QLabel()
+        self.reg_no_warning.setStyleSheet("color: #c0392b;")
+        self.reg_no_warning.setFixedWidth(220)
+        self.reg_no_warning.setWordWrap(True)
+        self.reg_no_warning.hide()
+        reg_no_container.addWidget(self.reg_no_warning)
         reg_info_layout.addLayout(reg_no_container)
         form_layout.addLayout(reg_info_layout)
 
@@ -412,30 +466,33 @@ class MarriageTaggingWindow(QWidget):
         main_layout.addLayout(button_layout)
 
         # PDF List Preview
-        self.pdf_list = QListWidget()
+        self.pdf_model = PdfListModel(self)
+        self.pdf_list = QListView()
+        self.pdf_list.setModel(self.pdf_model)
+        self.pdf_list.setUniformItemSizes(True)
         self.pdf_list.setFixedWidth(750)
         self.pdf_list.setIconSize(QSize(100, 140))
-        self.pdf_list.itemClicked.connect(self.show_preview)
+        self.pdf_list.clicked.connect(self.show_preview)
         self.pdf_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #FFFFFF;
                 color: #212121;
             }
-            QListWidget::item {
+            QListView::item {
                 background-color: #FFFFFF;
                 color: #212121;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: #e0446a;
                 color: #FFFFFF;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #ce305e;
                 color: #FFFFFF;
             }
         """)
 
-        self.pdf_list.currentItemChanged.connect(self.show_preview)
+        self.pdf_list.selectionModel().currentChanged.connect(self.show_preview)
         main_layout.addWidget(self.pdf_list)
 
         # PDF Viewer Section
@@ -486,11 +543,10 @@ class MarriageTaggingWindow(QWidget):
             self.closeConnection()
 
     def load_pdfs(self, folder_path, selected_file_path=None):
-        """Loads PDFs from a folder and generates thumbnails. Optionally selects a file."""
+        """Lists the PDFs of a folder; thumbnails load lazily for visible rows. Optionally selects a file."""
         conn = self.create_connection()
-        progress = None
         try:
-            self.pdf_list.clear()
+            self.pdf_model.clear()
             if not os.path.exists(folder_path):
                 AuditLogger.log_action(
                     conn,
@@ -502,53 +558,31 @@ class MarriageTaggingWindow(QWidget):
                 QMessageBox.warning(self, "Error", f"Folder not found: {folder_path}")
                 return
             
-            # Show loading progress
-            progress = QProgressDialog("Loading PDFs...", None, 0, 0, self)
-            progress.setWindowModality(Qt.WindowModal)
-            progress.setWindowTitle("Loading")
-            progress.setCancelButton(None)  # Remove cancel button
-            progress.show()
-            QApplication.processEvents()
-            
-            pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith(".pdf")]
+            pdf_files = list_pdf_names(folder_path)
             pdf_files.sort(key=self.natural_sort_key)
-            
-            failed_files = []
-            for filename in pdf_files:
-                try:
-                    file_path = os.path.join(folder_path, filename)
-                    thumbnail = self.generate_thumbnail(file_path)
-                    
-                    item = QListWidgetItem(QIcon(thumbnail), filename)
-                    item.setSizeHint(QSize(0, 40))
-                    item.setData(Qt.UserRole, file_path)
-                    self.pdf_list.addItem(item)
-                except Exception as e:
-                    failed_files.append((filename, str(e)))
-                    continue
-            
-            if failed_files:
-                error_msg = "Failed to load some PDFs:\n\n"
-                for filename, error in failed_files:
-                    error_msg += f"{filename}: {error}\n"
-                QMessageBox.warning(self, "Warning", error_msg)
+            file_paths = [os.path.join(folder_path, filename) for filename in pdf_files]
+            self.pdf_model.set_files(file_paths)
+            self.prefetch_tags(conn, file_paths)
+            self.load_reg_nos(conn, folder_path)
+            self.register_folder_claims(conn, folder_path, file_paths)
             
             AuditLogger.log_action(
                 conn,
                 self.current_user,
                 "PDFS_LOADED",
-                {"folder": folder_path, "count": len(pdf_files), "failed": len(failed_files)}
+                {"folder": folder_path, "count": len(pdf_files)}
             )
             conn.commit()
+
             # auto-select previously selected file if provided
             target = selected_file_path or self.pending_select_pdf
             if target:
-                for i in range(self.pdf_list.count()):
-                    item = self.pdf_list.item(i)
-                    if item.data(Qt.UserRole) == target:
-                        self.pdf_list.setCurrentItem(item)
-                        self.show_preview(item)
-                        break
+                row = self.pdf_model.row_of(target)
+                if row >= 0:
+                    index = self.pdf_model.index(row)
+                    # currentChanged loads the preview
+                    self.pdf_list.setCurrentIndex(index)
+                    self.pdf_list.scrollTo(index)
                 self.pending_select_pdf = None
             
         except Exception as e:
@@ -561,11 +595,140 @@ class MarriageTaggingWindow(QWidget):
             conn.commit()
             QMessageBox.critical(self, "Error", f"Failed to load PDFs: {str(e)}")
         finally:
-            if progress:
-                progress.close()
-                progress.deleteLater()  # Ensure the dialog is properly destroyed
             self.closeConnection()
 
+    def fetch_tag_rows(self, cursor, file_paths):
+        """Map file_path -> tag row (TAG_COLUMNS order) for the given PDFs."""
+        cursor.execute(
+            f"SELECT file_path, {self.TAG_COLUMNS} FROM marriage_index WHERE file_path = ANY(%s)",
+            (list(file_paths),)
+        )
+        return {row[0]: row[1:] for row in cursor.fetchall()}
+
+    def prefetch_tags(self, conn, file_paths):
+        """Load the tags of every listed PDF with one query and badge the tagged ones."""
+        self.tag_rows = {}
+        self.tag_scope = set()
+        cursor = conn.cursor()
+        try:
+            self.tag_rows = self.fetch_tag_rows(cursor, file_paths)
+            self.tag_scope = set(file_paths)
+        except psycopg2.Error as e:
+            # Fall back to one query per previewed file
+            print(f"Failed to prefetch tags: {str(e)}")
+            conn.rollback()
+        finally:
+            cursor.close()
+        self.pdf_model.set_tagged(self.tag_rows.keys() if self.tag_scope else None)
+
+    def load_reg_nos(self, conn, folder_path):
+        """Load the registry numbers of the folder's year with one query."""
+        year = year_from_path(folder_path)
+        self.reg_no_index = RegNoIndex(year)
+        if year is not None:
+            cursor = conn.cursor()
+            try:
+                self.reg_no_index = RegNoIndex.load(cursor, "marriage_index", year)
+            except psycopg2.Error as e:
+                print(f"Failed to load registry numbers: {str(e)}")
+                conn.rollback()
+            finally:
+                cursor.close()
+        self.validate_reg_no()
+
+    def reg_no_conflict(self):
+        """File already using the typed registry number, from memory; None if unknown or free."""
+        if self.reg_no_index.year != self.date_of_reg_input.date().year():
+            return None
+        return self.reg_no_index.conflict(self.reg_no_input.text(), self.selected_pdf)
+
+    def validate_reg_no(self, *args):
+        """Warn under reg_no_input while the clerk types a number that is already taken."""
+        existing_file = self.reg_no_conflict()
+        if existing_file:
+            self.reg_no_warning.setText(f"Already used by {os.path.basename(existing_file)}")
+            self.reg_no_warning.show()
+        else:
+            self.reg_no_warning.hide()
+
+    def register_folder_claims(self, conn, folder_path, file_paths):
+        """Add the folder's files to the shared work queue and show who holds which."""
+        self.current_folder = folder_path
+        try:
+            self.work_queue.register_folder(conn, folder_path, file_paths)
+            self.pdf_model.set_claims(self.work_queue.claims(conn, folder_path), self.current_user)
+        except psycopg2.Error as e:
+            # Tagging still works without claims (e.g. tag_claims not created yet)
+            print(f"Failed to load file claims: {str(e)}")
+            conn.rollback()
+
+    def claim_next_files(self):
+        """Lease the next untagged files of the folder to this clerk and open the first."""
+        if not self.current_folder:
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Warning)
+            box.setWindowTitle("Warning")
+            box.setText("Please select a folder first.")
+            box.setStandardButtons(QMessageBox.Ok)
+            box.setStyleSheet(message_box_style)
+            box.exec()
+            return
+
+        conn = self.create_connection()
+        try:
+            claimed = self.work_queue.claim_next(conn, self.current_folder, CLAIM_BATCH)
+            self.pdf_model.set_claims(self.work_queue.claims(conn, self.current_folder), self.current_user)
+            AuditLogger.log_action(
+                conn,
+                self.current_user,
+                "FILES_CLAIMED",
+                {"folder": self.current_folder, "count": len(claimed)}
+            )
+        except psycopg2.Error as e:
+            print(f"Failed to claim files: {str(e)}")
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Critical)
+            box.setWindowTitle("Error")
+            box.setText(f"Failed to assign files: {str(e)}")
+            box.setStandardButtons(QMessageBox.Ok)
+            box.setStyleSheet(message_box_style)
+            box.exec()
+            return
+        finally:
+            self.closeConnection()
+
+        if not claimed:
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Information)
+            box.setWindowTitle("Nothing Left")
+            box.setText("Every untagged file in this folder is already assigned or tagged.")
+            box.setStandardButtons(QMessageBox.Ok)
+            box.setStyleSheet(message_box_style)
+            box.exec()
+            return
+        self.lease_timer.start()
+        self.select_file(claimed[0])
+
+    def renew_claims(self):
+        """Keep this clerk's leases alive while the window is in use."""
+        conn = self.create_connection()
+        try:
+            if self.work_queue.renew(conn) == 0:
+                self.lease_timer.stop()
+        except psycopg2.Error as e:
+            print(f"Failed to renew file claims: {str(e)}")
+        finally:
+            self.closeConnection()
+
+    def release_claims(self, conn):
+        """Hand this clerk's untagged files back to the pool."""
+        self.lease_timer.stop()
+        try:
+            self.work_queue.release(conn)
+        except psycopg2.Error as e:
+            # The leases expire on their own
+            print(f"Failed to release file claims: {str(e)}")
+
     def natural_sort_key(self, text):
         """Sort filenames naturally, treating numbers correctly."""
         def convert(text):
@@ -575,28 +738,8 @@ class MarriageTaggingWindow(QWidget):
         return alphanum_key
 
     
-    def generate_thumbnail(self, pdf_path):
-        """Extracts the first page of a PDF and converts it to a QPixmap."""
-        try:
-            doc = pymupdf.open(pdf_path)
-            if doc.page_count == 0:
-                raise Exception("PDF has no pages")
-            
-            page = doc[0]
-            pix = page.get_pixmap(matrix=pymupdf.Matrix(0.5, 0.5))  # Scale down image
-            
-            # Convert raw image data to QImage
-            img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGBA8888)
-            
-            # Clean up resources
-            doc.close()
-            
-            return QPixmap.fromImage(img)
-        except Exception as e:
-            raise Exception(f"Failed to generate thumbnail: {str(e)}")
-
     def show_preview(self, item):
-        """Loads the selected PDF and stores its file path."""
+        """Loads the selected PDF (list index) and stores its file path."""
         conn = self.create_connection()
         try:
             self.selected_pdf = item.data(Qt.UserRole)
@@ -609,7 +752,9 @@ class MarriageTaggingWindow(QWidget):
                 self.last_place_of_marriage = self.place_of_marriage_combo.currentText()
                 self.last_date_of_marriage = self.date_of_marriage_input.date().toString("yyyy-MM-dd")
                 self.pdf_viewer.load_pdf(self.selected_pdf)
+                self.pdf_viewer.prefetch(self.pdf_model.paths_after(self.selected_pdf, self.LOOKAHEAD))
                 self.load_existing_tags(self.selected_pdf)
+                self.validate_reg_no()
 
                 AuditLogger.log_action(
                     conn,
@@ -626,21 +771,17 @@ class MarriageTaggingWindow(QWidget):
 
 
     def load_existing_tags(self, file_path):
-        conn = self.create_connection()
+        conn = None
+        cursor = None
         try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    husband_name, wife_name, date_of_marriage, page_no, book_no, reg_no, 
-                    husband_age, wife_age, husb_nationality, wife_nationality,
-                    husb_civil_status, wife_civil_status, husb_mother, wife_mother,
-                    husb_father, wife_father, date_of_reg, place_of_marriage,
-                    ceremony_type, late_registration
-                FROM marriage_index 
-                WHERE file_path = %s
-            """, (file_path,))
-
-            result = cursor.fetchone()
+            if file_path in self.tag_scope:
+                # Prefetched with the folder listing; no round trip
+                result = self.tag_rows.get(file_path)
+            else:
+                conn = self.create_connection()
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT {self.TAG_COLUMNS} FROM marriage_index WHERE file_path = %s", (file_path,))
+                result = cursor.fetchone()
 
             if result:
                 (husband_name, wife_name, date_of_marriage, page_no, book_no, reg_no, 
@@ -716,184 +857,199 @@ class MarriageTaggingWindow(QWidget):
                 cursor.close()
             self.closeConnection()
 
-    def check_registry_number_exists(self, conn, reg_no, exclude_file_path=None):
-        """Check if registry number already exists in the database."""
-        if not reg_no or reg_no.strip() == "":
-            return False, None
-            
-        cursor = conn.cursor()
-        try:
-            # Check if registry number exists, optionally excluding current file
-            if exclude_file_path:
-                cursor.execute("""
-                    SELECT file_path, husband_name, wife_name FROM marriage_index 
-                    WHERE reg_no = %s AND file_path != %s
-                """, (reg_no.strip(), exclude_file_path))
-            else:
-                cursor.execute("""
-                    SELECT file_path, husband_name, wife_name FROM marriage_index 
-                    WHERE reg_no = %s
-                """, (reg_no.strip(),))
-            
-            result = cursor.fetchone()
-            return result is not None, result
-        finally:
-            if cursor:
-                cursor.close()
-
     def save_tags(self):
-        conn = self.create_connection()
-        try:
-            if not self.selected_pdf:
-                AuditLogger.log_action(
-                    conn,
-                    self.current_user,
-                    "TAG_SAVE_FAILED",
-                    {"reason": "no_pdf_selected"}
-                )
-                # QMessageBox.warning(self, "Error", "Please select a PDF file before saving tags!")
-                box = QMessageBox(self)
-                box.setIcon(QMessageBox.Warning)
-                box.setWindowTitle("Warning")
-                box.setText("Please select a PDF file before saving tags.")
-                box.setStandardButtons(QMessageBox.Ok)
-
-                box.setStyleSheet(message_box_style)
-
-                box.exec()
-                return
+        """Validate the form and queue the record; the clerk can move on while it saves."""
+        if not self.selected_pdf:
+            AuditLogger.log_action(
+                self.connection,
+                self.current_user,
+                "TAG_SAVE_FAILED",
+                {"reason": "no_pdf_selected"}
+            )
+            # QMessageBox.warning(self, "Error", "Please select a PDF file before saving tags!")
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Warning)
+            box.setWindowTitle("Warning")
+            box.setText("Please select a PDF file before saving tags.")
+            box.setStandardButtons(QMessageBox.Ok)
 
-            cursor = conn.cursor()
+            box.setStyleSheet(message_box_style)
 
-            try:
-                # Get values from input fields
-                page_no = int(self.page_no_input.text()) if self.page_no_input.text() else None
-                book_no = int(self.book_no_input.text()) if self.book_no_input.text() else None
-                reg_no = self.reg_no_input.text()
-                husband_name = self.husband_name_input.text()
-                wife_name = self.wife_name_input.text()
-                
-                # Check if registry number already exists
-                if reg_no and reg_no.strip():
-                    exists, existing_record = self.check_registry_number_exists(conn, reg_no, self.selected_pdf)
-                    if exists:
-                        existing_file, existing_husband, existing_wife = existing_record
-                        AuditLogger.log_action(
-                            conn,
-                            self.current_user,
-                            "TAG_SAVE_FAILED",
-                            {"reason": "duplicate_registry_number", "reg_no": reg_no, "existing_file": existing_file}
-                        )
-                        conn.commit()
-                        
-                        box = QMessageBox(self)
-                        box.setIcon(QMessageBox.Warning)
-                        box.setWindowTitle("Duplicate Registry Number")
-                        box.setText(f"Registry number '{reg_no}' already exists in the database.\n\nExisting record:\nHusband: {existing_husband}\nWife: {existing_wife}\nFile: {os.path.basename(existing_file)}")
-                        box.setStandardButtons(QMessageBox.Ok)
-                        box.setStyleSheet(message_box_style)
-                        box.exec()
-                        return
-                
-                husband_age = self.husband_age_input.text()
-                wife_age = self.wife_age_input.text()
-                husb_mother = self.husband_mother_name_input.text()
-                wife_mother = self.wife_mother_name_input.text()
-                husb_father = self.husband_father_name_input.text()
-                wife_father = self.wife_father_name_input.text()
-                date_of_marriage = self.date_of_marriage_input.date().toString("yyyy-MM-dd")
-                date_of_reg = self.date_of_reg_input.date().toString("yyyy-MM-dd")
-                place_of_marriage = self.place_of_marriage_combo.currentText()
-                husb_nationality = self.husband_nationality_combo.currentText()
-                wife_nationality = self.wife_nationality_combo.currentText()
-                husb_civil_status = self.husband_civil_status_combo.currentText()
-                wife_civil_status = self.wife_civil_status_combo.currentText()
-                ceremony_type = self.ceremony_type_combo.currentText()
-                late_registration = self.late_reg_combo.currentText() == "Yes"
-
-                cursor.execute("""
-                    INSERT INTO marriage_index (
-                        file_path, husband_name, wife_name, date_of_marriage, page_no, book_no, reg_no,
-                        husband_age, wife_age, husb_nationality, wife_nationality,
-                        husb_civil_status, wife_civil_status, husb_mother, wife_mother,
-                        husb_father, wife_father, date_of_reg, place_of_marriage,
-                        ceremony_type, late_registration
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                    ON CONFLICT(file_path) DO UPDATE SET
-                        husband_name = EXCLUDED.husband_name,
-                        wife_name = EXCLUDED.wife_name,
-                        date_of_marriage = EXCLUDED.date_of_marriage,
-                        page_no = EXCLUDED.page_no,
-                        book_no = EXCLUDED.book_no,
-                        reg_no = EXCLUDED.reg_no,
-                        husband_age = EXCLUDED.husband_age,
-                        wife_age = EXCLUDED.wife_age,
-                        husb_nationality = EXCLUDED.husb_nationality,
-                        wife_nationality = EXCLUDED.wife_nationality,
-                        husb_civil_status = EXCLUDED.husb_civil_status,
-                        wife_civil_status = EXCLUDED.wife_civil_status,
-                        husb_mother = EXCLUDED.husb_mother,
-                        wife_mother = EXCLUDED.wife_mother,
-                        husb_father = EXCLUDED.husb_father,
-                        wife_father = EXCLUDED.wife_father,
-                        date_of_reg = EXCLUDED.date_of_reg,
-                        place_of_marriage = EXCLUDED.place_of_marriage,
-                        ceremony_type = EXCLUDED.ceremony_type,
-                        late_registration = EXCLUDED.late_registration
-                """, (
-                    self.selected_pdf, husband_name, wife_name, date_of_marriage, page_no, book_no, reg_no,
-                    husband_age, wife_age, husb_nationality, wife_nationality,
-                    husb_civil_status, wife_civil_status, husb_mother, wife_mother,
-                    husb_father, wife_father, date_of_reg,
-                    place_of_marriage, ceremony_type, late_registration
-                ))
+            box.exec()
+            return
 
-                AuditLogger.log_action(
-                    conn,
-                    self.current_user,
-                    "TAGS_SAVED",
-                    {
-                        "file": self.selected_pdf,
-                        "record_type": "Marriage"
-                    }
-                )
-                # QMessageBox.information(self, "Success", "Tags saved successfully.")
-                box = QMessageBox(self)
-                box.setIcon(QMessageBox.Information)
-                box.setWindowTitle("Success")
-                box.setText("Tags saved successfully.")
-                box.setStandardButtons(QMessageBox.Ok)
+        try:
+            # Get values from input fields
+            page_no = int(self.page_no_input.text()) if self.page_no_input.text() else None
+            book_no = int(self.book_no_input.text()) if self.book_no_input.text() else None
+            reg_no = self.reg_no_input.text()
+            husband_name = self.husband_name_input.text()
+            wife_name = self.wife_name_input.text()
+            
+            husband_age = self.husband_age_input.text()
+            wife_age = self.wife_age_input.text()
+            husb_mother = self.husband_mother_name_input.text()
+            wife_mother = self.wife_mother_name_input.text()
+            husb_father = self.husband_father_name_input.text()
+            wife_father = self.wife_father_name_input.text()
+            date_of_marriage = self.date_of_marriage_input.date().toPython()
+            date_of_reg = self.date_of_reg_input.date().toPython()
+            place_of_marriage = self.place_of_marriage_combo.currentText()
+            husb_nationality = self.husband_nationality_combo.currentText()
+            wife_nationality = self.wife_nationality_combo.currentText()
+            husb_civil_status = self.husband_civil_status_combo.currentText()
+            wife_civil_status = self.wife_civil_status_combo.currentText()
+            ceremony_type = self.ceremony_type_combo.currentText()
+            late_registration = self.late_reg_combo.currentText() == "Yes"
+
+            # Search keys for the Verify window's fuzzy name mode
+            husband_name_norm, husband_name_phonetic = name_keys(husband_name)
+            wife_name_norm, wife_name_phonetic = name_keys(wife_name)
+
+            row = {
+                "file_path": self.selected_pdf,
+                "canonical_path": canonical_path(self.selected_pdf),
+                "husband_name_norm": husband_name_norm,
+                "husband_name_phonetic": husband_name_phonetic,
+                "wife_name_norm": wife_name_norm,
+                "wife_name_phonetic": wife_name_phonetic,
+                "husband_name": husband_name,
+                "wife_name": wife_name,
+                "date_of_marriage": date_of_marriage,
+                "page_no": page_no,
+                "book_no": book_no,
+                "reg_no": reg_no,
+                "husband_age": husband_age,
+                "wife_age": wife_age,
+                "husb_nationality": husb_nationality,
+                "wife_nationality": wife_nationality,
+                "husb_civil_status": husb_civil_status,
+                "wife_civil_status": wife_civil_status,
+                "husb_mother": husb_mother,
+                "wife_mother": wife_mother,
+                "husb_father": husb_father,
+                "wife_father": wife_father,
+                "date_of_reg": date_of_reg,
+                "place_of_marriage": place_of_marriage,
+                "ceremony_type": ceremony_type,
+                "late_registration": late_registration,
+            }
+        except Exception as e:
+            AuditLogger.log_action(
+                self.connection,
+                self.current_user,
+                "TAG_SAVE_ERROR",
+                {
+                    "error": str(e),
+                    "file": self.selected_pdf,
+                    "record_type": "Marriage"
+                }
+            )
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Critical)
+            box.setWindowTitle("Error")
+            box.setText(f"Failed to save tags: {str(e)}")
+            box.setStandardButtons(QMessageBox.Ok)
+            box.setStyleSheet(message_box_style)
+            box.exec()
+            return
 
-                box.setStyleSheet(message_box_style)
-                box.exec()
+        clerk = self.pdf_model.claimed_by(row["file_path"])
+        if clerk and clerk != self.current_user:
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Question)
+            box.setWindowTitle("File Assigned")
+            box.setText(f"This file is assigned to {clerk}. Save your tags anyway?")
+            box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+            box.setStyleSheet(message_box_style)
+            if box.exec() != QMessageBox.Yes:
+                return
 
+        existing_file = self.reg_no_conflict()
+        if existing_file:
+            AuditLogger.log_action(
+                self.connection,
+                self.current_user,
+                "TAG_SAVE_FAILED",
+                {"reason": "duplicate_registry_number", "reg_no": row["reg_no"], "existing_file": existing_file}
+            )
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Warning)
+            box.setWindowTitle("Duplicate Registry Number")
+            box.setText(f"Registry number '{row['reg_no']}' already exists in the database.\n\nFile: {os.path.basename(existing_file)}")
+            box.setStandardButtons(QMessageBox.Ok)
+            box.setStyleSheet(message_box_style)
+            box.exec()
+            return
+
+        job = SaveJob("marriage_index", row, self.TAG_COLUMNS, ("husband_name", "wife_name"), on_done=self.save_done.emit)
+        if not get_save_queue().submit(job):
+            self.save_error_tray.add_failure(job, "Save queue is full, retry in a moment")
+            return
+        # Show the typed values when the file is revisited before the save lands
+        columns = [column.strip() for column in self.TAG_COLUMNS.split(",")]
+        self.tag_rows[job.file_path] = tuple(row[column] for column in columns)
+        self.tag_scope.add(job.file_path)
+
+    def on_save_done(self, job, row, error):
+        """Result of a queued save, delivered on the GUI thread."""
+        file_path = job.file_path
+        if error is None:
+            self.tag_rows[file_path] = row
+            self.tag_scope.add(file_path)
+            self.pdf_model.set_path_tagged(file_path, True)
+            stored = dict(zip([column.strip() for column in self.TAG_COLUMNS.split(",")], row))
+            self.reg_no_index.update(file_path, stored["reg_no"], stored["date_of_reg"])
+            self.save_error_tray.remove_file(file_path)
+            if file_path == self.selected_pdf:
                 self.set_saved_cue(True)
+            AuditLogger.log_action(
+                self.connection,
+                self.current_user,
+                "TAGS_SAVED",
+                {
+                    "file": file_path,
+                    "record_type": "Marriage",
+                    "queued_ms": int((time.monotonic() - job.queued_at) * 1000)
+                }
+            )
+            return
 
-            except Exception as e:
-                AuditLogger.log_action(
-                    conn,
-                    self.current_user,
-                    "TAG_SAVE_ERROR",
-                    {
-                        "error": str(e),
-                        "file": self.selected_pdf,
-                        "record_type": "Marriage"
-                    }
-                )
-                # QMessageBox.critical(self, "Error", f"Failed to save tags: {str(e)}")
-                box = QMessageBox(self)
-                box.setIcon(QMessageBox.Critical)
-                box.setWindowTitle("Error")
-                box.setText(f"Failed to save tags: {str(e)}")
-                box.setStandardButtons(QMessageBox.Ok)
-                box.setStyleSheet(message_box_style)
-                box.exec()
-        finally:
-            if cursor:
-                cursor.close()
-            self.closeConnection()
+        # Reload the stored row next time instead of the unsaved values
+        self.tag_rows.pop(file_path, None)
+        self.tag_scope.discard(file_path)
+        if isinstance(error, DuplicateRegNoError):
+            AuditLogger.log_action(
+                self.connection,
+                self.current_user,
+                "TAG_SAVE_FAILED",
+                {"reason": "duplicate_registry_number", "reg_no": error.reg_no, "existing_file": error.existing_file}
+            )
+            message = (f"Registry number '{error.reg_no}' already exists "
+                       f"(Husband: {error.existing[0]}, Wife: {error.existing[1]}, File: {os.path.basename(error.existing_file)})")
+        else:
+            AuditLogger.log_action(
+                self.connection,
+                self.current_user,
+                "TAG_SAVE_ERROR",
+                {
+                    "error": str(error),
+                    "file": file_path,
+                    "record_type": "Marriage"
+                }
+            )
+            message = f"Failed to save tags: {str(error)}"
+        self.save_error_tray.add_failure(job, message)
+
+    def select_file(self, file_path):
+        """Select a file in the list, loading its folder if needed."""
+        row = self.pdf_model.row_of(file_path)
+        if row < 0:
+            self.load_pdfs(os.path.dirname(file_path), file_path)
+            return
+        index = self.pdf_model.index(row)
+        self.pdf_list.setCurrentIndex(index)
+        self.pdf_list.scrollTo(index)
 
     def delete_tags(self):
         conn = self.create_connection()
@@ -916,9 +1072,14 @@ class MarriageTaggingWindow(QWidget):
                 box.exec()
                 return
 
+            # A save still in the queue would otherwise re-create the row
+            get_save_queue().flush()
             cursor = conn.cursor()
             cursor.execute("DELETE FROM marriage_index WHERE file_path = %s", (self.selected_pdf,))
             conn.commit()
+            self.tag_rows.pop(self.selected_pdf, None)
+            self.reg_no_index.discard(self.selected_pdf)
+            self.pdf_model.set_path_tagged(self.selected_pdf, False)
 
             AuditLogger.log_action(
                 conn,
@@ -1039,11 +1200,12 @@ class MarriageTaggingWindow(QWidget):
     def closeEvent(self, event):
         conn = self.create_connection()
         try:
+            self.release_claims(conn)
             AuditLogger.log_action(
                 conn,
                 self.current_user,
                 "WINDOW_CLOSED",
-                {"window": "MarriageTaggingWindow"}
+                {"window": "MarriageTaggingWindow", "preview_prefetch": dict(self.pdf_viewer.prefetch_stats)}
             )
             conn.commit()
         finally:
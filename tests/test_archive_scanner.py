@@ -0,0 +1,81 @@
+import os
+from archive_scanner import ArchiveScanner
+from file_catalog import FileCatalog
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4')
+
+
+def test_scan_once_publishes_listing(tmp_path):
+    root = str(tmp_path / 'DEATH')
+    _touch(os.path.join(root, '1999', 'A.pdf'))
+    _touch(os.path.join(root, '1999', 'B.PDF'))
+    _touch(os.path.join(root, '1999', 'C.txt'))
+
+    catalog = FileCatalog(str(tmp_path / 'catalog.db'))
+    try:
+        scanner = ArchiveScanner([root, str(tmp_path / 'MISSING')], catalog=catalog)
+        changes = []
+        scanner.add_listener(lambda r, stats: changes.append((r, stats['files_added'])))
+
+        assert catalog.list_pdfs(os.path.join(root, '1999')) is None
+        scanner.scan_once()
+
+        assert sorted(catalog.list_pdfs(os.path.join(root, '1999'))) == ['A.pdf', 'B.PDF']
+        assert scanner.has_scanned(root)
+        assert changes == [(root, 2)]
+
+        stats = scanner.stats()
+        assert stats['scans'] == 1 and stats['last_scan_finished'] is not None
+        assert stats['last_entries_listed'] >= 4 and stats['catalog_files'] == 2
+
+        # Unchanged tree: no listener calls on the next pass
+        scanner.scan_once()
+        assert len(changes) == 1
+    finally:
+        catalog.close()
+
+
+def test_unreachable_root_keeps_catalog(tmp_path):
+    root = str(tmp_path / 'LIVE BIRTH')
+    _touch(os.path.join(root, '2001', 'A.pdf'))
+
+    catalog = FileCatalog(str(tmp_path / 'catalog.db'))
+    try:
+        ArchiveScanner([root], catalog=catalog).scan_once()
+        assert catalog.count() == 1
+
+        # Share offline: the root looks like a missing folder
+        os.rename(root, str(tmp_path / 'OFFLINE'))
+        scanner = ArchiveScanner([root], catalog=catalog)
+        scanner.scan_once()
+
+        assert catalog.count() == 1
+        assert catalog.list_pdfs(os.path.join(root, '2001')) == ['A.pdf']
+        assert not scanner.has_scanned(root)
+        assert scanner.stats()['errors'] == 1
+    finally:
+        catalog.close()
+
+
+def test_list_pdf_names_sees_files_added_since_the_scan(tmp_path, monkeypatch):
+    import archive_scanner
+    root = str(tmp_path / 'DEATH')
+    folder = os.path.join(root, '1999')
+    _touch(os.path.join(folder, 'A.pdf'))
+
+    catalog = FileCatalog(str(tmp_path / 'catalog.db'))
+    monkeypatch.setattr(archive_scanner, 'get_catalog', lambda: catalog)
+    try:
+        catalog.refresh(root)
+        assert archive_scanner.list_pdf_names(folder) == ['A.pdf']
+
+        _touch(os.path.join(folder, 'B.pdf'))
+        stamp = os.stat(folder).st_mtime + 10
+        os.utime(folder, (stamp, stamp))
+        assert sorted(archive_scanner.list_pdf_names(folder)) == ['A.pdf', 'B.pdf']
+    finally:
+        catalog.close()
@@ -0,0 +1,44 @@
+import time
+from datetime import datetime
+
+from audit_logger import AuditLogger, AuditWriter
+from audit_spool import AuditSpool
+
+
+class FakeCursor:
+    def __init__(self, users):
+        self.users = users
+        self.result = []
+
+    def execute(self, sql, params):
+        self.result = [(name,) for name in params[0] if name in self.users]
+
+    def fetchall(self):
+        return self.result
+
+
+def test_unreachable_server_defers_user_check(monkeypatch):
+    monkeypatch.setattr(AuditLogger, "_known_users", {"clerk1"})
+    monkeypatch.setattr(AuditLogger, "_users_loaded_at", None)
+    monkeypatch.setattr(AuditLogger, "_server_down_until", time.monotonic() + 60)
+    # No connection is attempted while the server is known to be down
+    monkeypatch.setattr("audit_logger.get_connection", lambda **kwargs: 1 / 0)
+
+    assert AuditLogger.validate_username("clerk1") is True
+    assert AuditLogger.validate_username("clerk2") is None
+    assert AuditLogger.validate_username("SYSTEM") is True
+
+
+def test_writer_drops_rows_of_unknown_users(tmp_path, monkeypatch):
+    monkeypatch.setattr(AuditLogger, "_known_users", {"clerk1"})
+    writer = AuditWriter(spool=AuditSpool(str(tmp_path / "spool.db")))
+    try:
+        rows = [(str(i), datetime(2024, 1, 2), user, "LOGIN", None)
+                for i, user in enumerate(["clerk1", "clerk2", "ghost", "SYSTEM"])]
+        kept = writer._known_user_rows(FakeCursor({"clerk2"}), rows)
+
+        assert [row[2] for row in kept] == ["clerk1", "clerk2", "SYSTEM"]
+        assert "clerk2" in AuditLogger._known_users
+        assert writer.stats()["invalid_users"] == 1
+    finally:
+        writer.stop()
@@ -0,0 +1,38 @@
+from datetime import datetime
+from audit_spool import AuditSpool
+
+
+def _row(event_id, action):
+    return (event_id, datetime(2024, 1, 2, 3, 4, 5), 'clerk', action, None)
+
+
+def test_spool_replays_in_order_and_removes_uploaded_rows(tmp_path):
+    spool = AuditSpool(str(tmp_path / 'spool.db'))
+    try:
+        spool.append([_row('a', 'LOGIN'), _row('b', 'SEARCH')])
+        spool.append([_row('c', 'LOGOUT')])
+
+        pending = spool.peek(2)
+        assert [row[3] for _, row in pending] == ['LOGIN', 'SEARCH']
+        assert pending[0][1][1] == datetime(2024, 1, 2, 3, 4, 5)
+
+        spool.remove_through(pending[-1][0])
+        assert spool.count() == 1
+        assert spool.peek(10)[0][1][0] == 'c'
+    finally:
+        spool.close()
+
+
+def test_spool_ignores_duplicate_event_ids(tmp_path):
+    path = str(tmp_path / 'spool.db')
+    spool = AuditSpool(path)
+    spool.append([_row('a', 'LOGIN')])
+    spool.append([_row('a', 'LOGIN'), _row('b', 'SEARCH')])
+    spool.close()
+
+    # Rows survive a restart
+    spool = AuditSpool(path)
+    try:
+        assert spool.count() == 2
+    finally:
+        spool.close()
@@ -0,0 +1,114 @@
+import io
+from datetime import date
+
+import pytest
+
+from bulk_import import import_columns, import_csv, stored_columns, validate_csv, validate_record
+
+TODAY = date(2024, 6, 1)
+
+
+def rows(text, table="birth_index"):
+    return list(validate_csv(table, io.StringIO(text), today=TODAY))
+
+
+def test_valid_row_gets_typed_values_and_derived_columns():
+    record = validate_record("birth_index", {
+        "file_path": r"\\server\MCR\1990\a.pdf", "name": "Ma. Niña Dela Cruz", "sex": "f",
+        "date_of_birth": "12/17/1990", "date_of_reg": "1990-12-20", "page_no": "12",
+        "type_of_birth": "twin", "late_registration": "yes",
+    }, today=TODAY)
+    assert record["sex"] == "FEMALE"
+    assert record["type_of_birth"] == "TWIN"
+    assert record["date_of_birth"] == date(1990, 12, 17)
+    assert record["page_no"] == 12 and record["book_no"] is None
+    assert record["late_registration"] is True
+    assert record["canonical_path"] == "//server/MCR/1990/a.pdf"
+    assert record["name_norm"] == "ma nina dela cruz"
+    assert set(stored_columns("birth_index")) == set(record)
+
+
+def test_invalid_values_are_all_reported():
+    with pytest.raises(ValueError) as error:
+        validate_record("birth_index", {
+            "file_path": "a.pdf", "sex": "X", "date_of_birth": "1990-02-30",
+            "date_of_reg": "2030-01-01", "type_of_birth": "QUAD",
+        }, today=TODAY)
+    message = str(error.value)
+    for column in ("sex", "date_of_birth", "date_of_reg", "type_of_birth"):
+        assert column in message
+
+
+def test_duplicates_within_file_are_rejected():
+    result = rows(
+        "file_path,reg_no,date_of_reg\n"
+        "a.pdf,1990-0001,1990-01-05\n"
+        "b.pdf,1990-1,1990-03-01\n"      # same year and normalized number as a.pdf
+        "c.pdf,1990-1,1991-01-01\n"      # same number, different year
+        "a.pdf,1990-2,1990-01-05\n"      # repeated file
+        ",1990-3,1990-01-05\n"
+    )
+    assert [(line, reason is None) for line, _, _, reason in result] == [
+        (2, True), (3, False), (4, True), (5, False), (6, False)]
+    assert "line 2" in result[1][3]
+
+
+def test_unknown_columns_are_refused():
+    with pytest.raises(ValueError):
+        rows("file_path,colour\na.pdf,red\n")
+    with pytest.raises(ValueError):
+        rows("name\nJUAN\n")
+
+
+class FakeConnection:
+    """Records the import's statements and COPY data; every merged row is an update."""
+
+    def __init__(self):
+        self.statements = []
+        self.copied = []
+        self.committed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        self.statements.append(" ".join(sql.split()))
+
+    def copy_expert(self, sql, buffer):
+        self.statements.append(sql)
+        self.copied.append(buffer.read())
+
+    def fetchall(self):
+        return [(False,)] if self.statements[-1].startswith("INSERT") else []
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_partial_header_leaves_unlisted_columns_untouched(tmp_path):
+    assert import_columns("birth_index", ["file_path", "name"]) == [
+        "file_path", "name", "canonical_path", "name_norm", "name_phonetic"]
+
+    csv_path = tmp_path / "names.csv"
+    csv_path.write_text("file_path,name\na.pdf,JUAN\n", encoding="utf-8")
+    conn = FakeConnection()
+    counts = import_csv(conn, "birth_index", str(csv_path))
+
+    assert counts["updated"] == 1 and conn.committed
+    assert conn.copied == ['a.pdf,JUAN,a.pdf,juan,"{HN,JN}"\r\n']
+    merge = conn.statements[-1]
+    assert merge.startswith("INSERT INTO birth_index (file_path, name, canonical_path, name_norm, name_phonetic)")
+    for column in ("sex", "date_of_birth", "reg_no", "date_of_reg", "late_registration"):
+        assert column not in merge
+    assert not any("normalize_reg_no" in sql for sql in conn.statements)
+
+
+def test_reg_no_needs_date_of_reg():
+    with pytest.raises(ValueError):
+        rows("file_path,reg_no\na.pdf,1990-1\n")
@@ -0,0 +1,46 @@
+from datetime import date
+from date_query import DateQuery, parse_date_query, EXACT, RANGE, MONTH_DAY, MONTH
+
+
+def test_exact_dates():
+    assert parse_date_query("2024-12-17") == DateQuery(EXACT, [date(2024, 12, 17)])
+    assert parse_date_query("12/17/2024") == DateQuery(EXACT, [date(2024, 12, 17)])
+    assert parse_date_query("December 17, 2024") == DateQuery(EXACT, [date(2024, 12, 17)])
+    assert parse_date_query("17th Dec 2024") == DateQuery(EXACT, [date(2024, 12, 17)])
+
+
+def test_ambiguous_numeric_date_matches_both_readings():
+    assert parse_date_query("05/06/2024") == DateQuery(EXACT, [date(2024, 5, 6), date(2024, 6, 5)])
+
+
+def test_ranges():
+    assert parse_date_query("2024") == DateQuery(RANGE, (date(2024, 1, 1), date(2025, 1, 1)))
+    assert parse_date_query("December 2024") == DateQuery(RANGE, (date(2024, 12, 1), date(2025, 1, 1)))
+    assert parse_date_query("2024-02") == DateQuery(RANGE, (date(2024, 2, 1), date(2024, 3, 1)))
+
+
+def test_any_year_forms():
+    assert parse_date_query("December 17") == DateQuery(MONTH_DAY, [(12, 17)])
+    assert parse_date_query("12/17") == DateQuery(MONTH_DAY, [(12, 17)])
+    assert parse_date_query("feb 29") == DateQuery(MONTH_DAY, [(2, 29)])
+    assert parse_date_query("Sept") == DateQuery(MONTH, 9)
+
+
+def test_rejects_non_dates():
+    for text in ["", "juan dela cruz", "2024-13-01", "February 30 2023", "13/13/2024", "dec jan"]:
+        assert parse_date_query(text) is None, text
+
+
+def test_rejects_years_out_of_range():
+    for text in ["9999", "December 9999", "9999-12", "0000", "0000-01", "January 0000", "00/01/0000"]:
+        assert parse_date_query(text) is None, text
+    assert parse_date_query("9998") == DateQuery(RANGE, (date(9998, 1, 1), date(9999, 1, 1)))
+
+
+def test_to_sql():
+    predicate, params = parse_date_query("December 17").to_sql("date_of_birth")
+    assert predicate == "((EXTRACT(MONTH FROM date_of_birth) = %s AND EXTRACT(DAY FROM date_of_birth) = %s))"
+    assert params == (12, 17)
+    predicate, params = parse_date_query("2024").to_sql("date_of_death")
+    assert predicate == "date_of_death >= %s AND date_of_death < %s"
+    assert parse_date_query("05/06/2024").to_sql("d")[0] == "d = ANY(%s)"
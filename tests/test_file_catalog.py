@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import time
+from date_query import parse_date_query
+from file_catalog import FileCatalog
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4')
+
+
+def _bump_mtime(path):
+    # Directory mtimes can have coarse resolution; force a visible change
+    stamp = time.time() + 10
+    os.utime(path, (stamp, stamp))
+
+
+def test_refresh_and_search(tmp_path):
+    root = str(tmp_path / 'LIVE BIRTH')
+    _touch(os.path.join(root, '2001', 'DELA CRUZ, JUAN 2001-01-05.pdf'))
+    _touch(os.path.join(root, '2001', 'JANUARY', 'SANTOS, MARIA 2001-01-09.pdf'))
+    _touch(os.path.join(root, '2001', 'notes.txt'))
+    _touch(os.path.join(root, '2002', 'REYES, ANA 2002-03-01.pdf'))
+
+    catalog = FileCatalog(str(tmp_path / 'catalog.db'))
+    try:
+        stats = catalog.refresh(root, '2001')
+        assert stats['files_added'] == 2 and stats['dirs_rescanned'] == 2
+
+        assert catalog.search_terms(root, '2001', 'cruz juan') == ['DELA CRUZ, JUAN 2001-01-05.pdf']
+        assert catalog.search_terms(root, '2001', 'SANTOS') == ['SANTOS, MARIA 2001-01-09.pdf']
+        assert catalog.search_terms(root, '2001', 'ruz') == ['DELA CRUZ, JUAN 2001-01-05.pdf']
+        assert catalog.search_substring(root, '2001', '01-09') == ['SANTOS, MARIA 2001-01-09.pdf']
+        assert catalog.search_terms(root, '2002', 'reyes') == []
+
+        # Nothing changed: directories are only stat'ed, not listed again
+        stats = catalog.refresh(root, '2001')
+        assert stats['dirs_rescanned'] == 0 and stats['dirs_checked'] == 2
+    finally:
+        catalog.close()
+
+
+def test_refresh_picks_up_added_and_removed_files(tmp_path):
+    root = str(tmp_path / 'DEATH')
+    year_dir = os.path.join(root, '1999')
+    _touch(os.path.join(year_dir, 'OLD, ONE.pdf'))
+
+    catalog = FileCatalog(str(tmp_path / 'catalog.db'))
+    try:
+        catalog.refresh(root, '1999')
+        os.remove(os.path.join(year_dir, 'OLD, ONE.pdf'))
+        _touch(os.path.join(year_dir, 'NEW, TWO.pdf'))
+        _bump_mtime(year_dir)
+
+        stats = catalog.refresh(root, '1999')
+        assert stats['files_added'] == 1 and stats['files_removed'] == 1
+        assert catalog.search_terms(root, '1999', 'old') == []
+        assert catalog.search_terms(root, '1999', 'new') == ['NEW, TWO.pdf']
+
+        assert catalog.refresh(root, '2050')['missing'] == 1
+
+        # A deleted year folder under a reachable root is forgotten
+        os.remove(os.path.join(year_dir, 'NEW, TWO.pdf'))
+        os.rmdir(year_dir)
+        assert catalog.refresh(root, '1999')['missing'] == 1
+        assert catalog.count() == 0
+    finally:
+        catalog.close()
+
+
+def test_date_and_reg_no_lookups(tmp_path):
+    root = str(tmp_path / 'DEATH')
+    _touch(os.path.join(root, '1990', 'DELA CRUZ, JUAN 12-17-1990 REG NO 1990-0456.pdf'))
+    _touch(os.path.join(root, '1990', 'SANTOS, MARIA 1990-12-18.pdf'))
+
+    catalog = FileCatalog(str(tmp_path / 'catalog.db'))
+    try:
+        catalog.refresh(root, '1990')
+        juan = ['DELA CRUZ, JUAN 12-17-1990 REG NO 1990-0456.pdf']
+        assert catalog.search_date(root, '1990', parse_date_query('Dec 17 1990')) == juan
+        assert catalog.search_date(root, None, parse_date_query('12/17')) == juan
+        assert len(catalog.search_date(root, '1990', parse_date_query('December 1990'))) == 2
+        assert catalog.search_reg_no(root, '1990', '1990 456') == juan
+        assert catalog.search_reg_no(root, '1990', '457') == []
+    finally:
+        catalog.close()
+
+
+def test_upgrades_catalog_without_parsed_columns(tmp_path):
+    path = str(tmp_path / 'catalog.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, root TEXT NOT NULL,
+                    registry TEXT NOT NULL, year TEXT NOT NULL, dir TEXT NOT NULL, name TEXT NOT NULL,
+                    name_lower TEXT NOT NULL, terms TEXT NOT NULL, size INTEGER, mtime REAL)""")
+    conn.execute("INSERT INTO files (path, root, registry, year, dir, name, name_lower, terms) "
+                 "VALUES ('r/2001/a.pdf', 'r', 'r', '2001', 'r/2001', 'A 2001-01-05.pdf', '', '')")
+    conn.commit()
+    conn.close()
+
+    catalog = FileCatalog(path)
+    try:
+        assert catalog.search_date('r', '2001', parse_date_query('2001-01-05')) == ['A 2001-01-05.pdf']
+    finally:
+        catalog.close()
+
+
+def test_drops_unused_person_column(tmp_path):
+    path = str(tmp_path / 'catalog.db')
+    FileCatalog(path).close()
+    conn = sqlite3.connect(path)
+    conn.execute("ALTER TABLE files ADD COLUMN person TEXT")
+    conn.commit()
+    conn.close()
+
+    FileCatalog(path).close()
+    conn = sqlite3.connect(path)
+    try:
+        assert 'person' not in {row[1] for row in conn.execute("PRAGMA table_info(files)")}
+    finally:
+        conn.close()
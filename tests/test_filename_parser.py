@@ -0,0 +1,32 @@
+from datetime import date
+from filename_parser import parse_filename, normalize_reg_no
+
+
+def test_numeric_dates():
+    assert parse_filename("DELA CRUZ, JUAN 12-17-1990.pdf").event_date == date(1990, 12, 17)
+    assert parse_filename("SANTOS MARIA 1990-12-17.pdf").event_date == date(1990, 12, 17)
+    assert parse_filename("REYES ANA 17.12.1990.pdf").event_date == date(1990, 12, 17)  # day-first fallback
+    assert parse_filename("LOPEZ 19901217.pdf").event_date == date(1990, 12, 17)
+
+
+def test_month_name_dates():
+    assert parse_filename("REYES, ANA DEC 17 1990.pdf").event_date == date(1990, 12, 17)
+    assert parse_filename("REYES, ANA 17th December, 1990.pdf").event_date == date(1990, 12, 17)
+
+
+def test_reg_no():
+    parsed = parse_filename("SANTOS, MARIA 1990-12-17 REG NO 1990-01234.pdf")
+    assert parsed.event_date == date(1990, 12, 17)
+    assert parsed.reg_no == "1990-1234"
+
+    parsed = parse_filename("DELA CRUZ, JUAN 12-17-1990 0456.pdf")
+    assert parsed == (date(1990, 12, 17), "456")
+
+    assert parse_filename("GARCIA PEDRO #77.pdf").reg_no == "77"
+    assert parse_filename("GARCIA PEDRO.pdf") == (None, None)
+
+
+def test_normalize_reg_no():
+    assert normalize_reg_no("1990-01234") == "1990-1234"
+    assert normalize_reg_no("1990 / 1234") == "1990-1234"
+    assert normalize_reg_no("no digits") is None
@@ -0,0 +1,32 @@
+from name_keys import name_keys, normalize_name, query_code_groups
+
+
+def _matches(stored, query):
+    _, codes = name_keys(stored)
+    return all(any(code in codes for code in group) for group in query_code_groups(query))
+
+
+def test_normalize_name_strips_accents_case_and_punctuation():
+    assert normalize_name("Ma. Niña  DELA Cruz") == "ma nina dela cruz"
+    assert normalize_name("  ") is None
+    assert normalize_name(None) is None
+
+
+def test_common_misspellings_share_a_phonetic_code():
+    for stored, typed in [
+        ("Ygnacio", "Ignacio"),
+        ("Peña", "Penya"),
+        ("Villanueva", "Bilanueba"),
+        ("Villanueva", "Viyanueva"),
+        ("Gonzales", "Gonzalez"),
+        ("Jimenez", "Gimenez"),
+        ("Hernandez", "Ernandes"),
+        ("Quintos", "Kintos"),
+        ("Juan Dela Cruz", "dela kruz"),
+    ]:
+        assert _matches(stored, typed), (stored, typed)
+
+
+def test_different_names_do_not_match():
+    assert not _matches("Santos", "Reyes")
+    assert not _matches("Juan Dela Cruz", "Pedro")
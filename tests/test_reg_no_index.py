@@ -0,0 +1,27 @@
+from datetime import date
+from reg_no_index import RegNoIndex, year_from_path
+
+
+def test_year_from_path():
+    assert year_from_path(r"\\server\MCR\LIVE BIRTH\1990\Book 12") == 1990
+    assert year_from_path("/archive/DEATH/2021") == 2021
+    assert year_from_path("/archive/DEATH/Book 2021A") is None
+
+
+def test_conflict_uses_normalized_numbers():
+    index = RegNoIndex(1990, [("a.pdf", "1990-01234"), ("b.pdf", "1990-77")])
+    assert index.conflict("1990 / 1234") == "a.pdf"
+    assert index.conflict("1990-1234", "a.pdf") is None  # the file's own number
+    assert index.conflict("1990-99") is None
+    assert index.conflict("") is None
+
+
+def test_update_follows_saved_rows():
+    index = RegNoIndex(1990, [("a.pdf", "1990-1")])
+    index.update("a.pdf", "1990-2", date(1990, 5, 1))
+    assert index.conflict("1990-1") is None
+    assert index.conflict("1990-2", "b.pdf") == "a.pdf"
+
+    index.update("a.pdf", "1990-2", date(1991, 1, 3))  # registered in another year
+    assert index.conflict("1990-2") is None
+    assert len(index) == 0
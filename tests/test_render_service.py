@@ -0,0 +1,75 @@
+import os
+import threading
+from render_service import RenderService, PRIORITY_PREFETCH, PRIORITY_VISIBLE, WORKER_CRASHED
+from thumbnail_cache import ThumbnailCache
+
+
+def fake_render(path):
+    # Module level so the process pool can pickle it
+    return ('thumb:' + path).encode()
+
+
+def crashing_render(path):
+    if 'crash' in os.path.basename(path):
+        os._exit(1)
+    return fake_render(path)
+
+
+def test_renders_on_process_pool_then_serves_from_cache(tmp_path):
+    paths = []
+    for i in range(6):
+        pdf = tmp_path / f'{i}.pdf'
+        pdf.write_bytes(b'%PDF-1.4')
+        paths.append(str(pdf))
+
+    cache = ThumbnailCache(str(tmp_path / 'thumbs.db'))
+    service = RenderService(workers=2, cache=cache, renderer=fake_render)
+    try:
+        results = {}
+        done = threading.Event()
+
+        def collect(path, data, error):
+            results[path] = (data, error)
+            if len(results) == len(paths):
+                done.set()
+
+        for path in paths[:-1]:
+            service.request(path, PRIORITY_PREFETCH, collect)
+        service.request(paths[-1], PRIORITY_VISIBLE, collect)
+        assert done.wait(30)
+        assert results[paths[0]] == (('thumb:' + paths[0]).encode(), None)
+        assert service.stats()['rendered'] == len(paths)
+
+        again = threading.Event()
+        service.request(paths[0], PRIORITY_VISIBLE, lambda path, data, error: again.set())
+        assert again.wait(10)
+        assert service.stats()['cache_hits'] == 1
+
+        failed = threading.Event()
+        errors = []
+        service.request(str(tmp_path / 'missing.pdf'), PRIORITY_VISIBLE,
+                        lambda path, data, error: (errors.append(error), failed.set()))
+        assert failed.wait(10) and errors[0]
+    finally:
+        service.shutdown()
+        cache.close()
+
+
+def test_crashed_pool_is_replaced(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / 'thumbs.db'))
+    service = RenderService(workers=1, cache=cache, renderer=crashing_render)
+    try:
+        def render(name):
+            pdf = tmp_path / name
+            pdf.write_bytes(b'%PDF-1.4')
+            results = []
+            done = threading.Event()
+            service.request(str(pdf), PRIORITY_VISIBLE, lambda path, data, error: (results.append((data, error)), done.set()))
+            assert done.wait(30)
+            return results[0]
+
+        assert render('crash.pdf') == (None, WORKER_CRASHED)
+        assert render('ok.pdf')[0] == b'thumb:' + str(tmp_path / 'ok.pdf').encode()
+    finally:
+        service.shutdown()
+        cache.close()
@@ -0,0 +1,209 @@
+import threading
+from datetime import date
+from types import SimpleNamespace
+
+from psycopg2 import errors
+
+from filename_parser import normalize_reg_no
+from reg_no_index import unique_index_name
+from save_queue import DuplicateRegNoError, SaveJob, SaveQueue
+
+COLUMNS = ("file_path", "name", "reg_no")
+
+
+class _RegNoViolation(errors.UniqueViolation):
+    diag = SimpleNamespace(constraint_name=unique_index_name("birth_index"))
+
+
+class FakeDatabase:
+    """birth_index rows keyed by file_path, with a unique reg_no."""
+
+    def __init__(self, rows=(), has_index=True):
+        self.rows = {row[0]: row for row in rows}
+        self.has_index = has_index
+        self.statements = []  # rows per INSERT
+        self.checks = 0  # reg_no SELECTs made without the index
+        self.lock = threading.Lock()
+
+    def connect(self):
+        return FakeConnection(self)
+
+    def release(self, conn):
+        conn.released = True
+
+
+class FakeConnection:
+    encoding = "UTF8"
+
+    def __init__(self, db):
+        self.db = db
+        self.pending = {}
+        self.released = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        with self.db.lock:
+            self.db.rows.update(self.pending)
+        self.pending = {}
+
+    def rollback(self):
+        self.pending = {}
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self.args = []
+        self.result = []
+
+    def mogrify(self, template, args):
+        self.args.append(tuple(args))
+        return b"(row)"
+
+    def execute(self, sql, params=None):
+        db = self.connection.db
+        if isinstance(sql, bytes):  # execute_values upsert
+            rows, self.args = self.args, []
+            db.statements.append([row[0] for row in rows])
+            for row in rows:
+                if row[1] == "BROKEN":
+                    raise errors.NotNullViolation("null value in column")
+                holders = [r[0] for r in list(db.rows.values()) + list(self.connection.pending.values())
+                           if r[2] == row[2] and r[0] != row[0]]
+                if holders and db.has_index:
+                    raise _RegNoViolation("duplicate key value violates unique constraint")
+                self.connection.pending[row[0]] = row
+            self.result = [(row[0], row[1]) for row in rows]
+        elif "pg_index" in sql:
+            self.result = [(True,)] if db.has_index else []
+        elif "regexp_matches" in sql:  # check without the index: (year start, year end, file_path, reg_no)
+            db.checks += 1
+            _, _, file_path, reg_no = params
+            self.result = [(r[0], r[1]) for r in db.rows.values()
+                           if normalize_reg_no(r[2]) == reg_no and r[0] != file_path]
+        else:  # _duplicate_of lookup: (date_of_reg, reg_no, file_path)
+            _, reg_no, file_path = params
+            self.result = [(r[0], r[1]) for r in db.rows.values() if r[2] == reg_no and r[0] != file_path]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def close(self):
+        pass
+
+
+def _collect():
+    done = []
+    return done, lambda job, row, error: done.append((job.file_path, job.row["name"], row, error))
+
+
+def _job(path, name, reg_no, on_done):
+    return SaveJob("birth_index", dict(zip(COLUMNS, (path, name, reg_no))), returning="name", on_done=on_done)
+
+
+def _run(db, jobs):
+    save_queue = SaveQueue(connect=db.connect, release=db.release)
+    try:
+        for job in jobs:
+            assert save_queue.submit(job)
+        assert save_queue.flush()
+        return save_queue.stats()
+    finally:
+        save_queue.stop()
+
+
+def test_later_save_of_the_same_file_wins_within_a_batch():
+    db = FakeDatabase()
+    done, on_done = _collect()
+    stats = _run(db, [_job("a.pdf", "JUAN", "1", on_done), _job("b.pdf", "MARIA", "2", on_done),
+                      _job("a.pdf", "JUAN PEDRO", "1", on_done)])
+
+    assert db.statements == [["b.pdf", "a.pdf"]]
+    assert db.rows["a.pdf"][1] == "JUAN PEDRO"
+    # Every job is answered, the replaced one with the row that was stored
+    assert sorted(done, key=lambda d: d[1]) == [
+        ("a.pdf", "JUAN", ("JUAN PEDRO",), None),
+        ("a.pdf", "JUAN PEDRO", ("JUAN PEDRO",), None),
+        ("b.pdf", "MARIA", ("MARIA",), None),
+    ]
+    assert stats["saved"] == 2 and stats["batches"] == 1
+
+
+def test_duplicate_reg_no_is_isolated_and_named():
+    db = FakeDatabase([("old.pdf", "SANTOS, ANA", "7")])
+    done, on_done = _collect()
+    stats = _run(db, [_job("a.pdf", "JUAN", "1", on_done), _job("b.pdf", "MARIA", "7", on_done),
+                      _job("c.pdf", "PEDRO", "3", on_done)])
+
+    # The batch failed, then every job was retried on its own
+    assert db.statements[0] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert sorted(db.statements[1:]) == [["a.pdf"], ["b.pdf"], ["c.pdf"]]
+    assert set(db.rows) == {"old.pdf", "a.pdf", "c.pdf"}
+
+    results = {path: (row, error) for path, _, row, error in done}
+    assert len(done) == 3
+    assert results["a.pdf"] == (("JUAN",), None) and results["c.pdf"] == (("PEDRO",), None)
+    row, error = results["b.pdf"]
+    assert row is None and isinstance(error, DuplicateRegNoError)
+    assert error.existing_file == "old.pdf" and error.existing == ("SANTOS, ANA",)
+    assert stats["rejected"] == 1 and stats["saved"] == 2
+
+
+def test_every_job_is_answered_when_writes_fail():
+    db = FakeDatabase()
+    done, on_done = _collect()
+    _run(db, [_job("a.pdf", "BROKEN", "1", on_done), _job("b.pdf", "MARIA", "2", on_done)])
+
+    results = {path: (row, error) for path, _, row, error in done}
+    assert isinstance(results["a.pdf"][1], errors.NotNullViolation)
+    assert results["b.pdf"] == (("MARIA",), None)
+
+
+def test_worker_survives_unexpected_errors():
+    calls = []
+
+    def connect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("driver bug")
+        return FakeConnection(db)
+
+    db = FakeDatabase()
+    done, on_done = _collect()
+    save_queue = SaveQueue(connect=connect, release=db.release)
+    try:
+        assert save_queue.submit(_job("a.pdf", "JUAN", "1", on_done))
+        assert save_queue.flush()
+        assert save_queue.submit(_job("b.pdf", "MARIA", "2", on_done))
+        assert save_queue.flush()
+        stats = save_queue.stats()
+    finally:
+        save_queue.stop()
+
+    assert isinstance(done[0][3], RuntimeError)
+    assert done[1] == ("b.pdf", "MARIA", ("MARIA",), None)
+    assert stats["failed"] == 1 and stats["saved"] == 1
+
+
+def test_checks_reg_nos_before_saving_while_the_index_is_missing():
+    db = FakeDatabase([("old.pdf", "SANTOS, ANA", "2001-0007")], has_index=False)
+    done, on_done = _collect()
+
+    def job(path, name, reg_no):
+        row = {"file_path": path, "name": name, "reg_no": reg_no, "date_of_reg": date(2001, 3, 4)}
+        return SaveJob("birth_index", row, returning="name", on_done=on_done)
+
+    stats = _run(db, [job("a.pdf", "JUAN", "2001-7"), job("b.pdf", "MARIA", "2001-8"),
+                      job("c.pdf", "PEDRO", "2001-08")])
+
+    assert db.statements == [["b.pdf"]] and db.checks == 2
+    results = {path: (row, error) for path, _, row, error in done}
+    assert results["b.pdf"] == (("MARIA",), None)
+    assert results["a.pdf"][1].existing_file == "old.pdf"
+    assert results["c.pdf"][1].existing_file == "b.pdf"
+    assert stats["rejected"] == 2 and stats["saved"] == 1
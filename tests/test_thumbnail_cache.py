@@ -0,0 +1,38 @@
+import os
+from thumbnail_cache import ThumbnailCache
+
+
+def test_cache_hits_until_file_changes(tmp_path):
+    pdf = tmp_path / 'a.pdf'
+    pdf.write_bytes(b'%PDF-1.4')
+    renders = []
+
+    def render(path):
+        renders.append(path)
+        return b'jpeg-%d' % len(renders)
+
+    cache = ThumbnailCache(str(tmp_path / 'thumbs.db'), renderer=render)
+    try:
+        assert cache.thumbnail(str(pdf)) == b'jpeg-1'
+        assert cache.thumbnail(str(pdf)) == b'jpeg-1'
+        assert len(renders) == 1
+
+        pdf.write_bytes(b'%PDF-1.4 rescanned')
+        assert cache.thumbnail(str(pdf)) == b'jpeg-2'
+        assert cache.stats()['entries'] == 1
+    finally:
+        cache.close()
+
+
+def test_lru_eviction(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / 'thumbs.db'), max_bytes=250)
+    try:
+        for name in ['a', 'b', 'c']:
+            cache.put(name, 1, 1.0, b'x' * 100)
+            if name == 'b':
+                assert cache.get('a', 1, 1.0) is not None  # 'a' is now more recent than 'b'
+        assert cache.get('b', 1, 1.0) is None
+        assert cache.get('a', 1, 1.0) is not None and cache.get('c', 1, 1.0) is not None
+        assert cache.stats()['bytes'] == 200
+    finally:
+        cache.close()
@@ -0,0 +1,46 @@
+import time
+from file_catalog import name_terms
+from token_index import TokenIndex
+
+
+def _index(names_by_year):
+    entries = []
+    for year, names in names_by_year.items():
+        for name in names:
+            entries.append((len(entries) + 1, year, name, name_terms(name)))
+    return TokenIndex(entries)
+
+
+def test_prefix_and_terms():
+    index = _index({
+        '2001': ['DELA CRUZ, JUAN 2001-01-05.pdf', 'CRUZADO, ANA 2001-02-01.pdf', 'SANTOS, JUANITA 2001-03-04.pdf'],
+        '2002': ['DELA CRUZ, PEDRO 2002-05-06.pdf'],
+    })
+    assert index.search('dela cr') == ['DELA CRUZ, JUAN 2001-01-05.pdf', 'DELA CRUZ, PEDRO 2002-05-06.pdf']
+    assert index.search('cruz', year='2001') == ['CRUZADO, ANA 2001-02-01.pdf', 'DELA CRUZ, JUAN 2001-01-05.pdf']
+    assert index.search('juan') == ['DELA CRUZ, JUAN 2001-01-05.pdf', 'SANTOS, JUANITA 2001-03-04.pdf']
+    assert index.search('juan santos') == ['SANTOS, JUANITA 2001-03-04.pdf']
+    assert index.search('ruz') == [
+        'CRUZADO, ANA 2001-02-01.pdf', 'DELA CRUZ, JUAN 2001-01-05.pdf', 'DELA CRUZ, PEDRO 2002-05-06.pdf']
+    assert index.search('anita') == ['SANTOS, JUANITA 2001-03-04.pdf']
+    assert index.search('  ') == []
+    assert index.search('cruz', limit=1) == ['CRUZADO, ANA 2001-02-01.pdf']
+    assert index.search('dela cruz', limit=1, with_years=True) == [('2002', 'DELA CRUZ, PEDRO 2002-05-06.pdf')]
+    assert index.search('dela cruz', with_years=True) == [
+        ('2002', 'DELA CRUZ, PEDRO 2002-05-06.pdf'), ('2001', 'DELA CRUZ, JUAN 2001-01-05.pdf')]
+
+
+def test_large_index_answers_quickly():
+    firsts = ['JUAN', 'MARIA', 'JOSE', 'ANA', 'PEDRO', 'ROSA', 'LUIS', 'CARMEN']
+    lasts = [f'SURNAME{i}' for i in range(2500)]
+    entries = []
+    for i, last in enumerate(lasts):
+        for j, first in enumerate(firsts * 5):
+            name = f'{last}, {first} {j} 2001-01-{(i % 28) + 1:02d}.pdf'
+            entries.append((len(entries) + 1, '2001', name, name_terms(name)))
+    index = TokenIndex(entries)
+
+    started = time.perf_counter()
+    hits = index.search('surname12 maria')
+    assert (time.perf_counter() - started) < 0.05
+    assert hits and all('MARIA' in h for h in hits)
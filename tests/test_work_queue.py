@@ -0,0 +1,83 @@
+from work_queue import LEASE_MINUTES, WorkQueue
+
+
+class FakeConnection:
+    encoding = "UTF8"
+
+    def __init__(self, result=()):
+        self.result = list(result)
+        self.statements = []  # (sql, params)
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class FakeCursor:
+    rowcount = 3
+
+    def __init__(self, conn):
+        self.connection = conn
+        self.args = []
+
+    def mogrify(self, template, args):
+        self.args.append(tuple(args))
+        return b"(row)"
+
+    def execute(self, sql, params=None):
+        if isinstance(sql, bytes):  # execute_values
+            sql, params = sql.decode(), self.args
+        self.connection.statements.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return self.connection.result
+
+    def close(self):
+        pass
+
+
+def test_claim_next_skips_locked_rows_and_returns_list_order():
+    conn = FakeConnection([("c.pdf", 7), ("a.pdf", 2), ("b.pdf", 5)])
+    queue = WorkQueue("birth_index", "clerk1")
+
+    assert queue.claim_next(conn, r"\\server\MCR\LIVE BIRTH\2001", 3) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert conn.commits == 1
+
+    sql, params = conn.statements[0]
+    assert "FOR UPDATE OF c SKIP LOCKED" in sql
+    assert "NOT EXISTS (SELECT 1 FROM birth_index t WHERE t.file_path = c.file_path)" in sql
+    assert "c.lease_expires < now()" in sql
+    # The clerk's own live claims first, then list position, capped by LIMIT
+    assert sql.index("ORDER BY (c.claimed_by = %(user)s AND c.lease_expires >= now()) IS TRUE DESC, c.position") \
+        < sql.index("LIMIT %(count)s") < sql.index("FOR UPDATE")
+    assert params == {"table": "birth_index", "folder": r"\\server\MCR\LIVE BIRTH\2001",
+                      "user": "clerk1", "count": 3, "lease": LEASE_MINUTES}
+
+
+def test_register_folder_records_list_positions():
+    conn = FakeConnection()
+    queue = WorkQueue("death_index", "clerk1")
+    queue.register_folder(conn, "1999", ["b.pdf", "a.pdf"])
+    queue.register_folder(conn, "1999", [])
+
+    assert len(conn.statements) == 1 and conn.commits == 1
+    sql, rows = conn.statements[0]
+    assert "ON CONFLICT (record_type, file_path) DO UPDATE" in sql
+    assert rows == [("death_index", "b.pdf", "1999", 0), ("death_index", "a.pdf", "1999", 1)]
+
+
+def test_release_limits_to_the_clerks_claims():
+    conn = FakeConnection()
+    queue = WorkQueue("marriage_index", "clerk2", lease_minutes=10)
+
+    assert queue.release(conn) == 3
+    assert queue.release(conn, ["a.pdf"]) == 3
+    assert queue.renew(conn) == 3
+
+    (all_sql, all_params), (some_sql, some_params), (renew_sql, renew_params) = conn.statements
+    assert "ANY" not in all_sql and all_params == ["marriage_index", "clerk2"]
+    assert some_sql.endswith("AND file_path = ANY(%s)") and some_params == ["marriage_index", "clerk2", ["a.pdf"]]
+    assert renew_params == (10, "marriage_index", "clerk2")
@@ -0,0 +1,156 @@
+"""Persistent cache of first-page PDF thumbnails for the tagging windows.
+
+Opening a folder in a tagging window used to open every PDF with pymupdf
+and rasterize page 1, every time. ``ThumbnailCache`` keeps the rendered
+thumbnails as JPEG blobs in a local SQLite file (WAL mode), keyed by the
+file's identity - path, size and mtime - so a rescanned or replaced PDF is
+rendered again while an unchanged one costs a single cache read.
+
+The cache is capped at ``max_bytes``; when a write pushes it over, the
+least recently used thumbnails are evicted until it is back under
+``EVICT_TO`` of the cap.
+
+Usage:
+    data = get_thumbnail_cache().thumbnail(pdf_path)   # JPEG bytes
+    pixmap = QPixmap()
+    pixmap.loadFromData(data, "JPEG")
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thumbnail_cache.db")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICT_TO = 0.9           # fraction of max_bytes kept after an eviction
+THUMBNAIL_SCALE = 0.5    # same scale the tagging windows rendered at
+JPEG_QUALITY = 75
+
+
+def render_thumbnail(pdf_path: str) -> bytes:
+    """Rasterize page 1 of a PDF and return it as JPEG bytes."""
+    import pymupdf
+
+    doc = pymupdf.open(pdf_path)
+    try:
+        if doc.page_count == 0:
+            raise Exception("PDF has no pages")
+        pix = doc[0].get_pixmap(matrix=pymupdf.Matrix(THUMBNAIL_SCALE, THUMBNAIL_SCALE), alpha=False)
+        return pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY)
+    finally:
+        doc.close()
+
+
+class ThumbnailCache:
+    """SQLite store of thumbnail blobs with LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES, renderer=render_thumbnail):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._render = renderer
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                data BLOB NOT NULL,
+                bytes INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_thumbnails_last_used ON thumbnails(last_used);
+        """)
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM thumbnails").fetchone()[0]
+        self._stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def get(self, path: str, size: int, mtime: float) -> Optional[bytes]:
+        """Cached thumbnail for this exact file identity, or None."""
+        path = os.path.normpath(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM thumbnails WHERE path = ? AND size = ? AND mtime = ?",
+                (path, size, mtime)).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            self._conn.execute("UPDATE thumbnails SET last_used = ? WHERE path = ?", (time.time(), path))
+            self._stats['hits'] += 1
+        return row[0]
+
+    def put(self, path: str, size: int, mtime: float, data: bytes) -> None:
+        """Store a thumbnail, replacing any older version of the file, then enforce the cap."""
+        path = os.path.normpath(path)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = self._conn.execute("SELECT bytes FROM thumbnails WHERE path = ?", (path,)).fetchone()
+                self._conn.execute("""
+                    INSERT OR REPLACE INTO thumbnails (path, size, mtime, data, bytes, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (path, size, mtime, sqlite3.Binary(data), len(data), time.time()))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._total_bytes += len(data) - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Caller holds self._lock
+        target = int(self.max_bytes * EVICT_TO)
+        victims = []
+        freed = 0
+        for path, size in self._conn.execute("SELECT path, bytes FROM thumbnails ORDER BY last_used"):
+            if self._total_bytes - freed <= target:
+                break
+            victims.append((path,))
+            freed += size
+        self._conn.executemany("DELETE FROM thumbnails WHERE path = ?", victims)
+        self._total_bytes -= freed
+        self._stats['evicted'] += len(victims)
+
+    def thumbnail(self, pdf_path: str) -> bytes:
+        """JPEG thumbnail of `pdf_path`, rendered only when the cache has no current copy."""
+        info = os.stat(pdf_path)
+        data = self.get(pdf_path, info.st_size, info.st_mtime)
+        if data is None:
+            data = self._render(pdf_path)
+            self.put(pdf_path, info.st_size, info.st_mtime, data)
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = self._conn.execute("SELECT COUNT(*) FROM thumbnails").fetchone()[0]
+        snapshot['bytes'] = self._total_bytes
+        snapshot['max_bytes'] = self.max_bytes
+        return snapshot
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+_cache: Optional[ThumbnailCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Return the process-wide thumbnail cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ThumbnailCache()
+    return _cache
@@ -0,0 +1,166 @@
+"""In-memory inverted index of archive file names for search-as-you-type.
+
+Even against the local ``FileCatalog`` a name search is a scan of every row
+under the registry. ``TokenIndex`` keeps, per registry root, a map of
+term -> sorted posting list of catalog file ids plus a sorted term array,
+plus a trigram -> terms map, so a query is answered by a trigram lookup on
+the (much smaller) term array and posting-list intersection - a few
+milliseconds even for hundreds of thousands of files, which is fast enough
+to filter while typing. Only the first `limit` names are ordered.
+
+Every query word must occur inside a file-name term, the same rule as
+``FileCatalog.search_terms`` and the old folder walk: ``"dela cr"`` and
+``"ruz"`` both find ``DELA CRUZ, JUAN 2001-01-05.pdf``. Words are ANDed.
+
+Indexes are built from the catalog on a background thread and rebuilt
+whenever the catalog's ``generation`` moves on (files added or removed).
+Until the first build finishes ``get_token_index()`` returns None and
+callers fall back to the catalog's SQL search.
+
+Usage:
+    index = get_token_index(r"\\\\server\\MCR\\LIVE BIRTH")
+    if index is not None:
+        names = index.search("dela cruz", year="2001")
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from file_catalog import get_catalog, tokenize
+
+GRAM = 3  # n-gram length of the term lookup; shorter words scan the term array
+
+
+class TokenIndex:
+    """Term -> posting list index over (id, year, name, terms) catalog rows."""
+
+    def __init__(self, entries: Iterable[Tuple[int, str, str, str]], generation: int = 0):
+        started = time.perf_counter()
+        self.generation = generation
+        self._names: Dict[int, str] = {}
+        self._years: Dict[int, str] = {}
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        postings: Dict[str, List[int]] = {}
+        for file_id, year, name, terms in sorted(entries):
+            words = tuple(terms.split())
+            self._names[file_id] = name
+            self._years[file_id] = year
+            self._terms[file_id] = words
+            for word in set(words):
+                postings.setdefault(word, []).append(file_id)
+        self._postings = postings
+        self._vocab = sorted(postings)
+        grams: Dict[str, List[int]] = {}
+        for position, term in enumerate(self._vocab):
+            for gram in {term[i:i + GRAM] for i in range(len(term) - GRAM + 1)}:
+                grams.setdefault(gram, []).append(position)
+        self._grams = grams
+        # Newest year first, then name: the order of with_years results
+        year_rank = {year: rank for rank, year in enumerate(sorted(set(self._years.values()), reverse=True))}
+        self._year_rank = {i: year_rank[year] for i, year in self._years.items()}
+        self._matching_terms = lru_cache(maxsize=256)(self._find_terms)
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self):
+        return len(self._names)
+
+    def _find_terms(self, word: str) -> List[str]:
+        """Terms containing `word` (cached per index as _matching_terms)."""
+        if len(word) < GRAM:
+            return [t for t in self._vocab if word in t]
+        # Check the terms of the word's rarest trigram
+        lists = [self._grams.get(word[i:i + GRAM]) for i in range(len(word) - GRAM + 1)]
+        if not all(lists):
+            return []
+        return [self._vocab[p] for p in min(lists, key=len) if word in self._vocab[p]]
+
+    def search(self, query: str, year: Optional[str] = None, limit: Optional[int] = None,
+               with_years: bool = False) -> List:
+        """Names (sorted) of files having a term containing every query word.
+
+        With `with_years` the result is (year, name) pairs, newest year first.
+        """
+        words = sorted(set(tokenize(query)))
+        if not words:
+            return []
+
+        # Estimate every word's hit count and intersect the smallest first
+        plans = []
+        for word in words:
+            terms = self._matching_terms(word)
+            if not terms:
+                return []
+            plans.append((sum(len(self._postings[t]) for t in terms), word, terms))
+        plans.sort()
+
+        _, _, terms = plans[0]
+        candidates = set(self._postings[terms[0]])
+        for term in terms[1:]:
+            candidates.update(self._postings[term])
+
+        for size, word, terms in plans[1:]:
+            if not candidates:
+                return []
+            if size <= 4 * len(candidates):
+                other = set()
+                for term in terms:
+                    other.update(self._postings[term])
+                candidates &= other
+            else:
+                # Cheaper to check the few remaining files than to union a huge term set
+                candidates = {i for i in candidates
+                              if any(word in t for t in self._terms[i])}
+
+        if year:
+            candidates = [i for i in candidates if self._years[i] == year]
+        if with_years:
+            key = lambda i: (self._year_rank[i], self._names[i])
+            ordered = heapq.nsmallest(limit, candidates, key=key) if limit else sorted(candidates, key=key)
+            return [(self._years[i], self._names[i]) for i in ordered]
+        names = (self._names[i] for i in candidates)
+        return heapq.nsmallest(limit, names) if limit else sorted(names)
+
+
+_indexes: Dict[str, TokenIndex] = {}
+_building = set()
+_indexes_lock = threading.Lock()
+
+
+def _build(root: str, catalog):
+    try:
+        generation = catalog.generation
+        index = TokenIndex(catalog.entries(root), generation)
+        with _indexes_lock:
+            _indexes[root] = index
+        print(f"Token index for {root}: {len(index)} files in {index.build_seconds:.2f}s")
+    except Exception as e:
+        print(f"Failed to build token index for {root}: {str(e)}")
+    finally:
+        with _indexes_lock:
+            _building.discard(root)
+
+
+def get_token_index(root: str, current: bool = False) -> Optional[TokenIndex]:
+    """Index for `root`, starting a background (re)build when the catalog changed.
+
+    Returns None while no index exists yet, or when `current` is set and the
+    available index is older than the catalog.
+    """
+    root = os.path.normpath(root)
+    catalog = get_catalog()
+    with _indexes_lock:
+        index = _indexes.get(root)
+        stale = index is None or index.generation != catalog.generation
+        if stale and root not in _building:
+            _building.add(root)
+            threading.Thread(target=_build, args=(root, catalog),
+                             name="TokenIndexBuild", daemon=True).start()
+    if index is None or (current and stale):
+        return None
+    return index
@@ -0,0 +1,115 @@
+"""One search across the birth, death and marriage registries.
+
+Each index table carries a generated ``search_tsv`` column (see
+``dbase_scripts/add_search_vectors.py``): a ``simple``-config tsvector of the
+registrant's own name(s) at weight A and the parents' names at weight B,
+backed by a GIN index. ``search_all_registries()`` runs the three per-table
+queries concurrently, each on its own pooled connection, and merges the hits
+into one list ranked by ``ts_rank`` - so the whole search costs roughly the
+latency of the slowest single query.
+
+Usage:
+    results, errors = search_all_registries("dela cruz")
+    for result in results:
+        print(result.registry, result.name, result.file_path)
+"""
+
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from db_pool import pooled_connection
+
+# registry label, table, display-name SQL, event date column
+REGISTRIES = [
+    ("Birth", "birth_index", "name", "date_of_birth"),
+    ("Death", "death_index", "name", "date_of_death"),
+    ("Marriage", "marriage_index", "concat_ws(' & ', husband_name, wife_name)", "date_of_marriage"),
+]
+
+# Columns folded into search_tsv: (weight A = own names, weight B = relatives)
+SEARCH_VECTOR_COLUMNS = {
+    "birth_index": (("name",), ("name_of_mother", "name_of_father")),
+    "death_index": (("name",), ()),
+    "marriage_index": (("husband_name", "wife_name"),
+                       ("husb_mother", "wife_mother", "husb_father", "wife_father")),
+}
+
+DEFAULT_LIMIT = 200  # hits kept per registry
+
+UnifiedResult = namedtuple("UnifiedResult", "registry table file_path name event_date rank")
+
+_executor = ThreadPoolExecutor(max_workers=len(REGISTRIES), thread_name_prefix="UnifiedSearch")
+
+
+def search_vector_sql(table):
+    """SQL expression that builds search_tsv for `table` (used by the migration)."""
+    own, relatives = SEARCH_VECTOR_COLUMNS[table]
+    parts = []
+    for weight, columns in (("A", own), ("B", relatives)):
+        if columns:
+            text = " || ' ' || ".join(f"coalesce({col}, '')" for col in columns)
+            parts.append(f"setweight(to_tsvector('simple'::regconfig, {text}), '{weight}')")
+    return " || ".join(parts)
+
+
+def build_tsquery(text):
+    """Turn free text into a prefix-matching tsquery string, or None if empty.
+
+    Every word must match (AND), and each word matches as a prefix so
+    "dela cr" still finds "DELA CRUZ".
+    """
+    words = re.findall(r"\w+", (text or "").lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def _search_registry(registry, table, name_sql, date_column, tsquery, limit):
+    sql = f"""
+        SELECT file_path, {name_sql}, {date_column}, ts_rank(search_tsv, query) AS rank
+        FROM {table}, to_tsquery('simple', %s) AS query
+        WHERE search_tsv @@ query
+        ORDER BY rank DESC, {date_column} DESC NULLS LAST
+        LIMIT %s
+    """
+    with pooled_connection(owner="UnifiedSearch") as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, (tsquery, limit))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    return [UnifiedResult(registry, table, path, name, event_date, rank)
+            for path, name, event_date, rank in rows]
+
+
+def search_all_registries(text, limit=DEFAULT_LIMIT):
+    """Search every registry at once.
+
+    Returns (results, errors): results merged and sorted by relevance, and a
+    {registry: error message} dict for registries whose query failed, so one
+    broken table does not hide the others' hits.
+    """
+    tsquery = build_tsquery(text)
+    if tsquery is None:
+        return [], {}
+
+    futures = {
+        registry: _executor.submit(_search_registry, registry, table, name_sql, date_column, tsquery, limit)
+        for registry, table, name_sql, date_column in REGISTRIES
+    }
+    results = []
+    errors = {}
+    for registry, future in futures.items():
+        try:
+            results.extend(future.result())
+        except psycopg2.Error as e:
+            print(f"Error searching {registry} registry: {str(e)}")
+            errors[registry] = str(e)
+
+    # Most relevant first; ties go to the most recent event
+    results.sort(key=lambda r: (r.rank, r.event_date.toordinal() if r.event_date else 0), reverse=True)
+    return results, errors
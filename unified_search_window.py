@@ -0,0 +1,140 @@
+import os
+from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                            QTableWidget, QTableWidgetItem, QLabel, QLineEdit,
+                            QPushButton, QMessageBox, QHeaderView)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon
+from audit_logger import AuditLogger
+from unified_search import search_all_registries
+from stylesheets import message_box_style, table_style, search_button_style
+
+
+class UnifiedSearchWindow(QMainWindow):
+    """Search the birth, death and marriage registries with one query."""
+
+    def __init__(self, username, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Search All Registries")
+        self.setMinimumSize(900, 600)
+        self.current_user = username
+        self.setWindowIcon(QIcon("icons/verify.png"))
+
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: #FFFFFF;
+            }
+            QLabel {
+                color: #212121;
+            }
+            QLineEdit {
+                background-color: #FFFFFF;
+                color: #212121;
+                border: 1px solid #D1D0D0;
+                border-radius: 5px;
+                padding: 5px;
+            }
+            QLineEdit:focus {
+                border: 1px solid #ce305e;
+                background-color: #fef2f4;
+            }
+        """)
+
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+        layout.setSpacing(5)
+        layout.setContentsMargins(10, 8, 10, 10)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Name of registrant, spouse or parent")
+        self.search_input.returnPressed.connect(self.run_search)
+        search_layout.addWidget(self.search_input)
+
+        self.search_button = QPushButton("Search")
+        self.search_button.setStyleSheet(search_button_style)
+        self.search_button.setMinimumWidth(100)
+        self.search_button.clicked.connect(self.run_search)
+        search_layout.addWidget(self.search_button)
+        layout.addLayout(search_layout)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(["Registry", "Name", "Date", "File"])
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setAlternatingRowColors(True)
+        self.table.setStyleSheet(table_style)
+        self.table.cellDoubleClicked.connect(self.open_result)
+        layout.addWidget(self.table)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.results = []
+
+    def show_message(self, icon, title, text):
+        box = QMessageBox(self)
+        box.setIcon(icon)
+        box.setWindowTitle(title)
+        box.setText(text)
+        box.setStandardButtons(QMessageBox.Ok)
+        box.setStyleSheet(message_box_style)
+        box.exec()
+
+    def run_search(self):
+        query = self.search_input.text().strip()
+        if not query:
+            self.show_message(QMessageBox.Warning, "Warning", "Please enter a name to search.")
+            return
+
+        self.results, errors = search_all_registries(query)
+
+        self.table.setRowCount(len(self.results))
+        for row, result in enumerate(self.results):
+            event_date = result.event_date.strftime("%B %d, %Y") if result.event_date else ""
+            values = [result.registry, result.name or "", event_date, os.path.basename(result.file_path)]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 3:
+                    item.setToolTip(result.file_path)
+                self.table.setItem(row, column, item)
+
+        counts = {}
+        for result in self.results:
+            counts[result.registry] = counts.get(result.registry, 0) + 1
+        summary = ", ".join(f"{registry}: {count}" for registry, count in counts.items())
+        self.status_label.setText(f"Found {len(self.results)} records" + (f" ({summary})" if summary else ""))
+
+        # log_action no longer needs a connection; rows are written in the background
+        AuditLogger.log_action(
+            None,
+            self.current_user,
+            "UNIFIED_SEARCH",
+            {"query": query, "result_count": len(self.results), "errors": list(errors)}
+        )
+
+        if errors:
+            failed = "\n".join(f"{registry}: {error}" for registry, error in errors.items())
+            self.show_message(QMessageBox.Warning, "Partial Results",
+                              f"Some registries could not be searched:\n{failed}")
+        elif not self.results:
+            self.show_message(QMessageBox.Information, "No Results", "No records found.")
+
+    def open_result(self, row, column):
+        result = self.results[row]
+        try:
+            os.startfile(result.file_path)
+            AuditLogger.log_action(
+                None,
+                self.current_user,
+                "FILE_OPENED",
+                {"file": os.path.basename(result.file_path), "path": result.file_path,
+                 "registry": result.registry}
+            )
+        except FileNotFoundError:
+            self.show_message(QMessageBox.Critical, "Error", f"File not found:\n{result.file_path}")
+        except Exception as e:
+            self.show_message(QMessageBox.Critical, "Error", f"An error occurred:\n{str(e)}")
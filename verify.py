@@ -22,7 +22,11 @@ from Search_Marriage_Window import Ui_SearchMarriageWindow
 from auto_form import *
 from audit_logger import AuditLogger
 from html_renderer import render_html_form
-from db_config import POSTGRES_CONFIG
+from db_pool import get_connection, release_connection
+from path_utils import canonical_path
+from name_search import name_search_terms, fuzzy_name_search_terms
+from date_query import parse_date_query
+from results_model import KeysetResultsModel, date_sort_key
 
 from stylesheets import search_button_style, everify_button_style, button_style, message_box_style
 
@@ -58,26 +62,40 @@ class VerifyWindowBase(QMainWindow):
         
 
         self.ui.centralwidget.setStyleSheet("background-color: #FFFFFF;")
+
+        # Swap the designer's QListWidget for a view over a paged model so large
+        # result sets load a page at a time as the clerk scrolls
+        results_view = QListView(self.ui.centralwidget)
+        results_view.setObjectName("results_list")
+        results_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        results_view.setUniformItemSizes(True)
+        self.results_model = KeysetResultsModel(self)
+        results_view.setModel(self.results_model)
+        self.ui.horizontalLayout_2.replaceWidget(self.ui.results_list, results_view)
+        self.ui.results_list.deleteLater()
+        self.ui.results_list = results_view
+        self.results_model.pageLoaded.connect(self.update_results_status)
+        self.results_model.fetchFailed.connect(self.show_fetch_error)
         
         self.ui.results_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #F2F2F2;
                 color: #212121;
                 border: 1px solid #D1D0D0;
                 border-radius: 5px;
                 padding: 5px;
             }
-            QListWidget::item {
+            QListView::item {
                 color: #212121;  
                 padding: 5px;
             }
 
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #ce305e;  
                 color: #FFFFFF;
             }
 
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: #e0446a;  
                 color: #212121;
             }
@@ -109,7 +127,7 @@ class VerifyWindowBase(QMainWindow):
                 background-color: #fef2f4;
             }
         """)
-        self.ui.search_by_comboBox.setFixedWidth(100)
+        self.ui.search_by_comboBox.setFixedWidth(120)
         self.ui.search_by_comboBox.setStyleSheet("""
             QComboBox {
                 background-color: #FFFFFF;
@@ -150,13 +168,10 @@ class VerifyWindowBase(QMainWindow):
         self.ui.destroyed.clicked.connect(self.open_destroyed_record)
 
         # Setup combo box
-        self.ui.search_by_comboBox.addItems(["Name", "Date", "Reg No."])
-        
-        # List for found PDFs
-        self.found_pdfs = []
+        self.ui.search_by_comboBox.addItems(["Name", "Fuzzy Name", "Date", "Reg No."])
         
         # Open file on double-click
-        self.ui.results_list.itemDoubleClicked.connect(self.open_selected_file)
+        self.ui.results_list.doubleClicked.connect(self.open_selected_file)
 
         # Add eVerify button
         self.ui.everify_button.setIcon(QIcon("icons/everify-icon.png"))
@@ -196,13 +211,13 @@ class VerifyWindowBase(QMainWindow):
         # Set minimum sizes to prevent shrinking
         self.ui.search_button.setMinimumWidth(100)
         self.ui.everify_button.setMinimumWidth(130)
-        self.ui.search_by_comboBox.setMinimumWidth(100)
+        self.ui.search_by_comboBox.setMinimumWidth(120)
         self.ui.search_textEdit.setMinimumWidth(200)
 
         # Set maximum sizes to prevent expanding
         self.ui.search_button.setMaximumWidth(100)
         self.ui.everify_button.setMaximumWidth(130)
-        self.ui.search_by_comboBox.setMaximumWidth(100)
+        self.ui.search_by_comboBox.setMaximumWidth(120)
 
         # Replace the old horizontal layout with the new search layout
         if self.ui.horizontalLayout.count() > 0:
@@ -224,8 +239,7 @@ class VerifyWindowBase(QMainWindow):
     def create_connection(self):
         try:
             if self.connection is None:
-                self.connection = psycopg2.connect(**POSTGRES_CONFIG)
-                self.connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                self.connection = get_connection(owner=self.__class__.__name__)
             return self.connection
         except psycopg2.Error as e:
             print(f"Error connecting to database: {str(e)}")
@@ -233,15 +247,12 @@ class VerifyWindowBase(QMainWindow):
 
     def closeConnection(self):
         if self.connection:
-            try:
-                self.connection.close()
-            except:
-                pass  # Ignore close errors
+            release_connection(self.connection)
             self.connection = None
     
     def normalize_path(self, path):
         """Normalize file path by converting all slashes to forward slashes."""
-        return path.replace('\\', '/')
+        return canonical_path(path)
 
     def open_auto_form(self):
         conn = self.create_connection()
@@ -249,7 +260,7 @@ class VerifyWindowBase(QMainWindow):
         self.form_preview_window = None # Initialize to None
         try:
             # Get the selected file from results list
-            selected_items = self.ui.results_list.selectedItems()
+            selected_items = self.ui.results_list.selectionModel().selectedIndexes()
             if not selected_items:
                 box = QMessageBox(self)
                 box.setIcon(QMessageBox.Warning)
@@ -260,7 +271,7 @@ class VerifyWindowBase(QMainWindow):
                 box.exec()
                 return
 
-            selected_file = selected_items[0].text()
+            selected_file = selected_items[0].data()
             regyear = self.ui.regyear_textEdit.text().strip()
             if not regyear:
                 box = QMessageBox(self)
@@ -292,7 +303,7 @@ class VerifyWindowBase(QMainWindow):
                            name_of_father, nationality_father, parents_marriage_date,
                            parents_marriage_place, attendant
                     FROM birth_index 
-                    WHERE normalize_path(file_path) = %s
+                    WHERE canonical_path = %s
                 """, (normalized_path,))
                 record = cursor.fetchone()
                 if record:
@@ -323,7 +334,7 @@ class VerifyWindowBase(QMainWindow):
                            date_of_reg, age_years, civil_status, nationality, place_of_death,
                            cause_of_death
                     FROM death_index 
-                    WHERE normalize_path(file_path) = %s
+                    WHERE canonical_path = %s
                 """, (normalized_path,))
                 record = cursor.fetchone()
                 if record:
@@ -351,7 +362,7 @@ class VerifyWindowBase(QMainWindow):
                            husb_civil_status, wife_civil_status, husb_mother, wife_mother,
                            husb_father, wife_father, date_of_reg, place_of_marriage
                     FROM marriage_index 
-                    WHERE normalize_path(file_path) = %s
+                    WHERE canonical_path = %s
                 """, (normalized_path,))
                 record = cursor.fetchone()
                 if record:
@@ -539,7 +550,7 @@ class VerifyWindowBase(QMainWindow):
         finally:
             self.closeConnection()
     
-    def open_selected_file(self, item):
+    def open_selected_file(self, index):
         regyear = self.ui.regyear_textEdit.text().strip()
         if not regyear:
             # QMessageBox.warning(self, "Error", "Please enter a registration year before opening a file.")
@@ -551,7 +562,8 @@ class VerifyWindowBase(QMainWindow):
             box.setStyleSheet(message_box_style)
             box.exec()
             return
-        file_path = os.path.join(self.search_path, regyear, item.text())
+        file_name = index.data()
+        file_path = os.path.join(self.search_path, regyear, file_name)
         conn = self.create_connection()
         try:
             os.startfile(file_path)
@@ -559,7 +571,7 @@ class VerifyWindowBase(QMainWindow):
                 conn,
                 self.current_user,
                 "FILE_OPENED",
-                {"file": item.text(), "path": file_path}
+                {"file": file_name, "path": file_path}
             )
             conn.commit()
         except FileNotFoundError:
@@ -584,7 +596,7 @@ class VerifyWindowBase(QMainWindow):
                 conn,
                 self.current_user,
                 "FILE_OPEN_ERROR",
-                {"error": str(e), "file": item.text()}
+                {"error": str(e), "file": file_name}
             )
             conn.commit()
         finally:
@@ -621,9 +633,8 @@ class VerifyWindowBase(QMainWindow):
             self.closeConnection()
     def search_pdfs(self):
         print(f"DEBUG - Current user during search: {self.current_user}")
-        self.ui.results_list.clear()
+        self.results_model.clear()
         query = self.ui.search_textEdit.text().strip()
-        self.found_pdfs.clear()
 
         conn = self.create_connection()
         try:
@@ -677,8 +688,6 @@ class VerifyWindowBase(QMainWindow):
 
             print(f"DEBUG - Using table: {index_table}, name_column: {name_column}, date_column: {date_column}")
 
-            cursor = conn.cursor()
-            
             try:
                 # # First, verify if there are any records in the table
                 # cursor.execute(f"SELECT COUNT(*) FROM {index_table}")
@@ -697,184 +706,70 @@ class VerifyWindowBase(QMainWindow):
                 #     print(f"  - Name: {record[0]}, Date: {record[1]}, Reg No: {record[2]}")
 
                 if search_type == "Name":
-                    if isinstance(self, VerifyMarriageWindow):
-                        # For marriage records, search both husband and wife names
-                        search_query = f"""
-                            SELECT file_path FROM {index_table}
-                            WHERE (
-                                LOWER({name_column}) LIKE LOWER(%s) 
-                                OR LOWER(wife_name) LIKE LOWER(%s)
-                                OR LOWER({name_column}) LIKE LOWER(%s)
-                                OR LOWER(wife_name) LIKE LOWER(%s)
-                            )
-                            ORDER BY {date_column} DESC
-                        """
-                        # Add variations of the name for more flexible matching
-                        name_variations = [
-                            f'%{query}%',
-                            f'%{query.lower()}%',
-                            f'%{query.upper()}%',
-                            f'%{query.title()}%'
-                        ]
-                        search_params = name_variations
-                    else:
-                        search_query = f"""
-                            SELECT file_path FROM {index_table}
-                            WHERE (
-                                LOWER({name_column}) LIKE LOWER(%s)
-                                OR LOWER({name_column}) LIKE LOWER(%s)
-                                OR LOWER({name_column}) LIKE LOWER(%s)
-                                OR LOWER({name_column}) LIKE LOWER(%s)
-                            )
-                            ORDER BY {date_column} DESC
-                        """
-                        # Add variations of the name for more flexible matching
-                        name_variations = [
-                            f'%{query}%',
-                            f'%{query.lower()}%',
-                            f'%{query.upper()}%',
-                            f'%{query.title()}%'
-                        ]
-                        search_params = name_variations
+                    # One trigram-indexed ILIKE per name column (husband and
+                    # wife for marriages), best matches first
+                    predicate, search_params, rank, rank_params = name_search_terms(index_table, query)
+                    sort_keys = [(rank, rank_params), date_sort_key(date_column)]
+                elif search_type == "Fuzzy Name":
+                    # Sound-alike and unaccented matches ("Ygnacio" finds
+                    # "Ignacio") through the precomputed name key indexes
+                    terms = fuzzy_name_search_terms(index_table, query)
+                    if terms is None:
+                        box = QMessageBox(self)
+                        box.setIcon(QMessageBox.Warning)
+                        box.setWindowTitle("Warning")
+                        box.setText("Please enter a name to search.")
+                        box.setStandardButtons(QMessageBox.Ok)
+                        box.setStyleSheet(message_box_style)
+                        box.exec()
+                        return
+                    predicate, search_params, rank, rank_params = terms
+                    sort_keys = [(rank, rank_params), date_sort_key(date_column)]
                 elif search_type == "Date":
-                    # Convert written date format to standard format
-                    try:
-                        from datetime import datetime
-                        import re
-
-                        # Common month mappings
-                        month_map = {
-                            'january': '01', 'february': '02', 'march': '03', 'april': '04',
-                            'may': '05', 'june': '06', 'july': '07', 'august': '08',
-                            'september': '09', 'october': '10', 'november': '11', 'december': '12',
-                            'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
-                            'jun': '06', 'jul': '07', 'aug': '08', 'sep': '09',
-                            'sept': '09', 'oct': '10', 'nov': '11', 'dec': '12'
-                        }
-
-                        # Try to parse the date in various formats
-                        date_str = query.lower().strip()
-                        
-                        # Handle written format with or without year (e.g., "December 17 2024" or "December 17")
-                        written_pattern = r'([a-z]+)\s+(\d{1,2})(?:\s+(\d{4}))?'
-                        written_match = re.match(written_pattern, date_str)
-                        
-                        if written_match:
-                            month, day, year = written_match.groups()
-                            if month in month_map:
-                                # If year is provided, use it; otherwise, search for any year
-                                if year:
-                                    formatted_date = f"{year}-{month_map[month]}-{day.zfill(2)}"
-                                    search_query = f"""
-                                        SELECT file_path FROM {index_table}
-                                        WHERE {date_column}::text LIKE %s
-                                        OR {date_column}::text LIKE %s
-                                        OR {date_column}::text LIKE %s
-                                        ORDER BY {date_column} DESC
-                                    """
-                                    search_params = (
-                                        f'%{formatted_date}%',
-                                        f'%{query}%',
-                                        f'%{month_map[month]}-{day.zfill(2)}%'
-                                    )
-                                else:
-                                    # Search for month and day in any year
-                                    search_query = f"""
-                                        SELECT file_path FROM {index_table}
-                                        WHERE {date_column}::text LIKE %s
-                                        OR {date_column}::text LIKE %s
-                                        OR {date_column}::text LIKE %s
-                                        ORDER BY {date_column} DESC
-                                    """
-                                    search_params = (
-                                        f'%{month_map[month]}-{day.zfill(2)}%',
-                                        f'%{query}%',
-                                        f'%{month} {day}%'
-                                    )
-                            else:
-                                search_query = f"""
-                                    SELECT file_path FROM {index_table}
-                                    WHERE {date_column}::text LIKE %s
-                                    ORDER BY {date_column} DESC
-                                """
-                                search_params = (f'%{query}%',)
-                        else:
-                            # Try to parse as standard date format
-                            try:
-                                # Try different date formats
-                                date_formats = ['%Y-%m-%d', '%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%d/%m/%Y']
-                                formatted_dates = []
-                                
-                                for date_format in date_formats:
-                                    try:
-                                        parsed_date = datetime.strptime(query, date_format)
-                                        formatted_dates.append(parsed_date.strftime('%Y-%m-%d'))
-                                    except ValueError:
-                                        continue
-                                
-                                if formatted_dates:
-                                    # Build a query that matches any of the formatted dates
-                                    placeholders = ', '.join(['%s'] * len(formatted_dates))
-                                    search_query = f"""
-                                        SELECT file_path FROM {index_table}
-                                        WHERE {date_column}::text LIKE ANY(ARRAY[{placeholders}])
-                                        OR {date_column}::text LIKE %s
-                                        ORDER BY {date_column} DESC
-                                    """
-                                    search_params = tuple(f'%{date}%' for date in formatted_dates) + (f'%{query}%',)
-                                else:
-                                    # If all parsing fails, do a simple text search
-                                    search_query = f"""
-                                        SELECT file_path FROM {index_table}
-                                        WHERE {date_column}::text LIKE %s
-                                        ORDER BY {date_column} DESC
-                                    """
-                                    search_params = (f'%{query}%',)
-                            except Exception as e:
-                                print(f"DEBUG - Date parsing error: {str(e)}")
-                                # Fallback to simple text search
-                                search_query = f"""
-                                    SELECT file_path FROM {index_table}
-                                    WHERE {date_column}::text LIKE %s
-                                    ORDER BY {date_column} DESC
-                                """
-                                search_params = (f'%{query}%',)
-                    except Exception as e:
-                        print(f"DEBUG - Date parsing error: {str(e)}")
-                        # Fallback to simple text search if date parsing fails
-                        search_query = f"""
-                            SELECT file_path FROM {index_table}
-                            WHERE {date_column}::text LIKE %s
-                            ORDER BY {date_column} DESC
-                        """
-                        search_params = (f'%{query}%',)
+                    # Typed predicate (exact date, range or month/day) that the
+                    # date and EXTRACT(month/day) indexes can serve
+                    date_query = parse_date_query(query)
+                    if date_query is None:
+                        AuditLogger.log_action(
+                            conn,
+                            self.current_user,
+                            "SEARCH_ERROR",
+                            {"error": "Unrecognized date", "query": query}
+                        )
+                        box = QMessageBox(self)
+                        box.setIcon(QMessageBox.Warning)
+                        box.setWindowTitle("Warning")
+                        box.setText("Unrecognized date. Try formats like \"December 17 2024\", "
+                                    "\"12/17/2024\", \"2024-12-17\", \"December 17\", \"December 2024\" or \"2024\".")
+                        box.setStandardButtons(QMessageBox.Ok)
+                        box.setStyleSheet(message_box_style)
+                        box.exec()
+                        return
+                    predicate, search_params = date_query.to_sql(date_column)
+                    sort_keys = [date_sort_key(date_column)]
                 elif search_type == "Reg No.":
-                    search_query = f"""
-                        SELECT file_path FROM {index_table}
-                        WHERE reg_no LIKE %s
-                        ORDER BY {date_column} DESC
-                    """
+                    predicate = "reg_no LIKE %s"
                     search_params = (f'%{query}%',)
+                    sort_keys = [date_sort_key(date_column)]
 
-                print(f"DEBUG - Executing query: {search_query}")
+                print(f"DEBUG - Search predicate: {predicate}")
                 print(f"DEBUG - With parameters: {search_params}")
-                
-                cursor.execute(search_query, search_params)
-                results = cursor.fetchall()
-                
-                print(f"DEBUG - Query returned {len(results)} results")
 
-                if results:
-                    pdf_files = [os.path.basename(result[0]) for result in results]
-                    self.ui.results_list.addItems(pdf_files)
-                    self.found_pdfs.extend(pdf_files)
-                    self.ui.status_label.setText(f"Found {len(self.found_pdfs)} files.")
+                # Only the first page is fetched here; the view pulls the rest
+                # through the model's fetchMore() while scrolling
+                loaded = self.results_model.start(index_table, predicate, search_params, sort_keys)
+
+                print(f"DEBUG - First page returned {loaded} results")
+
+                if loaded:
+                    self.update_results_status(loaded)
                     AuditLogger.log_action(
                         conn,
                         self.current_user,
                         "SEARCH_COMPLETED",
                         {
-                            "result_count": len(pdf_files),
+                            "result_count": loaded,
+                            "more_results": self.results_model.has_more(),
                             "type": search_type
                         }
                     )
@@ -920,14 +815,27 @@ class VerifyWindowBase(QMainWindow):
             box.setStyleSheet(message_box_style)
             box.exec()
         finally:
-            if cursor:
-                cursor.close()
             self.closeConnection()
             
             # Re-enable layout updates
             self.setUpdatesEnabled(True)
             self.update()
     
+    def update_results_status(self, loaded):
+        if self.results_model.has_more():
+            self.ui.status_label.setText(f"Showing {loaded} files (scroll for more).")
+        else:
+            self.ui.status_label.setText(f"Found {loaded} files.")
+
+    def show_fetch_error(self, message):
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Critical)
+        box.setWindowTitle("Error")
+        box.setText(f"Failed to load more results: {message}")
+        box.setStandardButtons(QMessageBox.Ok)
+        box.setStyleSheet(message_box_style)
+        box.exec()
+
     def start_everify_flow(self):
         conn = self.create_connection()
         try:
@@ -1004,7 +912,7 @@ class VerifyWindowBase(QMainWindow):
             self.ui.regyear_textEdit.clear()
             self.ui.search_textEdit.clear()
             self.ui.search_by_comboBox.setCurrentText("Name")
-            self.ui.results_list.clear()
+            self.results_model.clear()
             self.ui.status_label.clear()
 
         finally:
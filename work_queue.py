@@ -0,0 +1,135 @@
+"""Claims on untagged files so several clerks can tag one folder together.
+
+Every PDF of a folder opened in a tagging window gets a row in
+``tag_claims`` (dbase_scripts/create_tag_claims_table.py), ordered by its
+position in the window's list. ``claim_next()`` hands a clerk the next N
+untagged files that nobody else holds, in one statement:
+``SELECT ... FOR UPDATE SKIP LOCKED`` picks rows another clerk's claim is
+not locking at that moment, so simultaneous requests get disjoint batches
+without waiting on each other. A claim is a lease: if the clerk walks away,
+it expires after ``LEASE_MINUTES`` and the files go back to the pool.
+Tagged files (a row in the registry table) are never handed out again.
+
+Usage:
+    queue = WorkQueue("birth_index", username)
+    queue.register_folder(conn, folder, file_paths)
+    mine = queue.claim_next(conn, folder, 20)
+"""
+
+from typing import Dict, List, Optional
+
+from psycopg2.extras import execute_values
+
+LEASE_MINUTES = 30    # a claim not renewed for this long is handed out again
+CLAIM_BATCH = 20      # files per "assign me" request
+
+
+class WorkQueue:
+    """tag_claims access for one registry table and clerk."""
+
+    def __init__(self, table: str, username: str, lease_minutes: int = LEASE_MINUTES):
+        self.table = table  # also the claims' record_type
+        self.username = username
+        self.lease_minutes = lease_minutes
+
+    def register_folder(self, conn, folder: str, file_paths: List[str]) -> None:
+        """Add the folder's files to the pool (existing claims are kept)."""
+        if not file_paths:
+            return
+        cursor = conn.cursor()
+        try:
+            execute_values(cursor, """
+                INSERT INTO tag_claims (record_type, file_path, folder, position)
+                VALUES %s
+                ON CONFLICT (record_type, file_path) DO UPDATE SET
+                    folder = EXCLUDED.folder,
+                    position = EXCLUDED.position
+                WHERE tag_claims.folder IS DISTINCT FROM EXCLUDED.folder
+                   OR tag_claims.position IS DISTINCT FROM EXCLUDED.position
+            """, [(self.table, path, folder, position) for position, path in enumerate(file_paths)],
+                page_size=1000)
+            conn.commit()
+        finally:
+            cursor.close()
+
+    def claim_next(self, conn, folder: str, count: int = CLAIM_BATCH) -> List[str]:
+        """Lease up to `count` untagged files of the folder, in list order.
+
+        The clerk's own live claims come first, so asking again tops the
+        batch up instead of growing it.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                WITH next AS (
+                    SELECT c.record_type, c.file_path
+                    FROM tag_claims c
+                    WHERE c.record_type = %(table)s AND c.folder = %(folder)s
+                      AND (c.claimed_by IS NULL OR c.claimed_by = %(user)s OR c.lease_expires < now())
+                      AND NOT EXISTS (SELECT 1 FROM {self.table} t WHERE t.file_path = c.file_path)
+                    ORDER BY (c.claimed_by = %(user)s AND c.lease_expires >= now()) IS TRUE DESC, c.position
+                    LIMIT %(count)s
+                    FOR UPDATE OF c SKIP LOCKED
+                )
+                UPDATE tag_claims c
+                SET claimed_by = %(user)s,
+                    claimed_at = now(),
+                    lease_expires = now() + %(lease)s * interval '1 minute'
+                FROM next
+                WHERE c.record_type = next.record_type AND c.file_path = next.file_path
+                RETURNING c.file_path, c.position
+            """, {"table": self.table, "folder": folder, "user": self.username,
+                  "count": count, "lease": self.lease_minutes})
+            claimed = cursor.fetchall()
+            conn.commit()
+        finally:
+            cursor.close()
+        return [path for path, _ in sorted(claimed, key=lambda row: row[1])]
+
+    def claims(self, conn, folder: str) -> Dict[str, str]:
+        """file_path -> clerk for the folder's live claims."""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT file_path, claimed_by FROM tag_claims
+                WHERE record_type = %s AND folder = %s
+                  AND claimed_by IS NOT NULL AND lease_expires >= now()
+            """, (self.table, folder))
+            return dict(cursor.fetchall())
+        finally:
+            cursor.close()
+
+    def renew(self, conn) -> int:
+        """Extend the clerk's live leases. Returns how many were renewed."""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE tag_claims
+                SET lease_expires = now() + %s * interval '1 minute'
+                WHERE record_type = %s AND claimed_by = %s AND lease_expires >= now()
+            """, (self.lease_minutes, self.table, self.username))
+            renewed = cursor.rowcount
+            conn.commit()
+            return renewed
+        finally:
+            cursor.close()
+
+    def release(self, conn, file_paths: Optional[List[str]] = None) -> int:
+        """Give back the clerk's claims on `file_paths` (all of them if None)."""
+        sql = """
+            UPDATE tag_claims
+            SET claimed_by = NULL, claimed_at = NULL, lease_expires = NULL
+            WHERE record_type = %s AND claimed_by = %s
+        """
+        params = [self.table, self.username]
+        if file_paths is not None:
+            sql += " AND file_path = ANY(%s)"
+            params.append(list(file_paths))
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            released = cursor.rowcount
+            conn.commit()
+            return released
+        finally:
+            cursor.close()